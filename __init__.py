@@ -99,9 +99,18 @@ class F3D_GlobalSettingsPanel(bpy.types.Panel):
                 "While inlining, all meshes will be restored to world default values.\n         You can configure these values in the world properties tab.",
                 icon="INFO",
             )
+            col.prop(context.scene.fast64.settings, "optimize_draw_order")
         col.prop(context.scene, "ignoreTextureRestrictions")
         if context.scene.ignoreTextureRestrictions:
             col.box().label(text="Width/height must be < 1024. Must be png format.")
+        col.prop(context.scene.fast64.settings, "optimize_tri_order")
+        col.prop(context.scene.fast64.settings, "tri_cache")
+        if context.scene.fast64.settings.tri_cache:
+            prop_split(col, context.scene.fast64.settings, "tri_cache_size", "Cache Size (MiB)")
+        prop_split(col, context.scene.fast64.settings, "c_export_workers", "C Export Workers (Experimental)")
+        col.prop(context.scene.fast64.settings, "sample_anim_fcurves")
+        if context.scene.fast64.settings.sample_anim_fcurves:
+            col.operator("object.fast64_compare_anim_sampling")
 
 
 class Fast64_GlobalSettingsPanel(bpy.types.Panel):
@@ -202,6 +211,44 @@ class Fast64Settings_Properties(bpy.types.PropertyGroup):
         description="When enabled, fast64 will default colored textures's format to RGBA even if they fit CI requirements, with the exception of textures that would not fit into TMEM otherwise",
     )
     dont_ask_color_management: bpy.props.BoolProperty(name="Don't ask to set color management properties")
+    optimize_tri_order: bpy.props.BoolProperty(
+        name="Optimize Triangle Order",
+        description="Reorders triangles within each material to minimize vertex buffer loads (SPVertex commands) "
+        "and prints the before / after counts for every mesh",
+    )
+    optimize_draw_order: bpy.props.BoolProperty(
+        name="Optimize Draw Order",
+        description="While bleeding, reorders the materials of opaque draw layers so that materials sharing "
+        "textures and render state are drawn one after another, and prints the estimated command and TMEM load savings",
+    )
+    tri_cache: bpy.props.BoolProperty(
+        name="Triangle Strip Cache",
+        description="Stores the vertex buffers and triangle commands of each material's faces on disk, so that "
+        "re-exporting unchanged faces skips strip ordering and vertex packing. Materials, textures and the rest "
+        "of the export are still converted. Meshes with vertex groups (skinned meshes) are never cached",
+    )
+    tri_cache_size: bpy.props.IntProperty(
+        name="Triangle Strip Cache Size (MiB)",
+        description="Least recently used entries are deleted once the triangle strip cache is larger than this",
+        default=512,
+        min=1,
+    )
+    c_export_workers: bpy.props.IntProperty(
+        name="C Export Workers (Experimental)",
+        description="Experimental. Number of processes generating the C data of textures and OoT rooms in parallel, "
+        "1 exports serially. Blender is forked once per export, which some add-ons or Blender builds may not support. "
+        "Only used on platforms that can fork processes (Linux, macOS)",
+        default=1,
+        min=1,
+        max=64,
+    )
+    sample_anim_fcurves: bpy.props.BoolProperty(
+        name="Fast Animation Sampling (Experimental)",
+        description="Experimental. Animation exports evaluate the fcurves of the active action instead of setting "
+        "each frame on the scene, when nothing else affects the pose. Blender composes poses in single precision, "
+        "so exported values can differ by one unit, Compare Animation Sampling prints the difference for the "
+        "selected armature",
+    )
 
     repo_settings_tab: bpy.props.BoolProperty(default=True, name="Repo Settings")
     repo_settings_path: bpy.props.StringProperty(name="Path", subtype="FILE_PATH", update=repo_path_update)
@@ -220,12 +267,25 @@ class Fast64Settings_Properties(bpy.types.PropertyGroup):
         data["autoPickTextureFormat"] = self.auto_pick_texture_format
         if self.auto_pick_texture_format:
             data["preferRGBAOverCI"] = self.prefer_rgba_over_ci
+        data["optimizeTriOrder"] = self.optimize_tri_order
+        data["optimizeDrawOrder"] = self.optimize_draw_order
+        data["triCache"] = self.tri_cache
+        if self.tri_cache:
+            data["triCacheSize"] = self.tri_cache_size
+        data["cExportWorkers"] = self.c_export_workers
+        data["sampleAnimFcurves"] = self.sample_anim_fcurves
         return data
 
     def from_repo_settings(self, data: dict):
         set_prop_if_in_data(self, "auto_repo_load_settings", data, "autoLoad")
         set_prop_if_in_data(self, "auto_pick_texture_format", data, "autoPickTextureFormat")
         set_prop_if_in_data(self, "prefer_rgba_over_ci", data, "preferRGBAOverCI")
+        set_prop_if_in_data(self, "optimize_tri_order", data, "optimizeTriOrder")
+        set_prop_if_in_data(self, "optimize_draw_order", data, "optimizeDrawOrder")
+        set_prop_if_in_data(self, "tri_cache", data, "triCache")
+        set_prop_if_in_data(self, "tri_cache_size", data, "triCacheSize")
+        set_prop_if_in_data(self, "c_export_workers", data, "cExportWorkers")
+        set_prop_if_in_data(self, "sample_anim_fcurves", data, "sampleAnimFcurves")
 
 
 class Fast64_Properties(bpy.types.PropertyGroup):
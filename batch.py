@@ -0,0 +1,2 @@
+# Entry point for headless batch export, see fast64_internal/batch.py
+from .fast64_internal.batch import main, runWorker
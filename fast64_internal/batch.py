@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+
+import bpy
+
+from contextlib import nullcontext
+
+from .file_lock import lockSharedFile
+from .utility import PluginError
+
+"""
+Headless batch export, running the export operators of a manifest of jobs in parallel background Blender processes.
+
+Usage:
+blender --background --python-expr "import fast64.batch; fast64.batch.main()" -- <manifest> [--workers N] [--log-dir DIR] [--blender PATH]
+
+Manifest example (paths are relative to the manifest):
+{
+    "blend": "assets.blend",
+    "jobs": [
+        {
+            "name": "mario",
+            "operator": "object.sm64_export_geolayout_armature",
+            "object": "mario",
+            "properties": {"scene.fast64.sm64.combined_export.actor_custom_path": "//out/actors"}
+        },
+        {"name": "mario_walk", "operator": "object.sm64_export_anim", "object": "mario", "action": "walk"},
+        {"operator": "object.oot_export_level", "blend": "levels.blend", "scene": "spot00"}
+    ]
+}
+
+"blend" (the file to open, defaults to the manifest's, or to the file open in the controlling Blender),
+"scene", "object" (made active and selected), "action" (set as the object's action),
+"properties" (data paths from "scene." or "object." set before exporting) and "args" (operator arguments)
+are all optional besides "operator". The file is reopened for each job, since exports modify the scene.
+
+The jobs of a blend file all run in the same worker, in order, and workers get the files with the most jobs first.
+Jobs run concurrently even when they export to the same decomp: the exporters lock each file shared by
+several exports (group headers, level and course defines, texture scrolling files, animation tables,
+the OoT spec and scene table...) only while editing it, see file_lock.py.
+SM64 binary exports rebuild the whole output ROM, so they hold a lock on it for the duration of the job.
+
+Each worker logs to <log dir>/worker_<index>.log, the logs are merged into batch.log along with job timings.
+"""
+
+
+def loadManifest(manifestPath: str) -> list[dict]:
+    with open(manifestPath, "r") as manifestFile:
+        manifest = json.load(manifestFile)
+
+    manifestDir = os.path.dirname(os.path.abspath(manifestPath))
+    defaultBlend = manifest.get("blend")
+    jobs = []
+    for index, job in enumerate(manifest.get("jobs", [])):
+        if "operator" not in job:
+            raise PluginError(f"Batch job {index} has no operator.")
+        job = dict(job)
+        job.setdefault("name", f"{index}_{job['operator']}")
+        blend = job.get("blend", defaultBlend)
+        if blend is not None:
+            job["blend"] = os.path.join(manifestDir, blend)
+        elif bpy.data.filepath:
+            job["blend"] = bpy.data.filepath
+        else:
+            raise PluginError(f'Batch job "{job["name"]}" has no blend file.')
+        jobs.append(job)
+    return jobs
+
+
+# Worker
+
+
+def setJobProperty(job: dict, path: str, value, scene: bpy.types.Scene, obj: bpy.types.Object | None):
+    rootName, _, propertyPath = path.partition(".")
+    if rootName == "scene":
+        owner = scene
+    elif rootName == "object" and obj is not None:
+        owner = obj
+    else:
+        raise PluginError(
+            f'Invalid property "{path}" in batch job "{job["name"]}", it must start with scene. or object.'
+        )
+
+    ownerPath, _, attribute = propertyPath.rpartition(".")
+    if ownerPath:
+        owner = owner.path_resolve(ownerPath)
+    setattr(owner, attribute, value)
+
+
+def getJobLock(job: dict, scene: bpy.types.Scene):
+    """SM64 binary exports replace the output ROM, which can't be shared with other jobs while they run"""
+    _, _, operatorName = job["operator"].partition(".")
+    if operatorName.startswith("sm64") and scene.fast64.sm64.export_type == "Binary":
+        return lockSharedFile(bpy.path.abspath(scene.fast64.sm64.output_rom))
+    return nullcontext()
+
+
+def runJob(job: dict):
+    bpy.ops.wm.open_mainfile(filepath=job["blend"])
+
+    scene = bpy.context.scene
+    if "scene" in job:
+        scene = bpy.data.scenes.get(job["scene"])
+        if scene is None:
+            raise PluginError(f'Scene "{job["scene"]}" not found.')
+    viewLayer = scene.view_layers[0]
+
+    obj = None
+    if "object" in job:
+        obj = bpy.data.objects.get(job["object"])
+        if obj is None:
+            raise PluginError(f'Object "{job["object"]}" not found.')
+        for otherObj in viewLayer.objects:
+            otherObj.select_set(False, view_layer=viewLayer)
+        obj.select_set(True, view_layer=viewLayer)
+        viewLayer.objects.active = obj
+
+    if "action" in job:
+        action = bpy.data.actions.get(job["action"])
+        if action is None:
+            raise PluginError(f'Action "{job["action"]}" not found.')
+        if obj is None:
+            raise PluginError("Actions can only be set on the job's object.")
+        if obj.animation_data is None:
+            obj.animation_data_create()
+        obj.animation_data.action = action
+
+    for path, value in job.get("properties", {}).items():
+        setJobProperty(job, path, value, scene, obj)
+
+    # There is no window in background mode, so the scene is passed through the context
+    category, _, operatorName = job["operator"].partition(".")
+    operator = getattr(getattr(bpy.ops, category), operatorName)
+    with getJobLock(job, scene):
+        with bpy.context.temp_override(scene=scene, view_layer=viewLayer):
+            result = operator(**job.get("args", {}))
+    if "FINISHED" not in result:
+        # The operator reported the error itself
+        raise PluginError(f"{job['operator']} returned {', '.join(sorted(result))}.")
+
+
+def runWorker():
+    """Runs the jobs given after "--" as (jobs path, results path, job indices...) and writes their results"""
+    args = sys.argv[sys.argv.index("--") + 1 :]
+    jobsPath, resultsPath = args[0], args[1]
+    with open(jobsPath, "r") as jobsFile:
+        jobs = json.load(jobsFile)
+
+    results = []
+    for index in (int(arg) for arg in args[2:]):
+        job = jobs[index]
+        print(f'=== Job "{job["name"]}" ({job["operator"]})', flush=True)
+        start = time.perf_counter()
+        try:
+            runJob(job)
+            error = None
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+        elapsed = time.perf_counter() - start
+        print(f'=== Job "{job["name"]}" {"failed" if error else "finished"} in {elapsed:.2f}s', flush=True)
+        results.append({"index": index, "name": job["name"], "seconds": elapsed, "error": error})
+
+        # Written after each job, so that a crashing worker still reports the jobs it finished
+        with open(resultsPath, "w") as resultsFile:
+            json.dump(results, resultsFile)
+
+
+# Controller
+
+
+def getWorkerJobs(jobs: list[dict], workerCount: int) -> list[list[int]]:
+    """
+    Splits jobs between workers, keeping the jobs of a file together and in order.
+    Files are assigned to the worker with the fewest jobs, starting with the files with the most jobs.
+    """
+    fileJobs: dict[str, list[int]] = {}
+    for index, job in enumerate(jobs):
+        fileJobs.setdefault(job["blend"], []).append(index)
+
+    workerJobs = [[] for _ in range(workerCount)]
+    for indices in sorted(fileJobs.values(), key=len, reverse=True):
+        min(workerJobs, key=len).extend(indices)
+    return [indices for indices in workerJobs if len(indices) > 0]
+
+
+def main(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog="fast64 batch", description="Runs fast64 export jobs in background Blenders.")
+    parser.add_argument("manifest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-dir", default=None)
+    parser.add_argument("--blender", default=bpy.app.binary_path)
+    args = parser.parse_args(argv)
+
+    manifestPath = os.path.abspath(args.manifest)
+    jobs = loadManifest(manifestPath)
+    logDir = args.log_dir or os.path.join(os.path.dirname(manifestPath), "batch_logs")
+    os.makedirs(logDir, exist_ok=True)
+
+    # Workers read the jobs with their blend files resolved, as they don't have the controller's file open
+    jobsPath = os.path.join(logDir, "jobs.json")
+    with open(jobsPath, "w") as jobsFile:
+        json.dump(jobs, jobsFile, indent=4)
+
+    workerExpression = f"import importlib; importlib.import_module({__name__!r}).runWorker()"
+    start = time.perf_counter()
+    workers = []
+    for workerIndex, indices in enumerate(getWorkerJobs(jobs, max(args.workers, 1))):
+        logPath = os.path.join(logDir, f"worker_{workerIndex}.log")
+        resultsPath = os.path.join(logDir, f"worker_{workerIndex}.json")
+        if os.path.exists(resultsPath):
+            os.remove(resultsPath)
+        command = [args.blender, "--background", "--python-expr", workerExpression, "--", jobsPath, resultsPath]
+        command += [str(index) for index in indices]
+        logFile = open(logPath, "w")
+        process = subprocess.Popen(command, stdout=logFile, stderr=subprocess.STDOUT)
+        workers.append((process, logFile, logPath, resultsPath, indices))
+    print(f"Running {len(jobs)} jobs in {len(workers)} workers, logging to {logDir}")
+
+    results = {}
+    with open(os.path.join(logDir, "batch.log"), "w") as batchLog:
+        for workerIndex, (process, logFile, logPath, resultsPath, indices) in enumerate(workers):
+            returnCode = process.wait()
+            logFile.close()
+            with open(logPath, "r", errors="replace") as workerLog:
+                batchLog.write(f"##### Worker {workerIndex} (exit code {returnCode})\n")
+                batchLog.write(workerLog.read())
+            if os.path.exists(resultsPath):
+                with open(resultsPath, "r") as resultsFile:
+                    for result in json.load(resultsFile):
+                        results[result["index"]] = result
+            for index in indices:
+                results.setdefault(
+                    index,
+                    {
+                        "index": index,
+                        "name": jobs[index]["name"],
+                        "seconds": 0,
+                        "error": f"worker exited with {returnCode}",
+                    },
+                )
+
+        summary = ["##### Summary"]
+        for index in range(len(jobs)):
+            result = results[index]
+            status = f"FAILED: {result['error']}" if result["error"] else "OK"
+            summary.append(f"{result['name']}: {result['seconds']:.2f}s {status}")
+        failedCount = sum(1 for result in results.values() if result["error"])
+        summary.append(
+            f"{len(jobs) - failedCount} / {len(jobs)} jobs succeeded in {time.perf_counter() - start:.2f}s "
+            + f"({sum(result['seconds'] for result in results.values()):.2f}s of job time)"
+        )
+        batchLog.write("\n".join(summary) + "\n")
+    print("\n".join(summary))
+
+    if bpy.app.background and failedCount > 0:
+        sys.exit(1)
+    return failedCount
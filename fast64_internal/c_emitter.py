@@ -0,0 +1,105 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Optional, TypeVar
+
+import bpy
+
+"""
+Parallel C generation of converted data (textures, OoT rooms).
+Once conversion is done, the exported data (GfxList, VtxList, FImage, room and scene headers...) doesn't reference
+Blender data anymore, and generating its C code doesn't access bpy. The few scene values C generation reads
+are captured here before starting the workers.
+
+Workers are forked from the Blender process, so they inherit the exported data instead of unpickling it,
+and only the generated C data is sent back. On platforms that can't fork (Windows), jobs run serially.
+
+This is experimental, and off unless the C export workers setting is above 1: Blender is multi-threaded,
+and a forked worker can deadlock on a lock another thread held when forking, or crash if a job touches bpy.
+To fork Blender as little as possible, workers are only used in an emitSession block wrapping an export,
+and only for its first emitParallel call with several jobs. The other calls of the export run serially.
+"""
+
+T = TypeVar("T")
+
+# Scene values read during C generation, set in workers since they must not access bpy
+workerGameEditorMode: Optional[str] = None
+
+# Jobs of the current emitParallel call, inherited by the forked workers
+emitJobs: list[Callable[[], object]] = []
+
+# Nesting depth of emitSession blocks, and whether the current session already used worker processes
+emitSessionDepth = 0
+emitSessionForked = False
+
+
+def getGameEditorMode() -> str:
+    if workerGameEditorMode is not None:
+        return workerGameEditorMode
+    return bpy.context.scene.gameEditorMode
+
+
+@contextmanager
+def emitSession():
+    """Wraps an export, so that its first emitParallel call can use the C export workers. Sessions can be nested."""
+    global emitSessionDepth, emitSessionForked
+    if emitSessionDepth == 0:
+        emitSessionForked = False
+    emitSessionDepth += 1
+    try:
+        yield
+    finally:
+        emitSessionDepth -= 1
+
+
+def initEmitWorker(gameEditorMode: str):
+    global workerGameEditorMode
+    workerGameEditorMode = gameEditorMode
+
+
+def runEmitJob(index: int):
+    return emitJobs[index]()
+
+
+def getEmitWorkerCount(jobCount: int) -> int:
+    if workerGameEditorMode is not None or "fork" not in multiprocessing.get_all_start_methods():
+        return 1  # already in a worker, or can't fork
+    if emitSessionDepth == 0 or emitSessionForked:
+        return 1  # not in an export, or the export already used the workers
+    return max(1, min(bpy.context.scene.fast64.settings.c_export_workers, jobCount))
+
+
+def emitParallel(jobs: list[Callable[[], T]], onResult: Optional[Callable[[T], None]] = None) -> list[T]:
+    """
+    Runs the jobs, which must not access bpy, in worker processes and returns their results in order.
+    onResult is called in this process with each result as soon as it arrives, for example to write it.
+    Jobs run serially outside of an emitSession, or if the session already used the workers.
+    """
+    global emitJobs, emitSessionForked
+    results: list[T] = [None] * len(jobs)
+    workerCount = getEmitWorkerCount(len(jobs))
+
+    if workerCount <= 1:
+        for index, job in enumerate(jobs):
+            results[index] = job()
+            if onResult is not None:
+                onResult(results[index])
+        return results
+
+    emitJobs = jobs
+    emitSessionForked = True
+    try:
+        with ProcessPoolExecutor(
+            workerCount,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=initEmitWorker,
+            initargs=(getGameEditorMode(),),
+        ) as executor:
+            futures = {executor.submit(runEmitJob, index): index for index in range(len(jobs))}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if onResult is not None:
+                    onResult(results[futures[future]])
+    finally:
+        emitJobs = []
+    return results
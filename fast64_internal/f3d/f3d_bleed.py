@@ -24,6 +24,7 @@ from .f3d_gbi import (
     SPModifyVertex,
     SPEndDisplayList,
     SPLoadGeometryMode,
+    SPGeometryMode,
     SPSetGeometryMode,
     SPClearGeometryMode,
     SPSetOtherMode,
@@ -31,6 +32,7 @@ from .f3d_gbi import (
     DPLoadTLUTCmd,
     DPFullSync,
     DPSetRenderMode,
+    DPSetDepthSource,
     DPSetTextureImage,
     DPPipeSync,
     DPLoadSync,
@@ -62,6 +64,10 @@ class BleedGraphics:
         self.is_f3dex2 = "F3DEX2" in bpy.context.scene.f3d_type
         self.build_default_geo()
         self.build_default_othermodes()
+        # draw order optimization, estimated [cmds before, cmds after, tmem loads before, tmem loads after]
+        self.optimize_draw_order = bpy.context.scene.fast64.settings.optimize_draw_order
+        self.draw_order_stats = [0, 0, 0, 0]
+        self.draw_state_keys = dict()
 
     def build_default_geo(self):
         defaults = create_or_get_world(bpy.context.scene).rdp_defaults
@@ -118,9 +124,11 @@ class BleedGraphics:
 
     def bleed_fModel(self, fModel: FModel, fMeshes: dict[FMesh]):
         # walk fModel, no order to drawing is observed, so last_mat is not kept track of
+        material_index = build_material_jump_index(fModel)
         for drawLayer, fMesh in fMeshes.items():
-            self.bleed_fmesh(fMesh, None, fMesh.draw, fModel.getAllMaterials().items(), fModel.getRenderMode(drawLayer))
+            self.bleed_fmesh(fMesh, None, fMesh.draw, material_index, fModel.getRenderMode(drawLayer))
         self.clear_gfx_lists(fModel)
+        self.report_draw_order()
 
     # clear the gfx lists so they don't export
     def clear_gfx_lists(self, fModel: FModel):
@@ -137,7 +145,7 @@ class BleedGraphics:
         fMesh: FMesh,
         last_mat: FMaterial,
         cmd_list: GfxList,
-        fmodel_materials,
+        material_index: dict[GfxList, tuple[bpy.types.Material, FMaterial, bool]],
         default_render_mode: list[str] = None,
     ):
         if bled_mat := self.bled_gfx_lists.get(cmd_list, None):
@@ -147,6 +155,8 @@ class BleedGraphics:
         cur_fmat = None
         reset_cmd_dict = dict()
         bleed_gfx_lists = BleedGfxLists()
+        if self.optimize_draw_order:
+            self.reorder_draws(cmd_list, last_mat, material_index, default_render_mode)
         fmesh_static_cmds, fmesh_jump_cmds = self.on_bleed_start(cmd_list)
         for jump_list_cmd in fmesh_jump_cmds:
             # bleed mat and tex
@@ -154,7 +164,7 @@ class BleedGraphics:
                 # update last_mat
                 if cur_fmat:
                     last_mat = cur_fmat
-                _, cur_fmat = find_material_from_jump_cmd(fmodel_materials, jump_list_cmd)
+                _, cur_fmat = find_material_from_jump_cmd(material_index, jump_list_cmd)
                 if not cur_fmat:
                     # make better error msg
                     print("could not find material used in fmesh draw")
@@ -229,8 +239,7 @@ class BleedGraphics:
                 if self.bleed_individual_cmd(commands_bled, cmd, bleed_state, last_mat.texture_DL.commands) is True:
                     commands_bled.commands[j] = None
             # remove Nones from list
-            while None in commands_bled.commands:
-                commands_bled.commands.remove(None)
+            remove_cmds(commands_bled.commands)
             bled_tex = commands_bled
         else:
             bled_tex = cur_fmat.texture_DL
@@ -247,21 +256,18 @@ class BleedGraphics:
                 if self.bleed_individual_cmd(commands_bled, cmd, bleed_state, last_cmd_list):
                     commands_bled.commands[j] = None
             # remove Nones from list
-            while None in commands_bled.commands:
-                commands_bled.commands.remove(None)
+            remove_cmds(commands_bled.commands)
         else:
             commands_bled = self.bleed_cmd_list(cur_fmat.mat_only_DL, bleed_state)
         # some syncs may become redundant after bleeding
         self.optimize_syncs(commands_bled, bleed_state)
         # remove SPEndDisplayList
-        while SPEndDisplayList() in commands_bled.commands:
-            commands_bled.commands.remove(SPEndDisplayList())
+        remove_cmds(commands_bled.commands, SPEndDisplayList())
         return commands_bled.commands
 
     def bleed_tri_group(self, tri_list: GfxList, cur_fmat: fMaterial, bleed_state: int):
         # remove SPEndDisplayList from triGroup
-        while SPEndDisplayList() in tri_list.commands:
-            tri_list.commands.remove(SPEndDisplayList())
+        remove_cmds(tri_list.commands, SPEndDisplayList())
         if not cur_fmat or (cur_fmat.isTexLarge[0] or cur_fmat.isTexLarge[1]):
             tri_list = self.bleed_cmd_list(tri_list, bleed_state)
 
@@ -280,8 +286,7 @@ class BleedGraphics:
             if last_use == cmd or bleed_cmd_status != self.bleed_self_conflict:
                 commands_bled.commands[j] = None
         # remove Nones from list
-        while None in commands_bled.commands:
-            commands_bled.commands.remove(None)
+        remove_cmds(commands_bled.commands)
         return commands_bled
 
     # Put triGroup bleed gfx in the FMesh.draw object
@@ -300,6 +305,97 @@ class BleedGraphics:
             reset_cmd_dict[DPPipeSync] = DPPipeSync()
         [bleed_gfx_lists.add_reset_cmd(cmd, reset_cmd_dict) for cmd in bleed_gfx_lists.bled_mats]
 
+    # reorders the materials of a draw list, so that the following bleed removes as many cmds as possible
+    # only done when the drawing order cannot change the result: z buffered opaque layers and materials,
+    # with preset render modes, and only jumps to display lists
+    def reorder_draws(
+        self,
+        cmd_list: GfxList,
+        last_mat: FMaterial,
+        material_index: dict[GfxList, tuple[bpy.types.Material, FMaterial, bool]],
+        default_render_mode: list[str] = None,
+    ):
+        if default_render_mode is None or not is_render_mode_reorderable(default_render_mode):
+            return
+        if "G_ZBUFFER" not in self.default_set_geo.flagList or "G_ZS_PRIM" in self.default_othermode_L.flagList:
+            return
+        jump_indices = [j for j, cmd in enumerate(cmd_list.commands) if type(cmd) == SPDisplayList]
+        if len(jump_indices) < 2 or jump_indices[-1] - jump_indices[0] + 1 != len(jump_indices):
+            return  # matrices or vertex loads between draws, the order matters
+
+        # each draw is a material jump followed by its tri groups and revert
+        draws: list[tuple[FMaterial, list[SPDisplayList]]] = []
+        for cmd in cmd_list.commands[jump_indices[0] : jump_indices[-1] + 1]:
+            if cmd.displayList.tag & GfxListTag.Material:
+                _, fmat = find_material_from_jump_cmd(material_index, cmd)
+                if fmat is None or not is_material_reorderable(fmat):
+                    return
+                draws.append((fmat, [cmd]))
+            elif len(draws) == 0:
+                return
+            else:
+                draws[-1][1].append(cmd)
+
+        # greedy nearest neighbour, starting from the last material drawn
+        ordered_draws = []
+        remaining = list(draws)
+        cur_fmat = last_mat
+        while remaining:
+            costs = [self.draw_state_cost(cur_fmat, fmat) for fmat, _ in remaining]
+            best = min(range(len(remaining)), key=lambda j: costs[j][0] + costs[j][1] * TMEM_LOAD_COST)
+            ordered_draws.append(remaining.pop(best))
+            cur_fmat = ordered_draws[-1][0]
+
+        for stat_offset, order in ((0, draws), (1, ordered_draws)):
+            cur_fmat = last_mat
+            for fmat, _ in order:
+                cmds, loads = self.draw_state_cost(cur_fmat, fmat)
+                self.draw_order_stats[stat_offset] += cmds
+                self.draw_order_stats[stat_offset + 2] += loads
+                cur_fmat = fmat
+
+        cmd_list.commands[jump_indices[0] : jump_indices[-1] + 1] = [
+            cmd for _, draw_cmds in ordered_draws for cmd in draw_cmds
+        ]
+
+    # estimated (cmds, tmem loads) left after bleeding cur_fmat after last_mat
+    def draw_state_cost(self, last_mat: FMaterial, cur_fmat: FMaterial):
+        if last_mat is cur_fmat:
+            return 0, 0
+        mat_cmds, tex_cmds, tmem_loads = self.get_draw_state_keys(cur_fmat)
+        if last_mat is None:
+            return len(mat_cmds) + len(tex_cmds), len(tmem_loads)
+        last_mat_cmds, last_tex_cmds, last_tmem_loads = self.get_draw_state_keys(last_mat)
+        differing_cmds = [cmd for cmd in mat_cmds if cmd not in last_mat_cmds]
+        # a pipe sync is needed before any changed rdp cmd
+        sync = 1 if any(cmd.startswith("DP") for cmd in differing_cmds) else 0
+        loads = [image for tmem, image in tmem_loads.items() if last_tmem_loads.get(tmem) != image]
+        if not loads:
+            return len(differing_cmds) + sync + len([cmd for cmd in tex_cmds if cmd not in last_tex_cmds]), 0
+        return len(differing_cmds) + sync + len(tex_cmds), len(loads)
+
+    # cmds of a material as comparable strings, computed once per material
+    def get_draw_state_keys(self, fmat: FMaterial):
+        if fmat not in self.draw_state_keys:
+            ignored = (SPEndDisplayList, DPPipeSync, DPLoadSync, DPTileSync)
+            mat_cmds = frozenset(repr(cmd) for cmd in fmat.mat_only_DL.commands if type(cmd) not in ignored)
+            if fmat.isTexLarge[0] or fmat.isTexLarge[1]:
+                # textures are loaded with the triangles
+                tex_cmds, tmem_loads = frozenset(), dict()
+            else:
+                tex_cmds = frozenset(repr(cmd) for cmd in fmat.texture_DL.commands if type(cmd) not in ignored)
+                tmem_loads = {tmem: repr(image) for tmem, image in self.build_tmem_dict(fmat.texture_DL).items()}
+            self.draw_state_keys[fmat] = (mat_cmds, tex_cmds, tmem_loads)
+        return self.draw_state_keys[fmat]
+
+    def report_draw_order(self):
+        cmds_before, cmds_after, loads_before, loads_after = self.draw_order_stats
+        if self.optimize_draw_order and cmds_before + loads_before > 0:
+            print(
+                f"Draw order optimization: about {cmds_before} -> {cmds_after} material cmds, "
+                f"{loads_before} -> {loads_after} TMEM loads"
+            )
+
     # pre processes cmd_list and removes cmds deemed useless. subclass and override if this causes a game specific issue
     def on_bleed_start(self, cmd_list: GfxList):
         # remove SPDisplayList and SPEndDisplayList from FMesh.draw
@@ -327,8 +423,7 @@ class BleedGraphics:
                 cmd_list.commands[j] = None
                 non_jump_dl_cmds.append(cmd)
         # remove Nones from list
-        while None in cmd_list.commands:
-            cmd_list.commands.remove(None)
+        remove_cmds(cmd_list.commands)
         return non_jump_dl_cmds, jump_dl_cmds
 
     def on_tri_group_bleed_end(self, triGroup: FTriGroup, last_mat: FMaterial, bleed_gfx_lists: BleedGfxLists):
@@ -358,8 +453,7 @@ class BleedGraphics:
         no_syncs_needed = {"DPSetPrimColor", "DPSetPrimDepth"}  # will not affect rdp
         syncs_needed = {"SPSetOtherMode"}  # will affect rdp
         if bleed_state == self.bleed_start:
-            while DPPipeSync() in cmd_list.commands:
-                cmd_list.commands.remove(DPPipeSync())
+            remove_cmds(cmd_list.commands, DPPipeSync())
         for cmd in cmd_list.commands:
             cmd_name = type(cmd).__name__
             if cmd == DPPipeSync():
@@ -368,8 +462,7 @@ class BleedGraphics:
                 return
             if cmd_name in syncs_needed:
                 return
-        while DPPipeSync() in cmd_list.commands:
-            cmd_list.commands.remove(DPPipeSync())
+        remove_cmds(cmd_list.commands, DPPipeSync())
 
     def create_reset_cmds(self, reset_cmd_dict: dict[GbiMacro], default_render_mode: list[str]):
         reset_cmds = []
@@ -539,18 +632,87 @@ class BleedGfxLists:
             reset_cmd_dict[type(cmd)] = cmd
 
 
+# weight of a texture load against one material cmd when ordering draws, as the rdp waits for tmem loads
+TMEM_LOAD_COST = 8
+
+
+# z buffered render modes that don't blend with the framebuffer, the only ones where draws can be reordered
+REORDERABLE_RENDER_MODES = {
+    f"{mode}{cycle}"
+    for mode in (
+        "G_RM_ZB_OPA_SURF",
+        "G_RM_AA_ZB_OPA_SURF",
+        "G_RM_RA_ZB_OPA_SURF",
+        "G_RM_AA_ZB_OPA_INTER",
+        "G_RM_AA_ZB_TEX_EDGE",
+        "G_RM_AA_ZB_TEX_INTER",
+        "G_RM_AA_ZB_TEX_TERR",
+    )
+    for cycle in ("", "2")
+}
+# first cycle render modes of two cycle modes, which don't read the framebuffer, the second cycle sets the z mode
+REORDERABLE_FIRST_CYCLE_RENDER_MODES = {"G_RM_FOG_SHADE_A", "G_RM_FOG_PRIM_A", "G_RM_PASS"}
+
+
+def is_render_mode_reorderable(render_mode: list[str]):
+    if len(render_mode) != 2:
+        return False  # custom blender or render mode flags
+    cycle_1, cycle_2 = map(str, render_mode)
+    return cycle_2 in REORDERABLE_RENDER_MODES and (
+        cycle_1 in REORDERABLE_RENDER_MODES or cycle_1 in REORDERABLE_FIRST_CYCLE_RENDER_MODES
+    )
+
+
+# checks the modes set by the material, which can make its draws depend on the order in an opaque layer:
+# blending or non preset render modes, no z buffer, or primitive depth
+def is_material_reorderable(fmat: FMaterial):
+    for cmd in fmat.mat_only_DL.commands:
+        if type(cmd) == DPSetRenderMode and (not cmd.use_preset or not is_render_mode_reorderable(cmd.flagList)):
+            return False
+        if type(cmd) == SPSetOtherMode and cmd.cmd == "G_SETOTHERMODE_L":
+            # alpha compare and depth source, followed by the render mode if the material sets it
+            if "G_ZS_PRIM" in cmd.flagList or (
+                len(cmd.flagList) > 2 and not is_render_mode_reorderable(cmd.flagList[2:])
+            ):
+                return False
+        if type(cmd) == DPSetDepthSource and cmd.src == "G_ZS_PRIM":
+            return False
+        if type(cmd) == SPClearGeometryMode and "G_ZBUFFER" in cmd.flagList:
+            return False
+        if type(cmd) == SPGeometryMode and "G_ZBUFFER" in cmd.clearFlagList:
+            return False
+        if type(cmd) == SPLoadGeometryMode and "G_ZBUFFER" not in cmd.flagList:
+            return False
+    return True
+
+
+# removes every occurence of cmd (by default the None placeholders of removed cmds) in one pass
+def remove_cmds(commands: list[GbiMacro], cmd: GbiMacro = None):
+    if cmd is None:
+        commands[:] = [c for c in commands if c is not None]
+    else:
+        commands[:] = [c for c in commands if c != cmd]
+
+
+# maps material and revert gfx lists to their material, build once per model and pass to find_material_from_jump_cmd
+def build_material_jump_index(fModel: FModel) -> dict[GfxList, tuple[bpy.types.Material, FMaterial, bool]]:
+    material_index = dict()
+    # first material wins, like when searching the materials in order
+    for (bpy_material, _), (fmaterial, _) in fModel.getAllMaterials().items():
+        if fmaterial.revert is not None:
+            material_index.setdefault(fmaterial.revert, (bpy_material, fmaterial, True))
+        material_index.setdefault(fmaterial.material, (bpy_material, fmaterial, False))
+    return material_index
+
+
 # helper function used for sm64
 def find_material_from_jump_cmd(
-    material_list: tuple[tuple[bpy.types.Material, str], tuple[FMaterial, tuple[int, int]]],
+    material_index: dict[GfxList, tuple[bpy.types.Material, FMaterial, bool]],
     dl_jump: SPDisplayList,
 ):
     if dl_jump.displayList.tag & GfxListTag.Geometry:
         return None, None
-    for mat in material_list:
-        fmaterial = mat[1][0]
-        bpy_material = mat[0][0]
-        if dl_jump.displayList.tag == GfxListTag.MaterialRevert and fmaterial.revert == dl_jump.displayList:
-            return bpy_material, fmaterial
-        elif fmaterial.material == dl_jump.displayList:
-            return bpy_material, fmaterial
-    return None, None
+    bpy_material, fmaterial, is_revert = material_index.get(dl_jump.displayList, (None, None, False))
+    if is_revert and dl_jump.displayList.tag != GfxListTag.MaterialRevert:
+        return None, None
+    return bpy_material, fmaterial
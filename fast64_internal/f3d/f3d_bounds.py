@@ -0,0 +1,112 @@
+import bpy
+import numpy as np
+
+from itertools import product
+from typing import Optional
+from mathutils import Matrix
+
+"""
+Bounding volumes of exported geometry, computed on (n, 3) NumPy arrays of vertex positions.
+Used for the culling spheres of OoT rooms and the culling boxes of SM64 display lists.
+"""
+
+sphereTolerance = 1e-9
+
+
+def getMeshVertices(mesh: bpy.types.Mesh) -> np.ndarray:
+    """Returns the (n, 3) positions of the mesh vertices"""
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    return positions.reshape(-1, 3).astype(np.float64)
+
+
+def transformPoints(points: np.ndarray, transform: Matrix) -> np.ndarray:
+    matrix = np.array(transform, dtype=np.float64)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def getCircumsphere(boundary: list[np.ndarray]) -> tuple[np.ndarray, float]:
+    """
+    Returns (center, squared radius) of the smallest sphere with all boundary points (at most 4) on its surface.
+    Degenerate boundaries (collinear or coplanar points) get the least squares solution.
+    """
+    if len(boundary) == 0:
+        return np.zeros(3), -1.0
+
+    origin = boundary[0]
+    if len(boundary) == 1:
+        return origin, 0.0
+
+    # center = origin + sum(factors[i] * edges[i]), equidistant from every boundary point
+    edges = np.array(boundary[1:]) - origin
+    gram = edges @ edges.T
+    factors = np.linalg.lstsq(2 * gram, np.einsum("ij,ij->i", edges, edges), rcond=None)[0]
+    center = origin + factors @ edges
+    return center, max(float(np.sum((point - center) ** 2)) for point in boundary)
+
+
+def getMinimalSphereOfPoints(points: list[np.ndarray], count: int, boundary: list[np.ndarray]):
+    """Welzl's algorithm, returns the minimal sphere containing the first count points with boundary on its surface"""
+    center, radiusSq = getCircumsphere(boundary)
+    if len(boundary) == 4:
+        return center, radiusSq
+    for i in range(count):
+        if np.sum((points[i] - center) ** 2) > radiusSq * (1 + sphereTolerance) + sphereTolerance:
+            center, radiusSq = getMinimalSphereOfPoints(points, i, boundary + [points[i]])
+    return center, radiusSq
+
+
+def getMinimalSphere(points: np.ndarray) -> tuple[np.ndarray, float]:
+    """
+    Returns (center, radius) of the minimal sphere enclosing the (n, 3) points.
+    Welzl's algorithm runs on a small support set, starting with the extreme points along each axis.
+    The point furthest from its sphere is added to the set until the sphere encloses every point,
+    so that the points are only checked with NumPy.
+    """
+    if len(points) == 0:
+        return np.zeros(3), 0.0
+
+    support = list(dict.fromkeys(int(index) for index in (*points.argmin(axis=0), *points.argmax(axis=0))))
+    while True:
+        center, radiusSq = getMinimalSphereOfPoints([points[index] for index in support], len(support), [])
+        distancesSq = np.sum((points - center) ** 2, axis=1)
+        furthest = int(distancesSq.argmax())
+        if distancesSq[furthest] <= radiusSq * (1 + sphereTolerance) + sphereTolerance or furthest in support:
+            return center, float(np.sqrt(max(radiusSq, distancesSq[furthest])))
+        # Points checked first are more likely to be on the final sphere
+        support.insert(0, furthest)
+
+
+def getBoxCorners(origin: np.ndarray, axes: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """Returns the 8 corners of a box, in the same order as Object.bound_box"""
+    corners = []
+    for x, (y, z) in product((0, 1), ((0, 0), (0, 1), (1, 1), (1, 0))):
+        extents = np.array([(low, high)[x][0], (low, high)[y][1], (low, high)[z][2]])
+        corners.append(origin + extents @ axes)
+    return np.array(corners)
+
+
+def getBoxVolume(corners: np.ndarray) -> float:
+    """Volume of a box with its corners in the order of Object.bound_box"""
+    corners = np.asarray(corners, dtype=np.float64)
+    return float(np.prod([np.linalg.norm(corners[index] - corners[0]) for index in (1, 3, 4)]))
+
+
+def getOrientedBox(points: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Returns the 8 corners of a box enclosing the (n, 3) points, oriented along their principal axes,
+    in the same order as Object.bound_box. It is often smaller than the axis aligned box of rotated geometry.
+    """
+    if len(points) == 0:
+        return None
+    origin = points.mean(axis=0)
+    _, axes = np.linalg.eigh(np.cov((points - origin).T) if len(points) > 1 else np.eye(3))
+    axes = axes.T  # rows
+    projected = (points - origin) @ axes.T
+    return getBoxCorners(origin, axes, projected.min(axis=0), projected.max(axis=0))
+
+
+def getSmallestBox(boxes: list) -> np.ndarray:
+    """Returns the box with the smallest volume, boxes are sequences of 8 corners (Object.bound_box, ID properties...)"""
+    boxes = [np.array([tuple(corner) for corner in box], dtype=np.float64) for box in boxes if box is not None]
+    return min(boxes, key=getBoxVolume)
@@ -3,8 +3,11 @@ from __future__ import annotations
 
 from typing import Sequence, Union, Tuple
 from dataclasses import dataclass, fields, field
-import bpy, os, enum, copy
+from functools import partial
+import bpy, os, enum, copy, struct
+import numpy as np
 from ..utility import *
+from ..c_emitter import emitParallel, emitSession, getGameEditorMode
 
 from typing import TYPE_CHECKING
 
@@ -1807,6 +1810,10 @@ def _SHIFTL(value, amount, mask):
 MTX_SIZE = 64
 VTX_SIZE = 16
 GFX_SIZE = 8
+
+# Big endian layouts of a Gfx command and of a Vtx, used to pack binary data without going through each field
+gfxStruct = struct.Struct(">II")
+vtxDtype = np.dtype([("position", ">i2", (3,)), ("flag", ">u2"), ("uv", ">i2", (2,)), ("colorOrNormal", "u1", (4,))])
 VP_SIZE = 16  # it's 16 bytes but vanilla GBI has only one s64 for alignment, not two
 LIGHT_SIZE = 16
 AMBIENT_SIZE = 8
@@ -2033,30 +2040,29 @@ class GfxFormatter:
 
         data = CScrollData()
         data.functionCalls.append(funcName)
-        data.header += f"extern {func};\n"
-        data.source += f"{func} {{\n"
+        data.add_header(f"extern {func};\n")
+        data.add_source(f"{func} {{\n")
 
-        variables = ""
-        code = ""
+        variables = []
+        code = []
         dataIndex = 0
 
         # Since some commands are actually multiple commands in one, we have to use the command size and divide by GFX_SIZE.
         for command in gfxList.commands:
             gfxVariables, gfxCode = self.processGfxScrollCommand(dataIndex // GFX_SIZE, command, gfxList.name)
-            variables += gfxVariables
-            code += gfxCode
+            variables.append(gfxVariables)
+            code.append(gfxCode)
             dataIndex += command.size(f3d)
-        gfxScrollCode = variables + code
+        gfxScrollCode = "".join(variables + code)
 
         if gfxScrollCode == "":
             return CScrollData()
         else:
             if self.seg2virtFuncName is not None:
-                data.source += f"\tGfx *mat = {self.seg2virtFuncName}({gfxList.name});\n"
+                data.add_source(f"\tGfx *mat = {self.seg2virtFuncName}({gfxList.name});\n")
             else:
-                data.source += f"\tGfx *mat = {gfxList.name};\n"
-            data.source += gfxScrollCode
-            data.source += f"\n}};\n\n"
+                data.add_source(f"\tGfx *mat = {gfxList.name};\n")
+            data.add_source(gfxScrollCode, f"\n}};\n\n")
             return data
 
     def processGfxScrollCommand(self, commandIndex: int, command: "GbiMacro", gfxListName: str) -> Tuple[str, str]:
@@ -2100,7 +2106,7 @@ class Vtx:
             self.position[0].to_bytes(2, "big", signed=True)
             + self.position[1].to_bytes(2, "big", signed=True)
             + self.position[2].to_bytes(2, "big", signed=True)
-            + self.packedNormal.to_bytes(2, "big", signed=True)
+            + self.packedNormal.to_bytes(2, "big")
             + uv[0].to_bytes(2, "big", signed=True)
             + uv[1].to_bytes(2, "big", signed=True)
             + bytearray(self.colorOrNormal)
@@ -2134,18 +2140,34 @@ class VtxList:
         return len(self.vertices) * VTX_SIZE
 
     def to_binary(self):
-        data = bytearray(0)
-        for vert in self.vertices:
-            data.extend(vert.to_binary())
-        return data
+        """Packs all vertices at once into a structured array, same layout as Vtx.to_binary"""
+        if len(self.vertices) == 0:
+            return bytearray(0)
+
+        def getField(name, minValue, maxValue):
+            values = np.array([getattr(vert, name) for vert in self.vertices], dtype=np.int64)
+            if values.min() < minValue or values.max() > maxValue:
+                raise PluginError(f"Vertex {name} out of range in {self.name}.")
+            return values
+
+        uv = np.array([vert.uv for vert in self.vertices], dtype=np.int64)
+        data = np.empty(len(self.vertices), dtype=vtxDtype)
+        data["position"] = getField("position", -(2**15), 2**15 - 1)
+        data["flag"] = getField("packedNormal", 0, 2**16 - 1)
+        data["uv"] = np.where(uv >= 0, uv % 2**15, uv % -(2**15))
+        data["colorOrNormal"] = getField("colorOrNormal", 0, 2**8 - 1)
+        return bytearray(data.tobytes())
 
     def to_c(self):
         data = CData()
         data.header = f"extern Vtx {self.name}[{len(self.vertices)}];\n"
-        data.source = f"Vtx {self.name}[{len(self.vertices)}] = {{\n"
-        for vert in self.vertices:
-            data.source += f"\t{vert.to_c()},\n"
-        data.source += "};\n\n"
+        data.source = "".join(
+            [
+                f"Vtx {self.name}[{len(self.vertices)}] = {{\n",
+                *(f"\t{vert.to_c()},\n" for vert in self.vertices),
+                "};\n\n",
+            ]
+        )
         return data
 
 
@@ -2156,20 +2178,39 @@ class GfxList:
         self.startAddress: int = 0
         self.tag: GfxListTag = tag
         self.DLFormat: "DLFormat" = DLFormat
+        # Command sizes computed by set_addr, reused by binary exports until commands are added
+        self.commandSizes: list[int] | None = None
+        self.byteSize: int = 0
 
     def set_addr(self, startAddress, f3d):
         startAddress = get64bitAlignedAddr(startAddress)
         self.startAddress = startAddress
-        print(f"GfxList {self.name}: {str(startAddress)}, {str(self.size(f3d))}")
-        return startAddress, startAddress + self.size(f3d)
+        self.commandSizes = [command.size(f3d) for command in self.commands]
+        self.byteSize = sum(self.commandSizes)
+        print(f"GfxList {self.name}: {str(startAddress)}, {str(self.byteSize)}")
+        return startAddress, startAddress + self.byteSize
 
     def save_binary(self, romfile, f3d, segments):
-        print(f"GfxList {self.name}: {str(self.startAddress)}, {str(self.size(f3d))}")
+        data = self.to_binary(f3d, segments)
+        size = self.get_size(f3d)
+        if len(data) != size:
+            raise PluginError(f"GfxList {self.name} is {len(data)} bytes, but {size} bytes were allocated.")
+        print(f"GfxList {self.name}: {str(self.startAddress)}, {str(len(data))}")
         romfile.seek(self.startAddress)
-        romfile.write(self.to_binary(f3d, segments))
+        romfile.write(data)
+
+    def get_command_sizes(self, f3d) -> list[int]:
+        if self.commandSizes is None or len(self.commandSizes) != len(self.commands):
+            return [command.size(f3d) for command in self.commands]
+        return self.commandSizes
+
+    def get_size(self, f3d) -> int:
+        if self.commandSizes is None or len(self.commandSizes) != len(self.commands):
+            return self.size(f3d)
+        return self.byteSize
 
     def size(self, f3d):
-        return sum([command.size(f3d) for command in self.commands])
+        return sum(command.size(f3d) for command in self.commands)
 
     # Size, including display lists called with SPDisplayList
     def size_total(self, f3d):
@@ -2178,40 +2219,41 @@ class GfxList:
 
         return sum(
             [
-                command.displayList.size_total(f3d) if use_siz_tot(command) else command.size(f3d)
-                for command in self.commands
+                command.displayList.size_total(f3d) if use_siz_tot(command) else commandSize
+                for command, commandSize in zip(self.commands, self.get_command_sizes(f3d))
             ]
         )
 
     def get_ptr_addresses(self, f3d):
         ptrs = []
         address = self.startAddress
-        for command in self.commands:
+        for command, commandSize in zip(self.commands, self.get_command_sizes(f3d)):
             if type(command) in F3DClassesWithPointers:
                 for offset in command.get_ptr_offsets(f3d):
                     ptrs.append(address + offset)
-            address += command.size(f3d)
+            address += commandSize
         return ptrs
 
     def to_binary(self, f3d, segments):
-        data = bytearray(0)
-        for command in self.commands:
-            data.extend(command.to_binary(f3d, segments))
-        return data
+        return bytearray(0).join(command.to_binary(f3d, segments) for command in self.commands)
 
     def to_c_static(self):
-        data = f"Gfx {self.name}[] = {{\n"
-        for command in self.commands:
-            data += f"\t{command.to_c(True)},\n"
-        data += "};\n\n"
-        return data
+        return "".join(
+            [
+                f"Gfx {self.name}[] = {{\n",
+                *(f"\t{command.to_c(True)},\n" for command in self.commands),
+                "};\n\n",
+            ]
+        )
 
     def to_c_dynamic(self):
-        data = f"Gfx* {self.name}(Gfx* glistp) {{\n"
-        for command in self.commands:
-            data += f"\t{command.to_c(False)};\n"
-        data += "\treturn glistp;\n}\n\n"
-        return data
+        return "".join(
+            [
+                f"Gfx* {self.name}(Gfx* glistp) {{\n",
+                *(f"\t{command.to_c(False)};\n" for command in self.commands),
+                "\treturn glistp;\n}\n\n",
+            ]
+        )
 
     def to_c(self, f3d):
         data = CData()
@@ -2325,6 +2367,56 @@ class FPaletteKey:
         return self.palFormat == __o.palFormat and self.imagesSharingPalette == __o.imagesSharingPalette
 
 
+class BinaryBuffer:
+    """
+    Collects the seek / write calls of a binary export, then writes them to the file with one write per contiguous run.
+    Gaps up to maxGap bytes between writes (alignment padding) keep the bytes already in the file.
+    """
+
+    def __init__(self, file, maxGap: int = 0x10):
+        self.file = file
+        self.maxGap = maxGap
+        self.position = 0
+        self.writes: list[tuple[int, bytes]] = []
+
+    def seek(self, offset: int):
+        self.position = offset
+
+    def tell(self):
+        return self.position
+
+    def write(self, data):
+        if len(data) > 0:
+            self.writes.append((self.position, data))
+            self.position += len(data)
+
+    def getRuns(self) -> list[tuple[int, int, list[int]]]:
+        """Returns (start, end, write indices) of each contiguous run"""
+        runs = []
+        for index in sorted(range(len(self.writes)), key=lambda index: self.writes[index][0]):
+            offset, data = self.writes[index]
+            if len(runs) > 0 and offset <= runs[-1][1] + self.maxGap:
+                start, end, indices = runs[-1]
+                runs[-1] = (start, max(end, offset + len(data)), indices)
+                indices.append(index)
+            else:
+                runs.append((offset, offset + len(data), [index]))
+        return runs
+
+    def flush(self):
+        for start, end, indices in self.getRuns():
+            self.file.seek(start)
+            run = bytearray(self.file.read(end - start))
+            run.extend(bytes(end - start - len(run)))
+            # Overlapping writes are applied in the order they were made
+            for index in sorted(indices):
+                offset, data = self.writes[index]
+                run[offset - start : offset - start + len(data)] = data
+            self.file.seek(start)
+            self.file.write(run)
+        self.writes.clear()
+
+
 class FModel:
     def __init__(
         self,
@@ -2360,6 +2452,8 @@ class FModel:
         self.no_light_direction = False
         self.global_data: FGlobalData = FGlobalData()
         self.texturesSavedLastExport: int = 0  # hacky
+        # large texture tile loads, [faces, distinct texel regions, packed loads, texels loaded]
+        self.tileLoadStats: list[int] = [0, 0, 0, 0]
 
     def processTexRefNonCITextures(self, fMaterial: FMaterial, material: bpy.types.Material, index: int):
         """
@@ -2594,6 +2688,12 @@ class FModel:
         return startAddress, addrRange[1]
 
     def save_binary(self, romfile, segments):
+        if not isinstance(romfile, BinaryBuffer):
+            binaryBuffer = BinaryBuffer(romfile)
+            self.save_binary(binaryBuffer, segments)
+            binaryBuffer.flush()
+            return
+
         for name, light in self.lights.items():
             light.save_binary(romfile)
         for _, fImage in self.textures.items():
@@ -2621,11 +2721,13 @@ class FModel:
         if len(texDir) > 0 and texDir[-1] != "/":
             texDir += "/"
         data = CData()
-        for _, fImage in self.textures.items():
-            if savePNG:
+        if savePNG:
+            for _, fImage in self.textures.items():
                 data.append(fImage.to_c_tex_separate(texDir, texArrayBitSize))
-            else:
-                data.append(fImage.to_c(texArrayBitSize))
+        else:
+            # Formatting texture data is the slowest part of C generation, so it is spread over the C export workers
+            for texData in emitParallel([partial(fImage.to_c, texArrayBitSize) for fImage in self.textures.values()]):
+                data.append(texData)
         return data
 
     def to_c_materials(self, gfxFormatter):
@@ -2641,6 +2743,13 @@ class FModel:
         return data
 
     def to_c(self, textureExportSettings: TextureExportSettings, gfxFormatter: GfxFormatter):
+        with emitSession():
+            exportData = self.generate_c(textureExportSettings, gfxFormatter)
+        self.save_c_textures(textureExportSettings)
+        return exportData
+
+    def generate_c(self, textureExportSettings: TextureExportSettings, gfxFormatter: GfxFormatter):
+        """Same as to_c without saving textures, doesn't access bpy so that it can run in a C export worker"""
         texCSeparate = textureExportSettings.texCSeparate
         savePNG = textureExportSettings.savePNG
         texDir = textureExportSettings.includeDir
@@ -2653,11 +2762,11 @@ class FModel:
         staticData.append(self.to_c_lights())
 
         texData = self.to_c_textures(texCSeparate, savePNG, texDir, gfxFormatter.texArrayBitSize)
-        staticData.header += texData.header
+        staticData.add_header(texData.header)
         if texCSeparate:
-            texC.source += texData.source
+            texC.add_source(texData.source)
         else:
-            staticData.source += texData.source
+            staticData.add_source(texData.source)
 
         dynamicData.append(self.to_c_materials(gfxFormatter))
 
@@ -2672,12 +2781,24 @@ class FModel:
             dynamicData.append(meshDynamic)
 
         dynamicData.append(self.to_c_material_revert(gfxFormatter))
+        return ExportCData(staticData, dynamicData, texC)
 
-        if savePNG:
+    def save_c_textures(self, textureExportSettings: TextureExportSettings):
+        """Saves the PNG textures included by the C data of generate_c"""
+        if textureExportSettings.savePNG:
             self.texturesSavedLastExport = self.save_textures(textureExportSettings.exportPath)
 
         self.freePalettes()
-        return ExportCData(staticData, dynamicData, texC)
+        self.reportTileLoads()
+
+    def reportTileLoads(self):
+        faces, regions, loads, texels = self.tileLoadStats
+        if faces > 0:
+            print(
+                f"Large texture tile loads: {faces} faces in {regions} texel regions, "
+                f"packed into {loads} loads of {texels} texels"
+            )
+        self.tileLoadStats = [0, 0, 0, 0]
 
     def to_c_scroll(self, funcName: str, gfxFormatter: GfxFormatter) -> CScrollData:
         data = CScrollData()
@@ -2690,12 +2811,11 @@ class FModel:
             data.append(gfxScrollData)
 
         data.topLevelScrollFunc = f"scroll_{funcName}"
-        data.source += f"void {data.topLevelScrollFunc}() {{\n"
-        for scrollFunc in data.functionCalls:
-            data.source += f"\t{scrollFunc}();\n"
-        data.source += f"}};\n"
+        data.add_source(f"void {data.topLevelScrollFunc}() {{\n")
+        data.add_source(*(f"\t{scrollFunc}();\n" for scrollFunc in data.functionCalls))
+        data.add_source(f"}};\n")
 
-        data.header += f"extern void {data.topLevelScrollFunc}();\n"
+        data.add_header(f"extern void {data.topLevelScrollFunc}();\n")
         return data
 
     def to_c_vertex_scroll(self, gfxFormatter: GfxFormatter) -> CScrollData:
@@ -3229,10 +3349,9 @@ class Lights:
         data = CData()
         data.header = f"extern Lights{str(len(self.l))} {self.name};\n"
         data.source = f"Lights{str(len(self.l))} {self.name} = gdSPDefLights{str(len(self.l))}(\n"
-        data.source += "\t" + self.a.to_c()
-        for light in self.l:
-            data.source += ",\n\t" + light.to_c()
-        data.source += ");\n\n"
+        data.add_source("\t" + self.a.to_c())
+        data.add_source(*(",\n\t" + light.to_c() for light in self.l))
+        data.add_source(");\n\n")
         return data
 
 
@@ -3303,10 +3422,8 @@ class FImage:
 
         # This is to force 8 byte alignment
         if bitsPerValue != 64:
-            code.source = f"Gfx {self.name}_aligner[] = {{gsSPEndDisplayList()}};\n"
-        code.source += f"u{str(bitsPerValue)} {self.name}[] = {{\n\t"
-        code.source += texData
-        code.source += "\n};\n\n"
+            code.add_source(f"Gfx {self.name}_aligner[] = {{gsSPEndDisplayList()}};\n")
+        code.add_source(f"u{str(bitsPerValue)} {self.name}[] = {{\n\t", texData, "\n};\n\n")
         return code
 
     def to_c_data(self, bitsPerValue):
@@ -3320,27 +3437,27 @@ class FImage:
         remainderCount = len(self.data) - numValues * bytesPerValue
         digits = 2 + 2 * bytesPerValue
 
-        code = "".join(
-            [
-                format(
-                    int.from_bytes(self.data[i * bytesPerValue : (i + 1) * bytesPerValue], "big"),
-                    "#0" + str(digits) + "x",
-                )
-                + ", "
-                + ("\n\t" if i % 8 == 7 else "")
-                for i in range(numValues)
-            ]
-        )
+        code = [
+            format(
+                int.from_bytes(self.data[i * bytesPerValue : (i + 1) * bytesPerValue], "big"),
+                "#0" + str(digits) + "x",
+            )
+            + ", "
+            + ("\n\t" if i % 8 == 7 else "")
+            for i in range(numValues)
+        ]
 
         if remainderCount > 0:
             start = numValues * bytesPerValue
             end = (numValues + 1) * bytesPerValue
-            code += format(
-                int.from_bytes(self.data[start:end], "big") << (8 * (bytesPerValue - remainderCount)),
-                "#0" + str(digits) + "x",
+            code.append(
+                format(
+                    int.from_bytes(self.data[start:end], "big") << (8 * (bytesPerValue - remainderCount)),
+                    "#0" + str(digits) + "x",
+                )
             )
 
-        return code
+        return "".join(code)
 
     def set_addr(self, startAddress):
         startAddress = get64bitAlignedAddr(startAddress)
@@ -3356,19 +3473,19 @@ class FImage:
 # second arg of Dma is a pointer.
 def gsDma0p(c, s, l):
     words = _SHIFTL(c, 24, 8) | _SHIFTL(l, 0, 24), int(s)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsDma1p(c, s, l, p):
     words = _SHIFTL(c, 24, 8) | _SHIFTL(p, 16, 8) | _SHIFTL(l, 0, 16), int(s)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsDma2p(c, adrs, length, idx, ofs):
     words = _SHIFTL(c, 24, 8) | _SHIFTL((length - 1) / 8, 19, 5) | _SHIFTL(ofs / 8, 8, 8) | _SHIFTL(idx, 0, 8), int(
         adrs
     )
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsSPNoOp(f3d):
@@ -3405,7 +3522,7 @@ class GbiMacro:
 
     def getattr_virtual(self, field, static):
         if hasattr(field, "name"):
-            if self._segptrs and not static and bpy.context.scene.gameEditorMode == "Homebrew":
+            if self._segptrs and not static and getGameEditorMode() == "Homebrew":
                 return f"segmented_to_virtual({field.name})"
             if self._ptr_amp:
                 return f"&{field.name}"
@@ -3465,7 +3582,7 @@ class SPVertex(GbiMacro):
                 vertPtr,
             )
 
-            return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+            return gfxStruct.pack(*words)
 
         elif f3d.F3DEX_GBI or f3d.F3DLP_GBI:
             return gsDma1p(f3d.G_VTX, vertPtr, (self.count << 10) | (VTX_SIZE * self.count - 1), self.index * 2)
@@ -3475,7 +3592,7 @@ class SPVertex(GbiMacro):
 
     def to_c(self, static=True):
         header = "gsSPVertex(" if static else "gSPVertex(glistp++, "
-        if not static and bpy.context.scene.gameEditorMode == "Homebrew":
+        if not static and getGameEditorMode() == "Homebrew":
             header += "segmented_to_virtual(" + self.vertList.name + " + " + str(self.offset) + ")"
         else:
             header += self.vertList.name + " + " + str(self.offset)
@@ -3513,7 +3630,7 @@ class SPDisplayList(GbiMacro):
             return "gsSPDisplayList(" + self.displayList.name + ")"
         elif self.displayList.DLFormat == DLFormat.Static:
             header = "gSPDisplayList(glistp++, "
-            if bpy.context.scene.gameEditorMode == "Homebrew":
+            if getGameEditorMode() == "Homebrew":
                 return header + "segmented_to_virtual(" + self.displayList.name + "))"
             else:
                 return header + self.displayList.name + ")"
@@ -3535,7 +3652,7 @@ class SPBranchList(GbiMacro):
 class SPEndDisplayList(GbiMacro):
     def to_binary(self, f3d, segments):
         words = _SHIFTL(f3d.G_ENDDL, 24, 8), 0
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 # SPSprite2DBase
@@ -3544,28 +3661,28 @@ class SPEndDisplayList(GbiMacro):
 # RSP short command (no DMA required) macros
 def gsImmp0(c):
     words = _SHIFTL((c), 24, 8), 0
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsImmp1(c, p0):
     words = _SHIFTL((c), 24, 8), int(p0)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsImmp2(c, p0, p1):
     words = _SHIFTL((c), 24, 8), _SHIFTL((p0), 16, 16) | _SHIFTL((p1), 8, 8)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsImmp3(c, p0, p1, p2):
     words = _SHIFTL((c), 24, 8), (_SHIFTL((p0), 16, 16) | _SHIFTL((p1), 8, 8) | _SHIFTL((p2), 0, 8))
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 # last arg of Immp21 is a pointer.
 def gsImmp21(c, p0, p1, dat):
     words = _SHIFTL((c), 24, 8) | _SHIFTL((p0), 8, 16) | _SHIFTL((p1), 0, 8), int(dat)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsMoveWd(index, offset, data, f3d):
@@ -3655,7 +3772,7 @@ class SP1Triangle(GbiMacro):
         else:
             words = _SHIFTL(f3d.G_TRI1, 24, 8), _gsSP1Triangle_w1f(self.v0, self.v1, self.v2, self.flag, f3d)
 
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -3671,7 +3788,7 @@ class SPLine3D(GbiMacro):
             words = _SHIFTL(f3d.G_LINE3D, 24, 8) | _gsSPLine3D_w1f(self.v0, self.v1, 0, self.flag, f3d), 0
         else:
             words = _SHIFTL(f3d.G_LINE3D, 24, 8), _gsSPLine3D_w1f(self.v0, self.v1, 0, self.flag, f3d)
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -3688,7 +3805,7 @@ class SPLineW3D(GbiMacro):
             words = _SHIFTL(f3d.G_LINE3D, 24, 8) | _gsSPLine3D_w1f(self.v0, self.v1, self.wd, self.flag, f3d), 0
         else:
             words = _SHIFTL(f3d.G_LINE3D, 24, 8), _gsSPLine3D_w1f(self.v0, self.v1, self.wd, self.flag, f3d)
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 # SP1Quadrangle
@@ -3713,7 +3830,7 @@ class SP2Triangles(GbiMacro):
         else:
             raise PluginError("SP2Triangles not available in Fast3D.")
 
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 # F3DEX3 TODO: Encoding of _g*SP5Triangles commands (SPTriangleStrip, SPTriangleFan)
@@ -3730,7 +3847,7 @@ class SPCullDisplayList(GbiMacro):
             words = _SHIFTL(f3d.G_CULLDL, 24, 8) | _SHIFTL((self.vstart) * 2, 0, 16), _SHIFTL((self.vend) * 2, 0, 16)
         else:
             words = _SHIFTL(f3d.G_CULLDL, 24, 8) | ((0x0F & (self.vstart)) * 40), ((0x0F & ((self.vend) + 1)) * 40)
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -3959,7 +4076,7 @@ class SPModifyVertex(GbiMacro):
                 _SHIFTL(f3d.G_MODIFYVTX, 24, 8) | _SHIFTL((self.where), 16, 8) | _SHIFTL((self.vtx) * 2, 0, 16),
                 self.val,
             )
-            return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+            return gfxStruct.pack(*words)
         else:
             return gsMoveWd(f3d.G_MW_POINTS, (self.vtx) * 40 + (self.where), self.val, f3d)
 
@@ -3983,12 +4100,7 @@ class SPBranchLessZraw(GbiMacro):
             self.zval,
         )
 
-        return (
-            words0[0].to_bytes(4, "big")
-            + words0[1].to_bytes(4, "big")
-            + words1[0].to_bytes(4, "big")
-            + words1[1].to_bytes(4, "big")
-        )
+        return gfxStruct.pack(*words0) + gfxStruct.pack(*words1)
 
     def size(self, f3d):
         return GFX_SIZE * 2
@@ -4104,7 +4216,7 @@ class SPSetLights(GbiMacro):
     def to_c(self, static=True):
         n = len(self.lights.l)
         header = f"gsSPSetLights{n}(" if static else f"gSPSetLights{n}(glistp++, "
-        if not static and bpy.context.scene.gameEditorMode == "Homebrew":
+        if not static and getGameEditorMode() == "Homebrew":
             header += f"(*(Lights{n}*) segmented_to_virtual(&{self.lights.name}))"
         else:
             header += self.lights.name
@@ -4239,7 +4351,7 @@ class SPTexture(GbiMacro):
                 | _SHIFTL((self.on), 0, 8)
             ), (_SHIFTL((self.s), 16, 16) | _SHIFTL((self.t), 0, 16))
 
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 # SPTextureL
@@ -4262,12 +4374,12 @@ class SPPerspNormalize(GbiMacro):
 
 def gsSPGeometryMode_F3DEX_GBI_2(c, s, f3d):
     words = (_SHIFTL(f3d.G_GEOMETRYMODE, 24, 8) | _SHIFTL(~c, 0, 24)), s
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsSPGeometryMode_Non_F3DEX_GBI_2(word, f3d):
     words = _SHIFTL(f3d.G_SETGEOMETRYMODE, 24, 8), word
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def geoFlagListToWord(flagList, f3d):
@@ -4309,7 +4421,7 @@ class SPSetGeometryMode(GbiMacro):
             return gsSPGeometryMode_F3DEX_GBI_2(0, word, f3d)
         else:
             words = _SHIFTL(f3d.G_SETGEOMETRYMODE, 24, 8), word
-            return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+            return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4322,7 +4434,7 @@ class SPClearGeometryMode(GbiMacro):
             return gsSPGeometryMode_F3DEX_GBI_2(word, 0, f3d)
         else:
             words = _SHIFTL(f3d.G_CLEARGEOMETRYMODE, 24, 8), word
-            return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+            return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4342,7 +4454,7 @@ def gsSPSetOtherMode(cmd, sft, length, data, f3d):
         words = _SHIFTL(cmd, 24, 8) | _SHIFTL(32 - (sft) - (length), 8, 8) | _SHIFTL((length) - 1, 0, 8), data
     else:
         words = _SHIFTL(cmd, 24, 8) | _SHIFTL(sft, 8, 8) | _SHIFTL(length, 0, 8), (data)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4644,7 +4756,7 @@ class DPSetRenderMode(GbiMacro):
 
 def gsSetImage(cmd, fmt, siz, width, i):
     words = _SHIFTL(cmd, 24, 8) | _SHIFTL(fmt, 21, 3) | _SHIFTL(siz, 19, 2) | _SHIFTL((width) - 1, 0, 12), i
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 # DPSetColorImage
@@ -4668,7 +4780,7 @@ class DPSetTextureImage(GbiMacro):
 
 def gsDPSetCombine(muxs0, muxs1, f3d):
     words = _SHIFTL(f3d.G_SETCOMBINE, 24, 8) | _SHIFTL(muxs0, 0, 24), muxs1
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def GCCc0w0(saRGB0, mRGB0, saA0, mA0):
@@ -4729,7 +4841,7 @@ class DPSetCombineMode(GbiMacro):
             ACMUXDict[self.Ab1],
             ACMUXDict[self.Ad1],
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
     def to_c(self, static=True):
         if static:
@@ -4740,7 +4852,7 @@ class DPSetCombineMode(GbiMacro):
 
 def gsDPSetColor(c, d):
     words = _SHIFTL(c, 24, 8), d
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def sDPRGBColor(cmd, r, g, b, a):
@@ -4810,7 +4922,7 @@ class DPSetPrimColor(GbiMacro):
         words = (_SHIFTL(f3d.G_SETPRIMCOLOR, 24, 8) | _SHIFTL(self.m, 8, 8) | _SHIFTL(self.l, 0, 8)), (
             _SHIFTL(self.r, 24, 8) | _SHIFTL(self.g, 16, 8) | _SHIFTL(self.b, 8, 8) | _SHIFTL(self.a, 0, 8)
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4864,14 +4976,14 @@ class DPSetOtherMode(GbiMacro):
         for mode in self.mode1:
             mode1 |= getattr(f3d, str(mode), mode)
         words = _SHIFTL(f3d.G_RDPSETOTHERMODE, 24, 8) | _SHIFTL(mode0, 0, 24), mode1
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 def gsDPLoadTileGeneric(c, tile, uls, ult, lrs, lrt):
     words = _SHIFTL(c, 24, 8) | _SHIFTL(uls, 12, 12) | _SHIFTL(ult, 0, 12), _SHIFTL(tile, 24, 3) | _SHIFTL(
         lrs, 12, 12
     ) | _SHIFTL(lrt, 0, 12)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4936,7 +5048,7 @@ class DPSetTile(GbiMacro):
             | _SHIFTL(self.masks, 4, 4)
             | _SHIFTL(self.shifts, 0, 4)
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
     def is_LOADTILE(self, f3d):
         return self.tile == f3d.G_TX_LOADTILE
@@ -4956,7 +5068,7 @@ class DPLoadBlock(GbiMacro):
             | _SHIFTL((min(self.lrs, f3d.G_TX_LDBLK_MAX_TXL)), 12, 12)
             | _SHIFTL(self.dxt, 0, 12)
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4966,7 +5078,7 @@ class DPLoadTLUTCmd(GbiMacro):
 
     def to_binary(self, f3d, segments):
         words = _SHIFTL(f3d.G_LOADTLUT, 24, 8), _SHIFTL((self.tile), 24, 3) | _SHIFTL((self.count), 14, 10)
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -5503,7 +5615,7 @@ class DPSetConvert(GbiMacro):
         words = (
             _SHIFTL(f3d.G_SETCONVERT, 24, 8) | _SHIFTL(self.k0, 13, 9) | _SHIFTL(self.k1, 4, 9) | _SHIFTL(self.k2, 5, 4)
         ), (_SHIFTL(self.k2, 27, 5) | _SHIFTL(self.k3, 18, 9) | _SHIFTL(self.k4, 9, 9) | _SHIFTL(self.k5, 0, 9))
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -5516,7 +5628,7 @@ class DPSetKeyR(GbiMacro):
         words = _SHIFTL(f3d.G_SETKEYR, 24, 8), _SHIFTL(self.wR, 16, 12) | _SHIFTL(self.cR, 8, 8) | _SHIFTL(
             self.sR, 0, 8
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -5532,17 +5644,17 @@ class DPSetKeyGB(GbiMacro):
         words = (_SHIFTL(f3d.G_SETKEYGB, 24, 8) | _SHIFTL(self.wG, 12, 12) | _SHIFTL(self.wB, 0, 12)), (
             _SHIFTL(self.cG, 24, 8) | _SHIFTL(self.sG, 16, 8) | _SHIFTL(self.cB, 8, 8) | _SHIFTL(self.sB, 0, 8)
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return gfxStruct.pack(*words)
 
 
 def gsDPNoParam(cmd):
     words = _SHIFTL(cmd, 24, 8), 0
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 def gsDPParam(cmd, param):
     words = _SHIFTL(cmd, 24, 8), (param)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return gfxStruct.pack(*words)
 
 
 # gsDPTextureRectangle
@@ -4962,9 +4962,8 @@ def savePresets():
     for subdir, presets in material_presets.items():
         for filename, preset in presets.items():
             filepath = getF3DPresetPath(filename, "f3d/" + subdir)
-            file_preset = open(filepath, "w", encoding="utf-8")
-            file_preset.write(preset)
-            file_preset.close()
+            # Unchanged presets are not rewritten on every startup
+            writeFileIfChanged(filepath, preset)
 
 
 def mat_register():
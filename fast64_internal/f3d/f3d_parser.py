@@ -14,7 +14,9 @@ from .f3d_material import (
     F3DMaterialHash,
 )
 from .f3d_writer import BufferVertex, F3DVert
+from .f3d_symbol_index import getSymbolIndex, getIncludePath
 from ..utility import *
+from ..rom_image import RomImage, segmentedToRomAddress
 import ast
 from .f3d_material_helpers import F3DMaterial_UpdateLock
 
@@ -102,11 +104,11 @@ def cmdToPositiveInt(cmd):
     return cmd if cmd >= 0 else 256 + cmd
 
 
-def parseF3DBinary(romfile, startAddress, scene, bMesh, obj, transformMatrix, groupName, segmentData, vertexBuffer):
+def parseF3DBinary(
+    romfile: RomImage, startAddress, scene, bMesh, obj, transformMatrix, groupName, segmentData, vertexBuffer
+):
     f3d = F3D("F3D")
     currentAddress = startAddress
-    romfile.seek(currentAddress)
-    command = romfile.read(8)
 
     faceSeq = bMesh.faces
     vertSeq = bMesh.verts
@@ -124,57 +126,59 @@ def parseF3DBinary(romfile, startAddress, scene, bMesh, obj, transformMatrix, gr
     vertList = []
 
     while len(jumps) > 0:
+        # The second word holds the arguments of every command handled here
+        opcode = romfile.u8(currentAddress)
+        word = romfile.u32(currentAddress + 4)
+
         # FD, FC, B7 (tex, shader, geomode)
-        # print(format(command[0], '#04x') + ' at ' + hex(currentAddress))
-        if command[0] == cmdToPositiveInt(f3d.G_TRI1):
+        # print(format(opcode, '#04x') + ' at ' + hex(currentAddress))
+        if opcode == cmdToPositiveInt(f3d.G_TRI1):
             try:
                 newVerts = interpretDrawTriangle(
-                    command, vertexBuffer, faceSeq, vertSeq, uv_layer, deform_layer, groupIndex
+                    word, vertexBuffer, faceSeq, vertSeq, uv_layer, deform_layer, groupIndex
                 )
                 vertList.extend(newVerts)
             except TypeError:
                 print("Ignoring triangle from unloaded vertices.")
 
-        elif command[0] == cmdToPositiveInt(f3d.G_VTX):
-            interpretLoadVertices(romfile, vertexBuffer, transformMatrix, command, segmentData)
+        elif opcode == cmdToPositiveInt(f3d.G_VTX):
+            interpretLoadVertices(
+                romfile, vertexBuffer, transformMatrix, romfile.u32(currentAddress), word, segmentData
+            )
 
         # Note: size can usually be indicated in LoadTile / LoadBlock.
-        elif command[0] == cmdToPositiveInt(f3d.G_SETTILESIZE):
-            textureSize = interpretSetTileSize(int.from_bytes(command[4:8], "big"))
+        elif opcode == cmdToPositiveInt(f3d.G_SETTILESIZE):
+            textureSize = interpretSetTileSize(word)
 
-        elif command[0] == cmdToPositiveInt(f3d.G_DL):
-            if command[1] == 0:
+        elif opcode == cmdToPositiveInt(f3d.G_DL):
+            if romfile.u8(currentAddress + 1) == 0:
                 jumps.append(currentAddress)
-            currentAddress = decodeSegmentedAddr(command[4:8], segmentData=segmentData)
-            romfile.seek(currentAddress)
-            command = romfile.read(8)
+            currentAddress = segmentedToRomAddress(word, segmentData)
             continue
 
-        elif command[0] == cmdToPositiveInt(f3d.G_ENDDL):
+        elif opcode == cmdToPositiveInt(f3d.G_ENDDL):
             currentAddress = jumps.pop()
 
-        elif command[0] == cmdToPositiveInt(f3d.G_SETGEOMETRYMODE):
+        elif opcode == cmdToPositiveInt(f3d.G_SETGEOMETRYMODE):
             pass
-        elif command[0] == cmdToPositiveInt(f3d.G_SETCOMBINE):
+        elif opcode == cmdToPositiveInt(f3d.G_SETCOMBINE):
             pass
 
-        elif command[0] == cmdToPositiveInt(f3d.G_SETTIMG):
-            currentTextureAddr = interpretSetTImage(command, segmentData)
+        elif opcode == cmdToPositiveInt(f3d.G_SETTIMG):
+            currentTextureAddr = interpretSetTImage(word, segmentData)
 
-        elif command[0] == cmdToPositiveInt(f3d.G_LOADBLOCK):
+        elif opcode == cmdToPositiveInt(f3d.G_LOADBLOCK):
             # for now only 16bit RGBA is supported.
-            interpretLoadBlock(command, romfile, currentTextureAddr, textureSize, "RGBA", 16)
+            interpretLoadBlock(word, romfile, currentTextureAddr, textureSize, "RGBA", 16)
 
-        elif command[0] == cmdToPositiveInt(f3d.G_SETTILE):
-            interpretSetTile(int.from_bytes(command[4:8], "big"), None)
+        elif opcode == cmdToPositiveInt(f3d.G_SETTILE):
+            interpretSetTile(word, None)
 
         else:
             pass
-            # print(format(command[0], '#04x') + ' at ' + hex(currentAddress))
+            # print(format(opcode, '#04x') + ' at ' + hex(currentAddress))
 
         currentAddress += 8
-        romfile.seek(currentAddress)
-        command = romfile.read(8)
 
     bmesh.ops.remove_doubles(bMesh, verts=vertList, dist=0.0001)
     return vertexBuffer
@@ -248,22 +252,19 @@ def interpretSetTileSize(data):
     return (width, height)
 
 
-def interpretLoadVertices(romfile, vertexBuffer, transformMatrix, command, segmentData=None):
-    command = int.from_bytes(command, "big", signed=True)
-
-    numVerts = bitMask(command, 52, 4) + 1
-    startIndex = bitMask(command, 48, 4)
-    dataLength = bitMask(command, 32, 16)
-    segmentedAddr = bitMask(command, 0, 32)
-
-    dataStartAddr = decodeSegmentedAddr(segmentedAddr.to_bytes(4, "big"), segmentData=segmentData)
+def interpretLoadVertices(
+    romfile: RomImage, vertexBuffer, transformMatrix, commandWord, segmentedAddr, segmentData=None
+):
+    numVerts = bitMask(commandWord, 20, 4) + 1
+    startIndex = bitMask(commandWord, 16, 4)
 
-    romfile.seek(dataStartAddr)
-    data = romfile.read(dataLength)
+    dataStartAddr = segmentedToRomAddress(segmentedAddr, segmentData)
+    data = romfile.readBytes(dataStartAddr, numVerts * 16)
+    positions = romfile.s16Array(dataStartAddr, numVerts * 8).reshape(numVerts, 8)[:, 0:3]
+    positions = positions / bpy.context.scene.fast64.sm64.blender_to_sm64_scale
 
     for i in range(numVerts):
-        vert = Vector(readVectorFromShorts(data, i * 16))
-        vert = transformMatrix @ vert
+        vert = transformMatrix @ Vector(positions[i].tolist())
         transformedVert = bytearray(6)
         writeVectorToShorts(transformedVert, 0, vert)
 
@@ -274,12 +275,15 @@ def interpretLoadVertices(romfile, vertexBuffer, transformMatrix, command, segme
 
 # Note the divided by 0x0A, which is due to the way BF command stores indices.
 # Without this the triangles are drawn incorrectly.
-def interpretDrawTriangle(command, vertexBuffer, faceSeq, vertSeq, uv_layer, deform_layer, groupIndex):
+def interpretDrawTriangle(commandWord, vertexBuffer, faceSeq, vertSeq, uv_layer, deform_layer, groupIndex):
     verts = [None, None, None]
 
-    index0 = int(command[5] / 0x0A)
-    index1 = int(command[6] / 0x0A)
-    index2 = int(command[7] / 0x0A)
+    indices = [
+        bitMask(commandWord, 16, 8) // 0x0A,
+        bitMask(commandWord, 8, 8) // 0x0A,
+        bitMask(commandWord, 0, 8) // 0x0A,
+    ]
+    index0, index1, index2 = indices
 
     vert0 = Vector(getPosition(vertexBuffer, index0))
     vert1 = Vector(getPosition(vertexBuffer, index1))
@@ -297,19 +301,18 @@ def interpretDrawTriangle(command, vertexBuffer, faceSeq, vertSeq, uv_layer, def
 
     loopIndex = 0
     for loop in tri.loops:
-        loop[uv_layer].uv = Vector(getUV(vertexBuffer, int(command[5 + loopIndex] / 0x0A)))
+        loop[uv_layer].uv = Vector(getUV(vertexBuffer, indices[loopIndex]))
         loopIndex += 1
 
     return verts
 
 
-def interpretSetTImage(command, levelData):
-    segmentedAddr = command[4:8]
-    return decodeSegmentedAddr(segmentedAddr, levelData)
+def interpretSetTImage(segmentedAddr, levelData):
+    return segmentedToRomAddress(segmentedAddr, levelData)
 
 
-def interpretLoadBlock(command, romfile, textureStart, textureSize, colorFormat, colorDepth):
-    numTexels = ((int.from_bytes(command[6:8], "big")) >> 12) + 1
+def interpretLoadBlock(commandWord, romfile: RomImage, textureStart, textureSize, colorFormat, colorDepth):
+    numTexels = (bitMask(commandWord, 0, 16) >> 12) + 1
 
     # This is currently broken.
     # createNewTextureMaterial(romfile, textureStart, textureSize, numTexels, colorFormat, colorDepth, obj)
@@ -338,10 +341,9 @@ def createNewTextureMaterial(romfile, textureStart, textureSize, texelCount, col
 
     obj.data.materials.append(newMat)
 
-    romfile.seek(textureStart)
     texelSize = int(colorDepth / 8)
     dataLength = texelCount * texelSize
-    textureData = romfile.read(dataLength)
+    textureData = romfile.readBytes(textureStart, dataLength)
 
     if colorDepth != 16:
         print("Warning: Only 16bit RGBA supported, input was " + str(colorDepth) + "bit " + colorFormat)
@@ -1955,12 +1957,10 @@ def parseF3D(
 
 
 def parseDLData(dlData: str, dlName: str):
-    matchResult = re.search(r"Gfx\s*" + re.escape(dlName) + r"\s*\[\s*\w*\s*\]\s*=\s*\{([^\}]*)\}", dlData)
-    if matchResult is None:
+    dlCommandData = getSymbolIndex(dlData).getDisplayList(dlName)
+    if dlCommandData is None:
         raise PluginError("Cannot find display list named " + dlName)
 
-    dlCommandData = matchResult.group(1)
-
     # recursive regex not available in re
     # dlCommands = [(match.group(1), [param.strip() for param in match.group(2).split(",")]) for match in \
     # 	re.findall('(gs[A-Za-z0-9\_]*)\(((?>[^()]|(?R))*)\)', dlCommandData, re.DOTALL)]
@@ -1973,16 +1973,12 @@ def parseVertexData(dlData: str, vertexDataName: str, f3dContext: F3DContext):
     if vertexDataName in f3dContext.vertexData:
         return f3dContext.vertexData[vertexDataName]
 
-    matchResult = re.search(
-        r"Vtx\s*" + re.escape(vertexDataName) + r"\s*\[\s*[0-9x]*\s*\]\s*=\s*\{([^;]*);", dlData, re.DOTALL
-    )
-    if matchResult is None:
+    data = getSymbolIndex(dlData).getVertices(vertexDataName)
+    if data is None:
         raise PluginError("Cannot find vertex list named " + vertexDataName)
-    data = matchResult.group(1)
 
-    pathMatch = re.search(r'\#include\s*"([^"]*)"', data)
-    if pathMatch is not None:
-        path = pathMatch.group(1)
+    path = getIncludePath(data)
+    if path is not None:
         if bpy.context.scene.gameEditorMode == "OOT":
             path = f"{bpy.context.scene.fast64.oot.get_extracted_path()}/{path}"
         data = readFile(f3dContext.getVTXPathFromInclude(path))
@@ -2017,20 +2013,15 @@ def parseLightsData(lightsData, lightsName, f3dContext):
     # if lightsName in f3dContext.lightData:
     # 	return f3dContext.lightData[lightsName]
 
-    matchResult = re.search(
-        r"Lights([0-9n])\s*" + re.escape(lightsName) + r"\s*=\s*gdSPDefLights[0-9]\s*\(([^\)]*)\)\s*;\s*",
-        lightsData,
-        re.DOTALL,
-    )
-    if matchResult is None:
+    lightsResult = getSymbolIndex(lightsData).getLights(lightsName)
+    if lightsResult is None:
         raise PluginError("Cannot find lights data named " + lightsName)
-    data = matchResult.group(2)
+    lightCount, data = lightsResult
 
     values = [math_eval(value.strip(), f3dContext.f3d) for value in data.split(",")]
     if values[-1] == "":
         values = values[:-1]
 
-    lightCount = matchResult.group(1)
     if lightCount == "n":
         lightCount = "7"
     return int(lightCount), values
@@ -2071,22 +2062,16 @@ def CI4toRGBA32(value):
 
 
 def parseTextureData(dlData, textureName, f3dContext, imageFormat, imageSize, width, isLUT, f3d):
-    matchResult = re.search(
-        r"([A-Za-z0-9\_]+)\s*" + re.escape(textureName) + r"\s*\[\s*[0-9a-fA-Fx]*\s*\]\s*=\s*\{([^\}]*)\s*\}\s*;\s*",
-        dlData,
-        re.DOTALL,
-    )
-    if matchResult is None:
+    textureResult = getSymbolIndex(dlData).getTexture(textureName)
+    if textureResult is None:
         print("Cannot find texture named " + textureName)
         return F3DTextureReference(textureName, width), False
-    data = matchResult.group(2)
-    valueSize = matchResult.group(1)
+    valueSize, data = textureResult
 
     loadedFromImageFile = False
 
-    pathMatch = re.search(r'\#include\s*"(.*?)"', data, re.DOTALL)
-    if pathMatch is not None:
-        path = pathMatch.group(1)
+    path = getIncludePath(data)
+    if path is not None:
         if bpy.context.scene.gameEditorMode == "OOT":
             path = f"{bpy.context.scene.fast64.oot.get_extracted_path()}/{path}"
         originalImage = bpy.data.images.load(f3dContext.getImagePathFromInclude(path))
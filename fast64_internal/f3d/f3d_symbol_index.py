@@ -0,0 +1,98 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Index of the array and lights declarations in C import data, built with one scan of the text.
+# Lookups give the same bodies as searching the text for each declaration, so parsing stays linear in file size.
+
+declarationPattern = re.compile(r"\b([A-Za-z0-9_]+)\s+([A-Za-z0-9_]+)\s*\[([^\[\]]*)\]\s*=\s*\{")
+lightsPattern = re.compile(r"Lights([0-9n])\s*([A-Za-z0-9_]+)\s*=\s*gdSPDefLights[0-9]\s*\(([^\)]*)\)\s*;", re.DOTALL)
+includePattern = re.compile(r'\#include\s*"([^"]*)"')
+
+dlSizePattern = re.compile(r"\s*\w*\s*")
+vertexSizePattern = re.compile(r"\s*[0-9x]*\s*")
+textureSizePattern = re.compile(r"\s*[0-9a-fA-Fx]*\s*")
+textureEndPattern = re.compile(r"\s*;")
+
+
+@dataclass
+class CDeclaration:
+    typeName: str
+    size: str  # text between the brackets
+    bodyStart: int  # index after the opening brace
+
+
+@dataclass
+class CSymbolIndex:
+    data: str = field(repr=False)
+    declarations: dict[str, list[CDeclaration]] = field(default_factory=dict)
+    lights: dict[str, tuple[str, str]] = field(default_factory=dict)  # name : (light count, values)
+
+    def __post_init__(self):
+        for match in declarationPattern.finditer(self.data):
+            self.declarations.setdefault(match.group(2), []).append(
+                CDeclaration(match.group(1), match.group(3), match.end())
+            )
+        for match in lightsPattern.finditer(self.data):
+            self.lights.setdefault(match.group(2), (match.group(1), match.group(3)))
+
+    def getBody(
+        self,
+        name: str,
+        typeName: Optional[str],
+        sizePattern: re.Pattern,
+        terminator: str,
+        endPattern: Optional[re.Pattern] = None,
+    ):
+        """
+        Returns (type, body) of the first matching declaration of name, or None.
+        The body ends before terminator, which must be followed by endPattern if given.
+        """
+        for declaration in self.declarations.get(name, []):
+            if typeName is not None and declaration.typeName != typeName:
+                continue
+            if not sizePattern.fullmatch(declaration.size):
+                continue
+            end = self.data.find(terminator, declaration.bodyStart)
+            if end == -1:
+                continue
+            if endPattern is not None and not endPattern.match(self.data, end + 1):
+                continue
+            return declaration.typeName, self.data[declaration.bodyStart : end]
+        return None
+
+    def getDisplayList(self, name: str) -> Optional[str]:
+        result = self.getBody(name, "Gfx", dlSizePattern, "}")
+        return result[1] if result is not None else None
+
+    def getVertices(self, name: str) -> Optional[str]:
+        """Vertex bodies include inner braces, so they end at the first semicolon"""
+        result = self.getBody(name, "Vtx", vertexSizePattern, ";")
+        return result[1] if result is not None else None
+
+    def getTexture(self, name: str) -> Optional[tuple[str, str]]:
+        """Returns (value type, body)"""
+        return self.getBody(name, None, textureSizePattern, "}", textureEndPattern)
+
+    def getLights(self, name: str) -> Optional[tuple[str, str]]:
+        return self.lights.get(name)
+
+
+# Import data strings are passed around unchanged, so the index of the last few are kept by identity
+symbolIndexCache: list[CSymbolIndex] = []
+symbolIndexCacheSize = 4
+
+
+def getSymbolIndex(data: str) -> CSymbolIndex:
+    for index in symbolIndexCache:
+        if index.data is data:
+            return index
+    index = CSymbolIndex(data)
+    symbolIndexCache.insert(0, index)
+    del symbolIndexCache[symbolIndexCacheSize:]
+    return index
+
+
+def getIncludePath(body: str) -> Optional[str]:
+    match = includePattern.search(body)
+    return match.group(1) if match is not None else None
@@ -0,0 +1,144 @@
+import bpy
+import numpy as np
+
+from ..utility import PluginError, colorToLuminance
+
+# Array based encoders for N64 texture formats.
+# Pixels are read once from bpy as a flat float32 array, then each format is packed with array operations.
+# Results are identical to converting pixel by pixel: rounding is half to even like python's round(),
+# and luminance goes through colorToLuminance once per unique color.
+
+
+def getImagePixels(image: bpy.types.Image) -> np.ndarray:
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels
+
+
+def getPixelOffsets(width: int, height: int, channels: int) -> np.ndarray:
+    """Offset of each pixel in the flat pixel array, in N64 order (N64 is -Y, Blender is +Y)"""
+    rows = np.arange(height - 1, -1, -1, dtype=np.int64)
+    return (rows[:, None] * width + np.arange(width, dtype=np.int64)[None, :]).reshape(-1) * channels
+
+
+def getPixelField(pixels: np.ndarray, offsets: np.ndarray, field: int) -> np.ndarray:
+    return pixels[offsets + field].astype(np.float64)
+
+
+def getPixelLuminance(pixels: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    rgb = np.stack([pixels[offsets + field] for field in range(3)], axis=1)
+    uniqueColors, inverse = np.unique(rgb, axis=0, return_inverse=True)
+    luminance = np.array([colorToLuminance(color) for color in uniqueColors.tolist()], dtype=np.float64)
+    return luminance[inverse.reshape(-1)]
+
+
+def quantize(values: np.ndarray, maxValue: int) -> np.ndarray:
+    """int(round(value * maxValue)) & maxValue for each value, maxValue being a bit mask"""
+    return np.round(values * maxValue).astype(np.int64) & maxValue
+
+
+def compactNibbles(values: np.ndarray) -> bytearray:
+    """Packs 4 bit values two per byte, high nibble first, padding an odd count with 0"""
+    values = values & 0xF
+    if len(values) % 2 == 1:
+        values = np.append(values, 0)
+    return bytearray(((values[0::2] << 4) | values[1::2]).astype(np.uint8).tobytes())
+
+
+def toBytes(values: np.ndarray) -> bytearray:
+    return bytearray(values.astype(np.uint8).tobytes())
+
+
+def encodeRGBA16(pixels: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Returns the 16 bit RGBA5551 value of each pixel"""
+    r = quantize(getPixelField(pixels, offsets, 0), 0x1F)
+    g = quantize(getPixelField(pixels, offsets, 1), 0x1F)
+    b = quantize(getPixelField(pixels, offsets, 2), 0x1F)
+    a = (getPixelField(pixels, offsets, 3) > 0.5).astype(np.int64)
+    return (r << 11) | (g << 6) | (b << 1) | a
+
+
+def encodeIA16(pixels: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Returns the 16 bit IA88 value of each pixel"""
+    intensity = quantize(getPixelLuminance(pixels, offsets), 0xFF)
+    alpha = quantize(getPixelField(pixels, offsets, 3), 0xFF)
+    return (intensity << 8) | alpha
+
+
+def to16BitBytes(values: np.ndarray) -> bytearray:
+    return bytearray(values.astype(">u2").tobytes())
+
+
+def encodeNonCITexture(pixels: np.ndarray, width: int, height: int, channels: int, fmt: str, bitSize: str):
+    offsets = getPixelOffsets(width, height, channels)
+
+    if fmt == "G_IM_FMT_RGBA":
+        if bitSize == "G_IM_SIZ_16b":
+            return to16BitBytes(encodeRGBA16(pixels, offsets))
+        elif bitSize == "G_IM_SIZ_32b":
+            fieldOffsets = (offsets[:, None] + np.arange(channels, dtype=np.int64)[None, :]).reshape(-1)
+            return toBytes(quantize(pixels[fieldOffsets].astype(np.float64), 0xFF))
+
+    elif fmt == "G_IM_FMT_IA":
+        if bitSize == "G_IM_SIZ_4b":
+            intensity = quantize(getPixelLuminance(pixels, offsets), 0x7)
+            alpha = (getPixelField(pixels, offsets, 3) > 0.5).astype(np.int64)
+            return compactNibbles((intensity << 1) | alpha)
+        elif bitSize == "G_IM_SIZ_8b":
+            intensity = quantize(getPixelLuminance(pixels, offsets), 0xF)
+            alpha = quantize(getPixelField(pixels, offsets, 3), 0xF)
+            return toBytes((intensity << 4) | alpha)
+        elif bitSize == "G_IM_SIZ_16b":
+            return to16BitBytes(encodeIA16(pixels, offsets))
+
+    elif fmt == "G_IM_FMT_I":
+        if bitSize == "G_IM_SIZ_4b":
+            return compactNibbles(quantize(getPixelLuminance(pixels, offsets), 0xF))
+        elif bitSize == "G_IM_SIZ_8b":
+            return toBytes(quantize(getPixelLuminance(pixels, offsets), 0xFF))
+
+    raise PluginError("Invalid combo: " + fmt + ", " + bitSize)
+
+
+# CI textures
+
+
+def padPixelChannels(pixels: np.ndarray, channels: int) -> np.ndarray:
+    """Pads pixels to RGBA, missing channels being read as 1"""
+    if channels == 4:
+        return pixels
+    padded = np.ones((len(pixels) // channels, 4), dtype=np.float32)
+    padded[:, :channels] = pixels.reshape(-1, channels)
+    return padded.reshape(-1)
+
+
+def encodeCIColors(pixels: np.ndarray, width: int, height: int, channels: int, palFormat: str) -> np.ndarray:
+    """Returns the 16 bit palette color of each pixel, in N64 order"""
+    pixels = padPixelChannels(pixels, channels)
+    offsets = getPixelOffsets(width, height, 4)
+
+    if palFormat == "RGBA16":
+        return encodeRGBA16(pixels, offsets)
+    elif palFormat == "IA16":
+        # Matches getIA16Tuple: intensity is not masked and alpha is truncated
+        intensity = np.round(getPixelLuminance(pixels, offsets) * 0xFF).astype(np.int64)
+        alpha = np.trunc(getPixelField(pixels, offsets, 3) * 0xFF).astype(np.int64)
+        return (intensity << 8) | alpha
+    else:
+        raise PluginError("Internal error, palette format is " + palFormat)
+
+
+def getPaletteOfColors(colors: np.ndarray) -> np.ndarray:
+    """Unique colors in order of first appearance"""
+    uniqueColors, firstIndices = np.unique(colors, return_index=True)
+    return uniqueColors[np.argsort(firstIndices)]
+
+
+def getPaletteIndices(colors: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Index of the first matching palette entry for each color, or -1 if the color is not in the palette"""
+    if len(palette) == 0:
+        return np.full(len(colors), -1, dtype=np.int64)
+    order = np.argsort(palette, kind="stable")
+    sortedPalette = palette[order]
+    positions = np.minimum(np.searchsorted(sortedPalette, colors), len(palette) - 1)
+    return np.where(sortedPalette[positions] == colors, order[positions], -1)
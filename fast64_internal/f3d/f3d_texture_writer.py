@@ -1,6 +1,8 @@
 from typing import Union, Optional
 from dataclasses import dataclass, field
+import heapq
 import bpy
+import numpy as np
 from math import ceil, floor
 
 from .f3d_enums import *
@@ -16,6 +18,15 @@ from .f3d_material import (
 from .f3d_gbi import *
 from .f3d_gbi import _DPLoadTextureBlock
 from .flipbook import TextureFlipbook
+from .f3d_texture_encoder import (
+    getImagePixels,
+    encodeNonCITexture,
+    encodeCIColors,
+    getPaletteOfColors,
+    getPaletteIndices,
+    compactNibbles,
+    toBytes,
+)
 
 from ..utility import *
 
@@ -143,10 +154,8 @@ class TileLoad:
         TileLoad. If this succeeds, self is modified and True is returned. If it
         fails (because it would be too large or the other constraints from
         fixRegion would be violated), self is not modified and False is returned.
-        A large texture mesh is built by, for each triangle, trying to subsume
-        it into each of the existing loads. If it succeeds on one of them, it
-        moves on to the next triangle. If it fails on all of them, a new load is
-        created for that triangle and added to the list.
+        A large texture mesh is built by packing the loads of its triangles
+        with packTileLoads.
         """
         # Could do fancier logic checking across borders, for example if we have
         # one loading 60-68 (size 64) and another 0-8, that could be merged to
@@ -164,6 +173,104 @@ class TileLoad:
         self.offsets.extend(other.offsets)
         return True
 
+    def getTexelCount(self):
+        return (self.sh - self.sl + 1) * (self.th - self.tl + 1)
+
+    def getGrowth(self, other) -> Optional[int]:
+        """
+        Number of texels trySubsume would add to the load, ignoring the fixRegion alignment,
+        or None if the other load can't be subsumed as both don't fit in TMEM together.
+        """
+        width = max(self.sh, other.sh) - min(self.sl, other.sl) + 1
+        height = max(self.th, other.th) - min(self.tl, other.tl) + 1
+        if getTmemWordUsage(self.texFormat, width, height) > self.tmemWordsAvail:
+            return None
+        return width * height - self.getTexelCount()
+
+
+def packTileLoads(faceLoads: list[TileLoad]) -> list[TileLoad]:
+    """
+    Packs the tile loads of single faces into as few loads as possible, loading as few texels as possible.
+    Faces needing the same texels are grouped first. Then each load starts from the top left remaining face,
+    and repeatedly subsumes the nearby face that grows it the least, until no nearby face fits.
+    Faces are bucketed in texel space, so that only nearby faces are tried.
+    The loads found this way are then merged when they fit together.
+    The result doesn't depend on the order of the faces, and faces keep their order within each load.
+    """
+    faceLoads = [load for load in faceLoads if len(load.faces) > 0]
+    if len(faceLoads) == 0:
+        return []
+
+    faceOrder = {id(face): index for index, load in enumerate(faceLoads) for face in load.faces}
+
+    regions: dict[tuple[int, int, int, int], TileLoad] = {}
+    for load in faceLoads:
+        region = (load.sl, load.sh, load.tl, load.th)
+        if region in regions:
+            regions[region].faces.extend(load.faces)
+            regions[region].offsets.extend(load.offsets)
+        else:
+            regions[region] = load
+    regionLoads = sorted(regions.values(), key=lambda load: (load.tl, load.sl, load.th, load.sh))
+
+    # No load covers more texels than fit in TMEM, which bounds how far apart the faces of a load can be.
+    # Faces are looked for up to two cells of about the side of a square load away, further ones can still
+    # end up in the same load when loads are merged.
+    maxTexels = max(1, faceLoads[0].tmemWordsAvail * (64 // texBitSizeInt[faceLoads[0].texFormat]))
+    cellSize = max(8, int(maxTexels**0.5))
+    grid: dict[tuple[int, int], list[int]] = {}
+    for index, load in enumerate(regionLoads):
+        grid.setdefault((load.sl // cellSize, load.tl // cellSize), []).append(index)
+
+    packed = [False] * len(regionLoads)
+    tileLoads: list[TileLoad] = []
+    for index, load in enumerate(regionLoads):
+        if packed[index]:
+            continue
+        packed[index] = True
+
+        reachS = min(2 * cellSize, maxTexels // (load.th - load.tl + 1))
+        reachT = min(2 * cellSize, maxTexels // (load.sh - load.sl + 1))
+        candidates = []
+        for cellT in range((load.tl - reachT) // cellSize, (load.th + reachT) // cellSize + 1):
+            for cellS in range((load.sl - reachS) // cellSize, (load.sh + reachS) // cellSize + 1):
+                for other in grid.get((cellS, cellT), ()):
+                    if not packed[other]:
+                        growth = load.getGrowth(regionLoads[other])
+                        if growth is not None:
+                            candidates.append((growth, other))
+        heapq.heapify(candidates)
+
+        # Faces that don't fit never will, as the load only grows
+        while len(candidates) > 0:
+            growth, other = heapq.heappop(candidates)
+            if packed[other]:
+                continue
+            # Growths change as the load grows, so they're recomputed when popped (lazy greedy)
+            currentGrowth = load.getGrowth(regionLoads[other])
+            if currentGrowth is None:
+                continue
+            if currentGrowth > growth and len(candidates) > 0 and currentGrowth > candidates[0][0]:
+                heapq.heappush(candidates, (currentGrowth, other))
+                continue
+            if load.trySubsume(regionLoads[other]):
+                packed[other] = True
+        tileLoads.append(load)
+
+    mergedLoads: list[TileLoad] = []
+    for load in tileLoads:
+        for mergedLoad in mergedLoads:
+            if mergedLoad.getGrowth(load) is not None and mergedLoad.trySubsume(load):
+                break
+        else:
+            mergedLoads.append(load)
+
+    for load in mergedLoads:
+        faces = sorted(zip(load.faces, load.offsets), key=lambda face: faceOrder[id(face[0])])
+        load.faces = [face for face, _ in faces]
+        load.offsets = [offset for _, offset in faces]
+    return mergedLoads
+
 
 def maybeSaveSingleLargeTextureSetup(
     i: int,
@@ -1082,62 +1189,30 @@ def savePaletteLoad(
 # Functions for converting and writing texture and palette data
 
 
-def extractConvertCIPixel(image, pixels, i, j, palFormat):
-    color = [1, 1, 1, 1]
-    for field in range(image.channels):
-        color[field] = pixels[(j * image.size[0] + i) * image.channels + field]
-    if palFormat == "RGBA16":
-        pixelColor = getRGBA16Tuple(color)
-    elif palFormat == "IA16":
-        pixelColor = getIA16Tuple(color)
-    else:
-        raise PluginError("Internal error, palette format is " + palFormat)
-    return pixelColor
+def getImageCIColors(image: bpy.types.Image, palFormat: str) -> np.ndarray:
+    return encodeCIColors(getImagePixels(image), image.size[0], image.size[1], image.channels, palFormat)
 
 
 def getColorsUsedInImage(image, palFormat):
-    palette = []
-    # N64 is -Y, Blender is +Y
-    pixels = image.pixels[:]
-    for j in reversed(range(image.size[1])):
-        for i in range(image.size[0]):
-            pixelColor = extractConvertCIPixel(image, pixels, i, j, palFormat)
-            if pixelColor not in palette:
-                palette.append(pixelColor)
-    return palette
-
+    return getPaletteOfColors(getImageCIColors(image, palFormat)).tolist()
 
-def mergePalettes(pal0, pal1):
-    palette = [c for c in pal0]
-    for c in pal1:
-        if c not in palette:
-            palette.append(c)
-    return palette
 
+def getColorsUsedInImages(images, palFormat):
+    """Shared palette of several images, e.g. all textures of a flipbook, in the order colors first appear"""
+    if len(images) == 0:
+        return []
+    return getPaletteOfColors(np.concatenate([getImageCIColors(image, palFormat) for image in images])).tolist()
 
-def getColorIndicesOfTexture(image, palette, palFormat):
-    texture = []
-    # N64 is -Y, Blender is +Y
-    pixels = image.pixels[:]
-    for j in reversed(range(image.size[1])):
-        for i in range(image.size[0]):
-            pixelColor = extractConvertCIPixel(image, pixels, i, j, palFormat)
-            if pixelColor not in palette:
-                raise PluginError(f"Bug: {image.name} palette len {len(palette)} missing CI")
-            texture.append(palette.index(pixelColor))
-    return texture
 
+def mergePalettes(pal0, pal1):
+    return list(dict.fromkeys(pal0 + pal1))
 
-def compactNibbleArray(texture, width, height):
-    nibbleData = bytearray(0)
-    dataSize = int(width * height / 2)
-
-    nibbleData = [((texture[i * 2] & 0xF) << 4) | (texture[i * 2 + 1] & 0xF) for i in range(dataSize)]
-
-    if (width * height) % 2 == 1:
-        nibbleData.append((texture[-1] & 0xF) << 4)
 
-    return bytearray(nibbleData)
+def getColorIndicesOfTexture(image, palette, palFormat):
+    indices = getPaletteIndices(getImageCIColors(image, palFormat), np.array(palette, dtype=np.int64))
+    if np.any(indices < 0):
+        raise PluginError(f"Bug: {image.name} palette len {len(palette)} missing CI")
+    return indices
 
 
 def writePaletteData(fPalette: FImage, palette: list[int]):
@@ -1161,9 +1236,9 @@ def writeCITextureData(
     texture = getColorIndicesOfTexture(image, palette, palFmt)
 
     if texFmt == "CI4":
-        fImage.data = compactNibbleArray(texture, image.size[0], image.size[1])
+        fImage.data = compactNibbles(texture)
     else:
-        fImage.data = bytearray(texture)
+        fImage.data = toBytes(texture)
     fImage.converted = True
 
 
@@ -1173,189 +1248,12 @@ def writeNonCITextureData(image: bpy.types.Image, fImage: FImage, texFmt: str):
     fmt = texFormatOf[texFmt]
     bitSize = texBitSizeF3D[texFmt]
 
-    pixels = image.pixels[:]
-    if fmt == "G_IM_FMT_RGBA":
-        if bitSize == "G_IM_SIZ_16b":
-            fImage.data = bytearray(
-                [
-                    byteVal
-                    for doubleByte in [
-                        (
-                            (
-                                ((int(round(pixels[(j * image.size[0] + i) * image.channels + 0] * 0x1F)) & 0x1F) << 3)
-                                | (
-                                    (int(round(pixels[(j * image.size[0] + i) * image.channels + 1] * 0x1F)) & 0x1F)
-                                    >> 2
-                                )
-                            ),
-                            (
-                                ((int(round(pixels[(j * image.size[0] + i) * image.channels + 1] * 0x1F)) & 0x03) << 6)
-                                | (
-                                    (int(round(pixels[(j * image.size[0] + i) * image.channels + 2] * 0x1F)) & 0x1F)
-                                    << 1
-                                )
-                                | (1 if pixels[(j * image.size[0] + i) * image.channels + 3] > 0.5 else 0)
-                            ),
-                        )
-                        for j in reversed(range(image.size[1]))
-                        for i in range(image.size[0])
-                    ]
-                    for byteVal in doubleByte
-                ]
-            )
-        elif bitSize == "G_IM_SIZ_32b":
-            fImage.data = bytearray(
-                [
-                    int(round(pixels[(j * image.size[0] + i) * image.channels + field] * 0xFF)) & 0xFF
-                    for j in reversed(range(image.size[1]))
-                    for i in range(image.size[0])
-                    for field in range(image.channels)
-                ]
-            )
-        else:
-            raise PluginError("Invalid combo: " + fmt + ", " + bitSize)
-
-    elif fmt == "G_IM_FMT_YUV":
+    if fmt == "G_IM_FMT_YUV":
         raise PluginError("YUV not yet implemented.")
-        if bitSize == "G_IM_SIZ_16b":
-            pass
-        else:
-            raise PluginError("Invalid combo: " + fmt + ", " + bitSize)
-
     elif fmt == "G_IM_FMT_CI":
         raise PluginError("Internal error, writeNonCITextureData called for CI image.")
-
-    elif fmt == "G_IM_FMT_IA":
-        if bitSize == "G_IM_SIZ_4b":
-            fImage.data = bytearray(
-                [
-                    (
-                        (
-                            int(
-                                round(
-                                    colorToLuminance(
-                                        pixels[
-                                            (j * image.size[0] + i)
-                                            * image.channels : (j * image.size[0] + i)
-                                            * image.channels
-                                            + 3
-                                        ]
-                                    )
-                                    * 0x7
-                                )
-                            )
-                            & 0x7
-                        )
-                        << 1
-                    )
-                    | (1 if pixels[(j * image.size[0] + i) * image.channels + 3] > 0.5 else 0)
-                    for j in reversed(range(image.size[1]))
-                    for i in range(image.size[0])
-                ]
-            )
-        elif bitSize == "G_IM_SIZ_8b":
-            fImage.data = bytearray(
-                [
-                    (
-                        (
-                            int(
-                                round(
-                                    colorToLuminance(
-                                        pixels[
-                                            (j * image.size[0] + i)
-                                            * image.channels : (j * image.size[0] + i)
-                                            * image.channels
-                                            + 3
-                                        ]
-                                    )
-                                    * 0xF
-                                )
-                            )
-                            & 0xF
-                        )
-                        << 4
-                    )
-                    | (int(round(pixels[(j * image.size[0] + i) * image.channels + 3] * 0xF)) & 0xF)
-                    for j in reversed(range(image.size[1]))
-                    for i in range(image.size[0])
-                ]
-            )
-        elif bitSize == "G_IM_SIZ_16b":
-            fImage.data = bytearray(
-                [
-                    byteVal
-                    for doubleByte in [
-                        (
-                            int(
-                                round(
-                                    colorToLuminance(
-                                        pixels[
-                                            (j * image.size[0] + i)
-                                            * image.channels : (j * image.size[0] + i)
-                                            * image.channels
-                                            + 3
-                                        ]
-                                    )
-                                    * 0xFF
-                                )
-                            )
-                            & 0xFF,
-                            int(round(pixels[(j * image.size[0] + i) * image.channels + 3] * 0xFF)) & 0xFF,
-                        )
-                        for j in reversed(range(image.size[1]))
-                        for i in range(image.size[0])
-                    ]
-                    for byteVal in doubleByte
-                ]
-            )
-        else:
-            raise PluginError("Invalid combo: " + fmt + ", " + bitSize)
-    elif fmt == "G_IM_FMT_I":
-        if bitSize == "G_IM_SIZ_4b":
-            fImage.data = bytearray(
-                [
-                    int(
-                        round(
-                            colorToLuminance(
-                                pixels[
-                                    (j * image.size[0] + i) * image.channels : (j * image.size[0] + i) * image.channels
-                                    + 3
-                                ]
-                            )
-                            * 0xF
-                        )
-                    )
-                    & 0xF
-                    for j in reversed(range(image.size[1]))
-                    for i in range(image.size[0])
-                ]
-            )
-        elif bitSize == "G_IM_SIZ_8b":
-            fImage.data = bytearray(
-                [
-                    int(
-                        round(
-                            colorToLuminance(
-                                pixels[
-                                    (j * image.size[0] + i) * image.channels : (j * image.size[0] + i) * image.channels
-                                    + 3
-                                ]
-                            )
-                            * 0xFF
-                        )
-                    )
-                    & 0xFF
-                    for j in reversed(range(image.size[1]))
-                    for i in range(image.size[0])
-                ]
-            )
-        else:
-            raise PluginError("Invalid combo: " + fmt + ", " + bitSize)
-    else:
+    elif fmt not in {"G_IM_FMT_RGBA", "G_IM_FMT_IA", "G_IM_FMT_I"}:
         raise PluginError("Invalid image format " + fmt)
 
-    # We stored 4bit values in byte arrays, now to convert
-    if bitSize == "G_IM_SIZ_4b":
-        fImage.data = compactNibbleArray(fImage.data, image.size[0], image.size[1])
-
+    fImage.data = encodeNonCITexture(getImagePixels(image), image.size[0], image.size[1], image.channels, fmt, bitSize)
     fImage.converted = True
@@ -0,0 +1,168 @@
+import hashlib
+import io
+import os
+import numpy as np
+
+import bpy
+
+from dataclasses import fields
+from typing import Optional
+from .f3d_gbi import FTriGroup, SP1Triangle, SP2Triangles, SPEndDisplayList, SPVertex, Vtx
+from ..user_cache import getCacheDir, writeCacheFile
+
+# On-disk cache of triangle strips, the vertex buffers and triangle commands saveTriangleStrip makes of a material's faces,
+# so that re-exporting unchanged faces skips strip ordering and vertex packing.
+# Only that step is cached: objects are still duplicated and read by getInfoDict, which the key is built from,
+# and materials and textures are converted on every export.
+# Entries are keyed by a hash of everything strip conversion reads, and evicted least recently used first
+# once the cache grows over the size set in the fast64 settings.
+# Entries are stored as NumPy arrays of vertex and command values, which unlike pickles can't run code when loaded.
+
+# Bump this when strip conversion or the cached data changes, so that old entries are not reused.
+TRI_CACHE_VERSION = 2
+
+
+# Commands strip conversion writes when it is cached, stored as their index in this tuple followed by their fields
+cachedCommandTypes = (SPVertex, SP1Triangle, SP2Triangles, SPEndDisplayList)
+maxCommandFields = max(len(fields(commandType)) for commandType in cachedCommandTypes)
+
+
+def getTriCacheDir() -> str:
+    return getCacheDir("tri_strip_cache")
+
+
+def triCacheEnabled() -> bool:
+    return bpy.context.scene.fast64.settings.tri_cache
+
+
+def getTriGroupCacheKey(triConverter, faces) -> str:
+    """
+    Hashes the inputs of saveTriangleStrip for faces without vertex groups or existing buffer data.
+    The neighbor count of each face is included, since the strip order starts from the face with the fewest neighbors,
+    which also counts neighbors from other materials.
+    """
+    triConverterInfo = triConverter.triConverterInfo
+    infoDict = triConverterInfo.infoDict
+    f3d = triConverterInfo.f3d
+
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(
+        repr(
+            (
+                TRI_CACHE_VERSION,
+                f3d.F3D_VER,
+                f3d.vert_load_size,
+                tuple(tuple(row) for row in triConverterInfo.getTransformMatrix(None)),
+                tuple(triConverter.texDimensions),
+                triConverter.isPointSampled,
+                tuple(triConverter.tex_scale),
+                bpy.context.scene.fast64.settings.optimize_tri_order,
+            )
+        ).encode()
+    )
+    for face in faces:
+        hasher.update(
+            repr(
+                (
+                    face.material_index,
+                    tuple(face.vertices),
+                    tuple(infoDict.f3dVert[loopIndex].key() for loopIndex in face.loops),
+                    len(infoDict.validNeighbors[face]),
+                )
+            ).encode()
+        )
+    return hasher.hexdigest()
+
+
+def getCachePath(key: str) -> str:
+    return os.path.join(getTriCacheDir(), key + ".npz")
+
+
+def encodeTriGroup(triGroup: FTriGroup) -> Optional[bytes]:
+    """Returns the vertices and commands of triGroup as an npz file, or None if it has commands that aren't cached"""
+    vertices = np.array(
+        [(*vtx.position, *vtx.uv, *vtx.colorOrNormal, vtx.packedNormal) for vtx in triGroup.vertexList.vertices],
+        dtype=np.int64,
+    ).reshape(-1, 10)
+
+    commands = np.zeros((len(triGroup.triList.commands), maxCommandFields + 1), dtype=np.int64)
+    for row, command in zip(commands, triGroup.triList.commands):
+        if type(command) not in cachedCommandTypes:
+            return None
+        values = [getattr(command, field.name) for field in fields(command)]
+        if isinstance(command, SPVertex):
+            if command.vertList is not triGroup.vertexList:
+                return None
+            values = values[1:]
+        row[0] = cachedCommandTypes.index(type(command))
+        row[1 : len(values) + 1] = values
+
+    data = io.BytesIO()
+    np.savez(data, vertices=vertices, commands=commands)
+    return data.getvalue()
+
+
+def loadCachedTriGroup(key: str, triGroup: FTriGroup) -> bool:
+    """Fills triGroup from the cache, returns False if there is no usable entry"""
+    try:
+        path = getCachePath(key)
+        with np.load(path, allow_pickle=False) as entry:
+            vertices = entry["vertices"].tolist()
+            commands = entry["commands"].tolist()
+        os.utime(path)  # mark as recently used
+    except (OSError, KeyError, ValueError):
+        return False
+
+    triGroup.vertexList.vertices.extend(Vtx(values[0:3], values[3:5], values[5:9], values[9]) for values in vertices)
+    for values in commands:
+        commandType = cachedCommandTypes[values[0]]
+        if commandType is SPVertex:
+            triGroup.triList.commands.append(SPVertex(triGroup.vertexList, *values[1:4]))
+        else:
+            triGroup.triList.commands.append(commandType(*values[1 : len(fields(commandType)) + 1]))
+    return True
+
+
+def saveCachedTriGroup(key: str, triGroup: FTriGroup):
+    data = encodeTriGroup(triGroup)
+    if data is None:
+        return
+    try:
+        cacheDir = getTriCacheDir()
+        path = getCachePath(key)
+        writeCacheFile(path, data)
+    except OSError as e:
+        print(f"Could not write triangle strip cache entry {key}: {e}")
+        return
+    evictTriCache(cacheDir, bpy.context.scene.fast64.settings.tri_cache_size * 2**20)
+
+
+def evictTriCache(cacheDir: str, maxSize: int):
+    """Deletes least recently used entries until the cache fits in maxSize bytes"""
+    entries = []
+    for entry in os.scandir(cacheDir):
+        if entry.name.endswith(".npz"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    totalSize = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if totalSize <= maxSize:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        totalSize -= size
+
+
+def removeFacesFromNeighbors(faces, infoDict):
+    """
+    Applies the changes getTriangleStripOrder makes to infoDict.validNeighbors when it is skipped,
+    as faces of the following materials are ordered using their remaining neighbor counts.
+    """
+    faceSet = set(faces)
+    for face in faces:
+        for otherFace in infoDict.validNeighbors[face]:
+            if otherFace not in faceSet:
+                infoDict.validNeighbors[otherFace].remove(face)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from math import ceil
+from typing import Hashable, Sequence
+
+# Faces are given as tuples of vertex ids. A vertex id is a (groupIndex, ...) tuple,
+# the group being used to count how many SPVertex commands a buffer load needs.
+FaceVerts = Sequence[tuple[Hashable, ...]]
+
+
+@dataclass
+class TriOrderStats:
+    vertexLoads: int = 0  # SPVertex commands
+    verticesLoaded: int = 0
+    triCommands: int = 0  # SP1Triangle / SP2Triangles commands
+
+    def __str__(self):
+        return (
+            f"{self.vertexLoads} vertex loads, {self.verticesLoaded} vertices loaded, "
+            f"{self.triCommands} triangle commands"
+        )
+
+
+def simulateVertexLoads(faceVerts: FaceVerts, vertLoadSize: int, useSP2Triangle: bool) -> TriOrderStats:
+    """
+    Counts the loads TriangleConverter would emit for faces in the given order.
+    The buffer is filled until a face does not fit, then loaded and restarted with that face.
+    """
+    stats = TriOrderStats()
+    batchVerts = set()
+    batchTris = 0
+
+    for verts in faceVerts:
+        newVerts = set(verts) - batchVerts
+        if len(batchVerts) + len(newVerts) > vertLoadSize:
+            addBatchStats(stats, batchVerts, batchTris, useSP2Triangle)
+            batchVerts = set(verts)
+            batchTris = 1
+        else:
+            batchVerts |= newVerts
+            batchTris += 1
+    addBatchStats(stats, batchVerts, batchTris, useSP2Triangle)
+
+    return stats
+
+
+def addBatchStats(stats: TriOrderStats, batchVerts: set, batchTris: int, useSP2Triangle: bool):
+    if batchTris == 0:
+        return
+    stats.vertexLoads += len({vert[0] for vert in batchVerts})
+    stats.verticesLoaded += len(batchVerts)
+    stats.triCommands += ceil(batchTris / 2) if useSP2Triangle else batchTris
+
+
+def optimizeTriangleOrder(faceVerts: FaceVerts, vertLoadSize: int) -> list[int]:
+    """
+    Reorders faces so that they fill the RSP vertex buffer in as few loads as possible.
+    Each load is grown greedily by the face adding the fewest new vertices among faces sharing a vertex
+    with the current load, and a new seed face is started when none are left.
+    Seeds are picked boundary first, falling back to the input order for ties.
+    Returns the new order as indices into faceVerts.
+    """
+
+    faceCount = len(faceVerts)
+    uniqueFaceVerts = [set(verts) for verts in faceVerts]
+    vertFaces: dict[Hashable, list[int]] = {}
+    for faceIndex, verts in enumerate(uniqueFaceVerts):
+        for vert in verts:
+            vertFaces.setdefault(vert, []).append(faceIndex)
+
+    seedOrder = sorted(
+        range(faceCount), key=lambda faceIndex: sum(len(vertFaces[vert]) for vert in uniqueFaceVerts[faceIndex])
+    )
+    seedIndex = 0
+    emitted = [False] * faceCount
+    order = []
+
+    while len(order) < faceCount:
+        batchVerts = set()
+        # Faces sharing a vertex with the current load, bucketed by how many vertices they would add.
+        # Dicts are used as ordered sets so that ties resolve deterministically.
+        cost: dict[int, int] = {}
+        buckets: list[dict[int, None]] = [{} for _ in range(4)]
+
+        while True:
+            face = None
+            lowestBucket = next((c for c, bucket in enumerate(buckets) if len(bucket) > 0), None)
+            if lowestBucket is not None:
+                if len(batchVerts) + lowestBucket > vertLoadSize:
+                    break
+                face = next(iter(buckets[lowestBucket]))
+                del buckets[lowestBucket][face]
+            else:
+                while seedIndex < faceCount and emitted[seedOrder[seedIndex]]:
+                    seedIndex += 1
+                if seedIndex == faceCount:
+                    break
+                face = seedOrder[seedIndex]
+                if len(batchVerts) > 0 and len(batchVerts) + len(uniqueFaceVerts[face]) > vertLoadSize:
+                    break
+
+            emitted[face] = True
+            order.append(face)
+
+            for vert in uniqueFaceVerts[face] - batchVerts:
+                batchVerts.add(vert)
+                for other in vertFaces[vert]:
+                    if emitted[other]:
+                        continue
+                    otherCost = cost.get(other)
+                    if otherCost is None:
+                        otherCost = len(uniqueFaceVerts[other])
+                    else:
+                        del buckets[otherCost][other]
+                    otherCost -= 1
+                    cost[other] = otherCost
+                    buckets[otherCost][other] = None
+
+    return order
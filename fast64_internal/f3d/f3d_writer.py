@@ -2,6 +2,7 @@ from typing import Union, Optional, Callable, Any, List
 from dataclasses import dataclass
 import functools
 import bpy, mathutils, os, re, copy, math
+import numpy as np
 from mathutils import Vector
 from math import ceil
 from bpy.utils import register_class, unregister_class
@@ -14,9 +15,18 @@ from .f3d_material import (
     get_textlut_mode,
     RDPSettings,
 )
-from .f3d_texture_writer import MultitexManager, TileLoad, maybeSaveSingleLargeTextureSetup
+from .f3d_texture_writer import MultitexManager, TileLoad, maybeSaveSingleLargeTextureSetup, packTileLoads
 from .f3d_gbi import *
 from .f3d_bleed import BleedGraphics
+from .f3d_bounds import getMeshVertices, getOrientedBox, getSmallestBox
+from .f3d_tri_order import optimizeTriangleOrder, simulateVertexLoads
+from .f3d_tri_cache import (
+    triCacheEnabled,
+    getTriGroupCacheKey,
+    loadCachedTriGroup,
+    saveCachedTriGroup,
+    removeFacesFromNeighbors,
+)
 
 from ..utility import *
 
@@ -161,47 +171,172 @@ def getInfoDict_impl(obj: bpy.types.Object):
                 uv_data = uv_layer.data
         if uv_data is None:
             raise PluginError("Object '" + get_original_name(obj) + "' does not have a UV layer named 'UVMap.'")
-    for face in mesh.loop_triangles:
-        validNeighborDict[face] = []
-        material = obj.material_slots[face.material_index].material
-        if material is None:
+
+    faces = list(mesh.loop_triangles)
+    faceVerts = getMeshArray(mesh.loop_triangles, "vertices", np.int32, 3).tolist()
+    faceLoops = getMeshArray(mesh.loop_triangles, "loops", np.int32, 3).tolist()
+    faceMaterials = getMeshArray(mesh.loop_triangles, "material_index", np.int32).tolist()
+    for material_index in set(faceMaterials):
+        if obj.material_slots[material_index].material is None:
             raise PluginError(
                 f"There are some faces on your mesh object {get_original_name(obj)}"
                 " that are assigned to an empty material slot."
             )
-        for vertIndex in face.vertices:
-            if vertIndex not in vertDict:
-                vertDict[vertIndex] = []
-            if face not in vertDict[vertIndex]:
-                vertDict[vertIndex].append(face)
-        for edgeKey in face.edge_keys:
-            if edgeKey not in edgeDict:
-                edgeDict[edgeKey] = []
-            if face not in edgeDict[edgeKey]:
-                edgeDict[edgeKey].append(face)
 
-        for loopIndex in face.loops:
-            convertInfo = LoopConvertInfo(uv_data, obj, obj.material_slots[face.material_index].material)
-            f3dVertDict[loopIndex] = getF3DVert(mesh.loops[loopIndex], face, convertInfo, mesh)
-    for face in mesh.loop_triangles:
-        for edgeKey in face.edge_keys:
-            for otherFace in edgeDict[edgeKey]:
-                if otherFace == face:
+    f3dVertDict.update(getLoopF3DVerts(obj, uv_data, faceLoops, faceMaterials))
+    loopVertKeys = {loopIndex: f3dVert.key() for loopIndex, f3dVert in f3dVertDict.items()}
+
+    # Adjacency is built on face indices, then mapped to the loop triangles
+    faceEdgeKeys = [
+        (ordIndex(verts[0], verts[1]), ordIndex(verts[1], verts[2]), ordIndex(verts[2], verts[0]))
+        for verts in faceVerts
+    ]
+    vertFaceIndices: dict[int, list[int]] = {}
+    edgeFaceIndices: dict[tuple[int, int], list[int]] = {}
+    for faceIndex in range(len(faces)):
+        for vertIndex in faceVerts[faceIndex]:
+            vertFaces = vertFaceIndices.setdefault(vertIndex, [])
+            if len(vertFaces) == 0 or vertFaces[-1] != faceIndex:
+                vertFaces.append(faceIndex)
+        for edgeKey in faceEdgeKeys[faceIndex]:
+            edgeFaces = edgeFaceIndices.setdefault(edgeKey, [])
+            if len(edgeFaces) == 0 or edgeFaces[-1] != faceIndex:
+                edgeFaces.append(faceIndex)
+
+    def loopKeyFromVert(vertIndex, faceIndex):
+        return loopVertKeys[faceLoops[faceIndex][faceVerts[faceIndex].index(vertIndex)]]
+
+    validNeighborIndices: list[list[int]] = [[] for _ in faces]
+    edgeValidIndices: dict[tuple[int, int], bool] = {}
+    for faceIndex in range(len(faces)):
+        for edgeKey in faceEdgeKeys[faceIndex]:
+            for otherIndex in edgeFaceIndices[edgeKey]:
+                if otherIndex == faceIndex:
                     continue
-                if (otherFace, face) not in edgeValidDict and (face, otherFace) not in edgeValidDict:
-                    edgeValid = (
-                        f3dVertDict[getLoopFromVert(edgeKey[0], face)]
-                        == f3dVertDict[getLoopFromVert(edgeKey[0], otherFace)]
-                        and f3dVertDict[getLoopFromVert(edgeKey[1], face)]
-                        == f3dVertDict[getLoopFromVert(edgeKey[1], otherFace)]
-                    )
-                    edgeValidDict[(otherFace, face)] = edgeValid
+                if (otherIndex, faceIndex) not in edgeValidIndices and (faceIndex, otherIndex) not in edgeValidIndices:
+                    edgeValid = loopKeyFromVert(edgeKey[0], faceIndex) == loopKeyFromVert(
+                        edgeKey[0], otherIndex
+                    ) and loopKeyFromVert(edgeKey[1], faceIndex) == loopKeyFromVert(edgeKey[1], otherIndex)
+                    edgeValidIndices[(otherIndex, faceIndex)] = edgeValid
                     if edgeValid:
-                        validNeighborDict[face].append(otherFace)
-                        validNeighborDict[otherFace].append(face)
+                        validNeighborIndices[faceIndex].append(otherIndex)
+                        validNeighborIndices[otherIndex].append(faceIndex)
+
+    for vertIndex, faceIndices in vertFaceIndices.items():
+        vertDict[vertIndex] = [faces[i] for i in faceIndices]
+    for edgeKey, faceIndices in edgeFaceIndices.items():
+        edgeDict[edgeKey] = [faces[i] for i in faceIndices]
+    for (otherIndex, faceIndex), edgeValid in edgeValidIndices.items():
+        edgeValidDict[(faces[otherIndex], faces[faceIndex])] = edgeValid
+    for faceIndex, face in enumerate(faces):
+        validNeighborDict[face] = [faces[i] for i in validNeighborIndices[faceIndex]]
     return infoDict
 
 
+def ordIndex(i1: int, i2: int):
+    # same ordering as bpy's edge_keys
+    return (i1, i2) if i1 < i2 else (i2, i1)
+
+
+def getMeshArray(collection: bpy.types.bpy_prop_collection, attr: str, dtype, width: int = 1) -> np.ndarray:
+    data = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, data)
+    return data.reshape(-1, width) if width > 1 else data
+
+
+def getLoopColorArrays(mesh: bpy.types.Mesh) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Bulk version of getLoopColor, returns (rgb, alpha) arrays indexed by loop.
+    Gamma correction and luminance go through the same mathutils calls as getLoopColor,
+    but only once per unique color, so the results are identical.
+    """
+    loopCount = len(mesh.loops)
+    color_layer = getColorLayer(mesh, layer="Col")
+    alpha_layer = getColorLayer(mesh, layer="Alpha")
+
+    if color_layer is not None:
+        # Apparently already gamma corrected to linear
+        rgb = getMeshArray(color_layer, "color", np.float32, 4)[:loopCount, :3]
+        if is3_2_or_above():
+            uniqueColors, inverse = np.unique(rgb, axis=0, return_inverse=True)
+            rgb = np.array([gammaCorrect(color) for color in uniqueColors.tolist()], dtype=np.float32)[
+                inverse.reshape(-1)
+            ]
+    else:
+        rgb = np.ones((loopCount, 3), dtype=np.float32)
+
+    if alpha_layer is not None:
+        uniqueColors, inverse = np.unique(
+            getMeshArray(alpha_layer, "color", np.float32, 4)[:loopCount, :3], axis=0, return_inverse=True
+        )
+        luminance = []
+        for color in uniqueColors.tolist():
+            if is3_2_or_above():
+                color = gammaCorrect(color)
+            luminance.append(colorToLuminance(color[0:3]))
+        alpha = np.array(luminance, dtype=np.float32)[inverse.reshape(-1)]
+    else:
+        alpha = np.ones(loopCount, dtype=np.float32)
+
+    return rgb, alpha
+
+
+def getLoopF3DVerts(obj: bpy.types.Object, uv_data, faceLoops: list[list[int]], faceMaterials: list[int]):
+    """
+    Bulk version of getF3DVert for every loop of the given loop triangles, returns {loop index: F3DVert}.
+    Mesh data is read with foreach_get and converted with array operations,
+    giving the same values as the per loop path.
+    """
+    mesh: bpy.types.Mesh = obj.data
+
+    positions = getMeshArray(mesh.vertices, "co", np.float32, 3)
+    loopVertIndices = getMeshArray(mesh.loops, "vertex_index", np.int32)
+
+    # N64 is -Y, Blender is +Y
+    uvs = getMeshArray(uv_data, "uv", np.float32, 2)
+    uvs[np.isnan(uvs)] = 0
+    uvs[:, 1] = (1 - uvs[:, 1].astype(np.float64)).astype(np.float32)
+
+    rgbNormalSettings = {
+        material_index: getRgbNormalSettings(obj.material_slots[material_index].material.f3d_mat)
+        for material_index in set(faceMaterials)
+    }
+    normals = None
+    if any(has_normal for _, has_normal, _ in rgbNormalSettings.values()):
+        # Same quantization as getLoopNormal
+        normals = getMeshArray(mesh.loops, "normal", np.float32, 3).astype(np.float64)
+        normals = (np.round(normals * 2**16) / 2**16).astype(np.float32)
+    rgb, alpha = getLoopColorArrays(mesh)
+
+    # tolist() converts to python floats once, instead of per element access
+    positionList = positions.tolist()
+    loopVertList = loopVertIndices.tolist()
+    uvList = uvs.tolist()
+    rgbList = rgb.tolist()
+    alphaList = alpha.tolist()
+    normalList = normals.tolist() if normals is not None else None
+
+    positionVectors: dict[int, Vector] = {}
+    f3dVerts: dict[int, F3DVert] = {}
+    for loops, material_index in zip(faceLoops, faceMaterials):
+        has_rgb, has_normal, _ = rgbNormalSettings[material_index]
+        for loopIndex in loops:
+            if loopIndex in f3dVerts:
+                continue
+            vertIndex = loopVertList[loopIndex]
+            position = positionVectors.get(vertIndex)
+            if position is None:
+                position = positionVectors[vertIndex] = Vector(positionList[vertIndex]).freeze()
+            f3dVerts[loopIndex] = F3DVert(
+                position,
+                Vector(uvList[loopIndex]).freeze(),
+                tuple(rgbList[loopIndex]) if has_rgb else None,
+                Vector(normalList[loopIndex]).freeze() if has_normal else None,
+                alphaList[loopIndex],
+            )
+    return f3dVerts
+
+
 def getSTUVRepeats(tex_prop: "TextureProperty") -> tuple[float, float]:
     SShift, TShift = 2**tex_prop.S.shift, 2**tex_prop.T.shift
     sMirrorScale = 2 if tex_prop.S.mirror else 1
@@ -335,16 +470,17 @@ def saveMeshWithLargeTexturesByFaces(
     if fMaterial.imageKey[1] is not None:
         fImage1 = fModel.getTextureAndHandleShared(fMaterial.imageKey[1])
 
-    tileLoads = []
+    faceTileLoads = []
     for face in faces:
         faceTileLoad = TileLoad(material, fMaterial, texDimensions)
         faceTileLoad.initWithFace(obj, face)
-
-        for tileLoad in tileLoads:
-            if tileLoad.trySubsume(faceTileLoad):
-                break
-        else:
-            tileLoads.append(faceTileLoad)
+        faceTileLoads.append(faceTileLoad)
+    # Without packing, each distinct texel region would be loaded once. Packing grows the face loads in place.
+    fModel.tileLoadStats[0] += len(faces)
+    fModel.tileLoadStats[1] += len({(load.sl, load.sh, load.tl, load.th) for load in faceTileLoads})
+    tileLoads = packTileLoads(faceTileLoads)
+    fModel.tileLoadStats[2] += len(tileLoads)
+    fModel.tileLoadStats[3] += sum(load.getTexelCount() for load in tileLoads)
 
     if material.name != lastMaterialName:
         fMesh.add_material_call(fMaterial)
@@ -391,8 +527,9 @@ def saveMeshWithLargeTexturesByFaces(
             material,
             currentGroupIndex,
             triGroup,
-            copy.deepcopy(existingVertData),
-            copy.deepcopy(matRegionDict),
+            # The converter only extends the buffer list, the vertices and material regions are left untouched
+            list(existingVertData) if existingVertData is not None else None,
+            matRegionDict,
         )
 
         currentGroupIndex = saveTriangleStrip(triConverter, tileLoad.faces, tileLoad.offsets, obj.data, False)
@@ -498,7 +635,9 @@ def saveStaticModel(
 def addCullCommand(obj, fMesh, transformMatrix, matWriteMethod):
     fMesh.add_cull_vtx()
     # if the object has a specifically set culling bounds, use that instead
-    for vertexPos in obj.get("culling_bounds", obj.bound_box):
+    # the box along the mesh's principal axes is used when it is smaller, for example on rotated or diagonal geometry
+    cullBounds = getSmallestBox([obj.get("culling_bounds", obj.bound_box), getOrientedBox(getMeshVertices(obj.data))])
+    for vertexPos in cullBounds:
         fMesh.cullVertexList.vertices.append(
             F3DVert(
                 Vector(vertexPos),
@@ -620,11 +759,11 @@ def edgeValid(edgeValidDict, face, otherFace):
 
 
 def getLowestUnvisitedNeighborCountFace(unvisitedFaces, infoDict):
-    lowestNeighborFace = unvisitedFaces[0]
-    lowestNeighborCount = len(infoDict.validNeighbors[lowestNeighborFace])
+    lowestNeighborFace = None
+    lowestNeighborCount = None
     for face in unvisitedFaces:
         neighborCount = len(infoDict.validNeighbors[face])
-        if neighborCount < lowestNeighborCount:
+        if lowestNeighborFace is None or neighborCount < lowestNeighborCount:
             lowestNeighborFace = face
             lowestNeighborCount = neighborCount
     return lowestNeighborFace
@@ -657,15 +796,17 @@ def getNextNeighborFace(faces, face, lastEdgeKey, visitedFaces, possibleFaces, i
     return nextFaceAndEdge
 
 
-def saveTriangleStrip(triConverter, faces, faceSTOffsets, mesh, terminateDL):
-    visitedFaces = []
-    unvisitedFaces = copy.copy(faces)
+def getTriangleStripOrder(faces, infoDict):
+    # faces are hashable, so use a set / ordered dict for membership tests
+    faceSet = set(faces)
+    visitedFaces = set()
+    stripOrder = []
+    unvisitedFaces = dict.fromkeys(faces)
     possibleFaces = []
     lastEdgeKey = None
-    infoDict = triConverter.triConverterInfo.infoDict
     neighborFace = getLowestUnvisitedNeighborCountFace(unvisitedFaces, infoDict)
 
-    while len(visitedFaces) < len(faces):
+    while len(stripOrder) < len(faces):
         # print(str(len(visitedFaces)) + " " + str(len(bFaces)))
         if neighborFace is None:
             if len(possibleFaces) > 0:
@@ -678,21 +819,77 @@ def saveTriangleStrip(triConverter, faces, faceSTOffsets, mesh, terminateDL):
                 neighborFace = getLowestUnvisitedNeighborCountFace(unvisitedFaces, infoDict)
                 lastEdgeKey = None
 
-        stOffset = None if faceSTOffsets is None else faceSTOffsets[faces.index(neighborFace)]
-        triConverter.addFace(neighborFace, stOffset)
-        if neighborFace in visitedFaces:
+        if neighborFace is None or neighborFace in visitedFaces:
             raise PluginError("Repeated face")
-        visitedFaces.append(neighborFace)
-        unvisitedFaces.remove(neighborFace)
+        visitedFaces.add(neighborFace)
+        stripOrder.append(neighborFace)
+        del unvisitedFaces[neighborFace]
         if neighborFace in possibleFaces:
             possibleFaces.remove(neighborFace)
         for otherFace in infoDict.validNeighbors[neighborFace]:
             infoDict.validNeighbors[otherFace].remove(neighborFace)
 
         neighborFace, lastEdgeKey = getNextNeighborFace(
-            faces, neighborFace, lastEdgeKey, visitedFaces, possibleFaces, infoDict
+            faceSet, neighborFace, lastEdgeKey, visitedFaces, possibleFaces, infoDict
         )
 
+    return stripOrder
+
+
+def getVertexCacheOptimizedOrder(triConverter, faces, faceSTOffsets: dict):
+    """
+    Reorders faces to minimize vertex loads for the RSP vertex buffer, and prints the before / after counts.
+    The original order is kept if it happens to be better.
+    """
+    triConverterInfo = triConverter.triConverterInfo
+    f3d = triConverterInfo.f3d
+    vertexGroupInfo = triConverterInfo.vertexGroupInfo
+
+    faceVerts = []
+    for face in faces:
+        stOffset = faceSTOffsets.get(face)
+        faceVerts.append(
+            tuple(
+                (
+                    vertexGroupInfo.vertexGroups[vertIndex] if vertexGroupInfo is not None else None,
+                    triConverterInfo.infoDict.f3dVert[loopIndex].key(),
+                    stOffset,
+                )
+                for loopIndex, vertIndex in zip(face.loops, face.vertices)
+            )
+        )
+
+    # Existing vertex data (ex. sm64 skinning) stays loaded, so only the rest of the buffer is available.
+    vertLoadSize = max(f3d.vert_load_size - triConverter.bufferStart, 3)
+    useSP2Triangle = not f3d.F3D_OLD_GBI
+    order = optimizeTriangleOrder(faceVerts, vertLoadSize)
+
+    before = simulateVertexLoads(faceVerts, vertLoadSize, useSP2Triangle)
+    after = simulateVertexLoads([faceVerts[i] for i in order], vertLoadSize, useSP2Triangle)
+    print(
+        f"Triangle order for {get_original_name(triConverterInfo.obj)} ({triConverter.material.name}): "
+        f"{before} -> {after}"
+    )
+
+    if (after.vertexLoads, after.verticesLoaded) > (before.vertexLoads, before.verticesLoaded):
+        return faces
+    return [faces[i] for i in order]
+
+
+def saveTriangleStrip(triConverter, faces, faceSTOffsets, mesh, terminateDL):
+    stripOrder = getTriangleStripOrder(faces, triConverter.triConverterInfo.infoDict)
+
+    faceSTOffsetDict = {}
+    if faceSTOffsets is not None:
+        for face, stOffset in zip(faces, faceSTOffsets):
+            faceSTOffsetDict.setdefault(face, stOffset)
+
+    if bpy.context.scene.fast64.settings.optimize_tri_order:
+        stripOrder = getVertexCacheOptimizedOrder(triConverter, stripOrder, faceSTOffsetDict)
+
+    for face in stripOrder:
+        triConverter.addFace(face, faceSTOffsetDict.get(face))
+
     triConverter.finish(terminateDL)
     return triConverter.currentGroupIndex
 
@@ -735,7 +932,25 @@ def saveMeshByFaces(
         copy.deepcopy(matRegionDict),
     )
 
-    currentGroupIndex = saveTriangleStrip(triConverter, faces, None, obj.data, True)
+    # Only meshes without vertex groups or preloaded vertices are cached, since their conversion only depends on the faces.
+    # Cel shading is not cached, as it writes extra display lists.
+    useCache = (
+        triCacheEnabled()
+        and currentGroupIndex is None
+        and existingVertData is None
+        and matRegionDict is None
+        and triConverterInfo.vertexGroupInfo is None
+        and not (triConverterInfo.f3d.F3DEX_GBI_3 and material.f3d_mat.use_cel_shading)
+    )
+    if useCache:
+        cacheKey = getTriGroupCacheKey(triConverter, faces)
+        if loadCachedTriGroup(cacheKey, triGroup):
+            removeFacesFromNeighbors(faces, triConverterInfo.infoDict)
+        else:
+            currentGroupIndex = saveTriangleStrip(triConverter, faces, None, obj.data, True)
+            saveCachedTriGroup(cacheKey, triGroup)
+    else:
+        currentGroupIndex = saveTriangleStrip(triConverter, faces, None, obj.data, True)
 
     if fMaterial.revert is not None:
         fMesh.draw.commands.append(SPDisplayList(fMaterial.revert))
@@ -778,19 +993,37 @@ class F3DVert:
         self.normal: Optional[Vector] = normal
         self.alpha: float = alpha
 
+    def key(self) -> tuple:
+        # Hashable identity of this vertex. Positions and UVs come straight from float32 mesh data and
+        # normals are already quantized in getLoopNormal, so loops sharing a vertex produce identical keys.
+        # Computed on demand since stOffset is assigned after construction.
+        return (
+            tuple(self.position),
+            tuple(self.uv),
+            tuple(self.stOffset) if self.stOffset is not None else None,
+            tuple(self.rgb) if self.rgb is not None else None,
+            tuple(self.normal) if self.normal is not None else None,
+            self.alpha,
+        )
+
     def __eq__(self, other):
         if not isinstance(other, F3DVert):
             return False
-        return (
-            self.position == other.position
-            and self.uv == other.uv
-            and self.stOffset == other.stOffset
-            and self.rgb == other.rgb
-            and self.normal == other.normal
-            and self.alpha == other.alpha
-        )
+        return self.key() == other.key()
 
-    def toVtx(self, mesh, texDimensions, transformMatrix, isPointSampled: bool, tex_scale=(1, 1)) -> Vtx:
+    def __hash__(self):
+        return hash(self.key())
+
+    def toVtx(
+        self,
+        mesh,
+        texDimensions,
+        transformMatrix,
+        isPointSampled: bool,
+        tex_scale=(1, 1),
+        normalMatrix: Optional[mathutils.Matrix] = None,
+    ) -> Vtx:
+        """normalMatrix is transformMatrix.inverted().transposed(), computed here if not provided"""
         # Position (8 bytes)
         position = [int(round(floatValue)) for floatValue in (transformMatrix @ self.position)]
 
@@ -814,7 +1047,9 @@ class F3DVert:
         packedNormal = 0
         if self.normal is not None:
             # normal transformed correctly.
-            normal = (transformMatrix.inverted().transposed() @ self.normal).normalized()
+            if normalMatrix is None:
+                normalMatrix = transformMatrix.inverted().transposed()
+            normal = (normalMatrix @ self.normal).normalized()
             if self.rgb is not None:
                 packedNormal = packNormal(normal)
 
@@ -831,6 +1066,24 @@ class F3DVert:
         return Vtx(position, uv, colorOrNormal, packedNormal)
 
 
+def convertVertsToVtx(
+    f3dVerts: list[F3DVert],
+    mesh,
+    texDimensions,
+    transformMatrix: mathutils.Matrix,
+    isPointSampled: bool,
+    tex_scale=(1, 1),
+    normalMatrix: Optional[mathutils.Matrix] = None,
+) -> list[Vtx]:
+    """Converts a run of vertices sharing one transform, so that the normal matrix is only computed once."""
+    if normalMatrix is None and any(f3dVert.normal is not None for f3dVert in f3dVerts):
+        normalMatrix = transformMatrix.inverted().transposed()
+    return [
+        f3dVert.toVtx(mesh, texDimensions, transformMatrix, isPointSampled, tex_scale, normalMatrix)
+        for f3dVert in f3dVerts
+    ]
+
+
 # groupIndex is either a vertex group (writing), or name of c variable identifying a transform group, like a limb (parsing)
 class BufferVertex:
     def __init__(self, f3dVert: F3DVert, groupIndex: int | str, materialIndex: int):
@@ -838,14 +1091,16 @@ class BufferVertex:
         self.groupIndex: int | str = groupIndex
         self.materialIndex: int = materialIndex
 
+    def key(self) -> tuple:
+        return (self.f3dVert.key(), self.groupIndex, self.materialIndex)
+
     def __eq__(self, other):
         if not isinstance(other, BufferVertex):
             return False
-        return (
-            self.f3dVert == other.f3dVert
-            and self.groupIndex == other.groupIndex
-            and self.materialIndex == other.materialIndex
-        )
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
 
 
 class TriangleConverterInfo:
@@ -860,6 +1115,9 @@ class TriangleConverterInfo:
 
         # Caching names
         self.groupNames = {}
+        # Caching matrices, by group index
+        self.transformMatrices: dict[Any, mathutils.Matrix] = {}
+        self.normalMatrices: dict[Any, mathutils.Matrix] = {}
 
     def getMatrixAddrFromGroup(self, groupIndex):
         raise PluginError(
@@ -867,6 +1125,16 @@ class TriangleConverterInfo:
         )
 
     def getTransformMatrix(self, groupIndex):
+        if groupIndex not in self.transformMatrices:
+            self.transformMatrices[groupIndex] = self.calcTransformMatrix(groupIndex)
+        return self.transformMatrices[groupIndex]
+
+    def getNormalMatrix(self, groupIndex):
+        if groupIndex not in self.normalMatrices:
+            self.normalMatrices[groupIndex] = self.getTransformMatrix(groupIndex).inverted().transposed()
+        return self.normalMatrices[groupIndex]
+
+    def calcTransformMatrix(self, groupIndex):
         if self.armature is None or groupIndex is None:
             groupMatrix = mathutils.Matrix.Identity(4)
         else:
@@ -906,27 +1174,36 @@ class TriangleConverter:
         self.bufferStart = len(self.vertBuffer)
         self.vertexBufferTriangles = []  # [(index0, index1, index2)]
 
+        # Hash indices of the buffer, so that membership tests don't scan self.vertBuffer.
+        # The existing region [: self.bufferStart] never changes, so map each vertex to all of its slots there.
+        # The region after it is reordered by processGeometry, so only its membership is tracked.
+        self.existingVertSlots: dict[BufferVertex, list[int]] = {}
+        for i, bufferVert in enumerate(self.vertBuffer):
+            self.existingVertSlots.setdefault(bufferVert, []).append(i)
+        self.addedVerts: set[BufferVertex] = set()
+
         self.triGroup = triGroup
         self.triList = triGroup.triList
         self.vtxList = triGroup.vertexList
 
         self.material = material
-        uv_data = triConverterInfo.obj.data.uv_layers["UVMap"].data
-        self.convertInfo = LoopConvertInfo(uv_data, triConverterInfo.obj, material)
         self.texDimensions = texDimensions
         self.isPointSampled = isTexturePointSampled(material)
         self.tex_scale = material.f3d_mat.tex_scale
 
     def vertInBuffer(self, bufferVert, material_index):
+        if bufferVert in self.addedVerts:
+            return True
         if self.existingVertexMaterialRegions is None:
-            return bufferVert in self.vertBuffer
+            return bufferVert in self.existingVertSlots
         else:
             if material_index in self.existingVertexMaterialRegions:
                 matRegion = self.existingVertexMaterialRegions[material_index]
-                if bufferVert in self.vertBuffer[matRegion[0] : matRegion[1]]:
-                    return True
+                for slot in self.existingVertSlots.get(bufferVert, ()):
+                    if matRegion[0] <= slot < matRegion[1]:
+                        return True
 
-            return bufferVert in self.vertBuffer[self.bufferStart :]
+            return False
 
     def getSortedBuffer(self) -> dict[int, list[BufferVertex]]:
         limbVerts: dict[int, list[BufferVertex]] = {}
@@ -937,6 +1214,25 @@ class TriangleConverter:
 
         return limbVerts
 
+    def saveVertices(self, bufferVerts: list[BufferVertex]):
+        # Vertices are sorted by group, so convert each run of a group at once
+        runStart = 0
+        for i in range(1, len(bufferVerts) + 1):
+            if i == len(bufferVerts) or bufferVerts[i].groupIndex != bufferVerts[runStart].groupIndex:
+                groupIndex = bufferVerts[runStart].groupIndex
+                self.vtxList.vertices.extend(
+                    convertVertsToVtx(
+                        [bufferVert.f3dVert for bufferVert in bufferVerts[runStart:i]],
+                        self.triConverterInfo.mesh,
+                        self.texDimensions,
+                        self.triConverterInfo.getTransformMatrix(groupIndex),
+                        self.isPointSampled,
+                        self.tex_scale,
+                        self.triConverterInfo.getNormalMatrix(groupIndex),
+                    )
+                )
+                runStart = i
+
     def processGeometry(self):
         # Sort verts by limb index, then load current limb verts
         bufferStart = self.bufferStart
@@ -953,16 +1249,7 @@ class TriangleConverter:
             del limbVerts[self.currentGroupIndex]
 
             # Save vertices
-            for bufferVert in self.vertBuffer[bufferStart:bufferEnd]:
-                self.vtxList.vertices.append(
-                    bufferVert.f3dVert.toVtx(
-                        self.triConverterInfo.mesh,
-                        self.texDimensions,
-                        self.triConverterInfo.getTransformMatrix(bufferVert.groupIndex),
-                        self.isPointSampled,
-                        tex_scale=self.tex_scale,
-                    )
-                )
+            self.saveVertices(self.vertBuffer[bufferStart:bufferEnd])
 
             bufferStart = bufferEnd
         else:
@@ -983,16 +1270,7 @@ class TriangleConverter:
             bufferEnd += len(bufferVerts)
 
             # Save vertices
-            for bufferVert in self.vertBuffer[bufferStart:bufferEnd]:
-                self.vtxList.vertices.append(
-                    bufferVert.f3dVert.toVtx(
-                        self.triConverterInfo.mesh,
-                        self.texDimensions,
-                        self.triConverterInfo.getTransformMatrix(bufferVert.groupIndex),
-                        self.isPointSampled,
-                        tex_scale=self.tex_scale,
-                    )
-                )
+            self.saveVertices(self.vertBuffer[bufferStart:bufferEnd])
 
             bufferStart = bufferEnd
 
@@ -1131,22 +1409,25 @@ class TriangleConverter:
         addedVerts = []  # verts added to existing vertexBuffer
         allVerts = []  # all verts not in 'untouched' buffer region
 
-        for loopIndex in face.loops:
-            loop = self.triConverterInfo.mesh.loops[loopIndex]
+        for loopIndex, vertIndex in zip(face.loops, face.vertices):
             vertexGroup = (
-                self.triConverterInfo.vertexGroupInfo.vertexGroups[loop.vertex_index]
+                self.triConverterInfo.vertexGroupInfo.vertexGroups[vertIndex]
                 if self.triConverterInfo.vertexGroupInfo is not None
                 else None
             )
+            # Reuse the vertex data extracted by getInfoDict, the copy only differs in stOffset
+            f3dVert = self.triConverterInfo.infoDict.f3dVert[loopIndex]
             bufferVert = BufferVertex(
-                getF3DVert(loop, face, self.convertInfo, self.triConverterInfo.mesh), vertexGroup, face.material_index
+                F3DVert(f3dVert.position, f3dVert.uv, f3dVert.rgb, f3dVert.normal, f3dVert.alpha),
+                vertexGroup,
+                face.material_index,
             )
             bufferVert.f3dVert.stOffset = stOffset
             triIndices.append(bufferVert)
             if not self.vertInBuffer(bufferVert, face.material_index):
                 addedVerts.append(bufferVert)
 
-            if bufferVert not in self.vertBuffer[: self.bufferStart]:
+            if bufferVert not in self.existingVertSlots:
                 allVerts.append(bufferVert)
 
         # We care only about load size, since loading is what takes up time.
@@ -1154,9 +1435,11 @@ class TriangleConverter:
         if len(self.vertBuffer) + len(addedVerts) > self.triConverterInfo.f3d.vert_load_size:
             self.processGeometry()
             self.vertBuffer = self.vertBuffer[: self.bufferStart] + allVerts
+            self.addedVerts = set(allVerts)
             self.vertexBufferTriangles = [triIndices]
         else:
             self.vertBuffer.extend(addedVerts)
+            self.addedVerts.update(addedVerts)
             self.vertexBufferTriangles.append(triIndices)
 
     def finish(self, terminateDL):
@@ -1229,11 +1512,15 @@ def getLoopColor(loop: bpy.types.MeshLoop, mesh: bpy.types.Mesh) -> Vector:
 
 
 def createTriangleCommands(triangles, vertexBuffer, useSP2Triangle):
-    triangles = copy.deepcopy(triangles)
     commands = []
 
+    # First slot of each vertex, matching vertexBuffer.index()
+    vertexSlots = {}
+    for i, v in enumerate(vertexBuffer):
+        vertexSlots.setdefault(v, i)
+
     def getIndices(tri):
-        return [vertexBuffer.index(v) for v in tri]
+        return [vertexSlots[v] for v in tri]
 
     t = 0
     while t < len(triangles):
@@ -1893,9 +2180,7 @@ def exportF3DtoC(dirPath, obj, DLFormat, transformMatrix, texDir, savePNG, texSe
         )
 
     if texSeparate:
-        texCFile = open(os.path.join(modelDirPath, "texture.inc.c"), "w", newline="\n")
-        texCFile.write(texC.source)
-        texCFile.close()
+        writeFileIfChanged(os.path.join(modelDirPath, "texture.inc.c"), texC.source_chunks())
 
     writeCData(staticData, os.path.join(modelDirPath, "header.h"), os.path.join(modelDirPath, "model.inc.c"))
 
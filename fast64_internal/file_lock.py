@@ -0,0 +1,76 @@
+import hashlib
+import os
+
+from contextlib import contextmanager
+
+from .user_cache import getCacheDir
+
+"""
+Locks on the decomp files that several exports edit (group headers, texture scrolling files, level defines,
+the OoT spec and scene table...), so that concurrent exports to one decomp, like the workers of a batch export,
+don't lose each other's edits. Files written by a single export aren't locked.
+
+Each lock is a file in the user's cache folder, named after the locked path, so that every Blender process
+of the user shares it, whichever batch run started them. Locks are held for a single read-modify-write,
+and are reentrant in a process. Code holding a lock only takes the locks of other single edits,
+so that no two processes can wait on each other.
+"""
+
+# Paths locked by this process
+heldLocks: set[str] = set()
+
+
+def getLockKey(path: str) -> str:
+    return os.path.normcase(os.path.realpath(os.path.abspath(path)))
+
+
+@contextmanager
+def lockFile(lockPath: str):
+    """Holds an exclusive lock on lockPath, waiting for other processes holding it"""
+    with open(lockPath, "a+b") as lock:
+        if os.name == "nt":
+            import msvcrt
+
+            while True:
+                try:
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    continue
+            try:
+                yield
+            finally:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def lockSharedFile(path: str):
+    """Locks path against the exports of other processes, while it is read, modified and written"""
+    key = getLockKey(path)
+    if key in heldLocks:
+        yield
+        return
+
+    try:
+        lockDir = getCacheDir("locks")
+    except OSError as e:
+        print(f"Could not lock {path}, concurrent exports may overwrite its edits: {e}")
+        yield
+        return
+
+    lockPath = os.path.join(lockDir, hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + ".lock")
+    with lockFile(lockPath):
+        heldLocks.add(key)
+        try:
+            yield
+        finally:
+            heldLocks.discard(key)
@@ -12,6 +12,8 @@ from ....utility_anim import (
     squashFramesIfAllSame,
     getFrameInterval,
     stashActionInArmature,
+    ArmatureFrameSampler,
+    packValueSequences,
 )
 
 from ...oot_utility import (
@@ -21,7 +23,7 @@ from ...oot_utility import (
 )
 
 
-def ootGetAnimBoneRot(bone, poseBone, convertTransformMatrix, isRoot):
+def ootGetAnimBoneRot(bone, poseMatrix, parentPoseMatrix, convertTransformMatrix, isRoot):
     # OoT draws limbs like this:
     # limbMatrix = parentLimbMatrix @ limbFixedTranslationMatrix @ animRotMatrix
     # There is no separate rest position rotation; an animation rotation of 0
@@ -33,8 +35,9 @@ def ootGetAnimBoneRot(bone, poseBone, convertTransformMatrix, isRoot):
     # modeled along a forearm bone, so when the bone is set to 0 rotation
     # (sticking up), the forearm mesh also sticks up.
     #
-    # poseBone.matrix is the final bone matrix in object space after constraints
-    # and drivers, which is ultimately the transformation we want to encode.
+    # poseMatrix is poseBone.matrix, the final bone matrix in object space after
+    # constraints and drivers, which is ultimately the transformation we want to encode.
+    # parentPoseMatrix is the same for the parent bone, or None for the root.
     # bone.matrix_local is the edit-mode bone matrix in object space,
     # effectively the rest position.
     # Limbs are exported with a transformation of bone.matrix_local.inverted()
@@ -64,8 +67,8 @@ def ootGetAnimBoneRot(bone, poseBone, convertTransformMatrix, isRoot):
     inverseTranslationMatrix = mathutils.Matrix.Translation(origTranslation).inverted()
     animMatrix = (
         inverseTranslationMatrix
-        @ (poseBone.parent.matrix.inverted() if poseBone.parent is not None else mathutils.Matrix.Identity(4))
-        @ poseBone.matrix
+        @ (parentPoseMatrix.inverted() if parentPoseMatrix is not None else mathutils.Matrix.Identity(4))
+        @ poseMatrix
     )
     finalTranslation, finalRotation, finalScale = animMatrix.decompose()
     if isRoot:
@@ -114,30 +117,30 @@ def ootConvertNonLinkAnimationData(anim, armatureObj, convertTransformMatrix, *,
         [ValueFrameData(i, 0, []), ValueFrameData(i, 1, []), ValueFrameData(i, 2, [])] for i in range(len(animBones))
     ]
 
-    currentFrame = bpy.context.scene.frame_current
-    for frame in range(frame_start, frame_start + frame_count):
-        bpy.context.scene.frame_set(frame)
-        rootBone = armatureObj.data.bones[animBones[0]]
-        rootPoseBone = armatureObj.pose.bones[animBones[0]]
-
+    sampler = ArmatureFrameSampler(armatureObj)
+    for frame in sampler.frames(frame_start, frame_count):
         # Convert Z-up to Y-up for root translation animation
         translation = (
             mathutils.Quaternion((1, 0, 0), math.radians(-90.0))
-            @ (convertTransformMatrix @ rootPoseBone.matrix).decompose()[0]
+            @ (convertTransformMatrix @ sampler.matrix(animBones[0])).decompose()[0]
         )
         saveTranslationFrame(translationData, translation)
 
         for boneIndex in range(len(animBones)):
             boneName = animBones[boneIndex]
             currentBone = armatureObj.data.bones[boneName]
-            currentPoseBone = armatureObj.pose.bones[boneName]
 
             saveQuaternionFrame(
                 rotationData[boneIndex],
-                ootGetAnimBoneRot(currentBone, currentPoseBone, convertTransformMatrix, boneIndex == 0),
+                ootGetAnimBoneRot(
+                    currentBone,
+                    sampler.matrix(boneName),
+                    sampler.matrix(currentBone.parent.name) if currentBone.parent is not None else None,
+                    convertTransformMatrix,
+                    boneIndex == 0,
+                ),
             )
 
-    bpy.context.scene.frame_set(currentFrame)
     squashFramesIfAllSame(translationData)
     for frameData in rotationData:
         squashFramesIfAllSame(frameData)
@@ -176,16 +179,12 @@ def ootConvertLinkAnimationData(anim, armatureObj, convertTransformMatrix, *, fr
 
     frameData = []
 
-    currentFrame = bpy.context.scene.frame_current
-    for frame in range(frame_start, frame_start + frame_count):
-        bpy.context.scene.frame_set(frame)
-        rootBone = armatureObj.data.bones[animBones[0]]
-        rootPoseBone = armatureObj.pose.bones[animBones[0]]
-
+    sampler = ArmatureFrameSampler(armatureObj)
+    for frame in sampler.frames(frame_start, frame_count):
         # Convert Z-up to Y-up for root translation animation
         translation = (
             mathutils.Quaternion((1, 0, 0), math.radians(-90.0))
-            @ (convertTransformMatrix @ rootPoseBone.matrix).decompose()[0]
+            @ (convertTransformMatrix @ sampler.matrix(animBones[0])).decompose()[0]
         )
 
         for i in range(3):
@@ -194,23 +193,61 @@ def ootConvertLinkAnimationData(anim, armatureObj, convertTransformMatrix, *, fr
         for boneIndex in range(len(animBones)):
             boneName = animBones[boneIndex]
             currentBone = armatureObj.data.bones[boneName]
-            currentPoseBone = armatureObj.pose.bones[boneName]
 
-            rotation = ootGetAnimBoneRot(currentBone, currentPoseBone, convertTransformMatrix, boneIndex == 0)
+            rotation = ootGetAnimBoneRot(
+                currentBone,
+                sampler.matrix(boneName),
+                sampler.matrix(currentBone.parent.name) if currentBone.parent is not None else None,
+                convertTransformMatrix,
+                boneIndex == 0,
+            )
             for i in range(3):
                 field = rotation.to_euler()[i]
                 value = (math.degrees(field) % 360) / 360
                 frameData.append(min(int(round(value * (2**16 - 1))), 2**16 - 1))
 
-        textureAnimValue = (armatureObj.ootLinkTextureAnim.eyes & 0xF) | (
-            (armatureObj.ootLinkTextureAnim.mouth & 0xF) << 4
+        textureAnimValue = (sampler.propertyValue("ootLinkTextureAnim.eyes") & 0xF) | (
+            (sampler.propertyValue("ootLinkTextureAnim.mouth") & 0xF) << 4
         )
         frameData.append(textureAnimValue)
 
-    bpy.context.scene.frame_set(currentFrame)
     return frameData
 
 
+def ootPackAnimationValues(ootAnim: OOTAnimation, armatureFrameData):
+    # SkelAnime reads indices below limit as static values, and the others as the start of one value per frame,
+    # so static values are stored first and animated channels after them.
+    singleFrameData = []
+    multiFrameData = []
+    for frameData in armatureFrameData:
+        if frameData.boneIndex not in ootAnim.indices:
+            ootAnim.indices[frameData.boneIndex] = [None, None, None]
+        if len(frameData.frames) == 1:
+            singleFrameData.append(frameData)
+        else:
+            multiFrameData.append(frameData)
+
+    staticIndices = {}
+    for frameData in singleFrameData:
+        frame = frameData.frames[0]
+        if frame not in staticIndices:
+            staticIndices[frame] = len(ootAnim.values)
+            ootAnim.values.append(frame)
+        ootAnim.indices[frameData.boneIndex][frameData.field] = staticIndices[frame]
+
+    # identical and overlapping animated channels share values
+    ootAnim.limit = len(ootAnim.values)
+    animatedValues = []
+    animatedOffsets = packValueSequences([frameData.frames for frameData in multiFrameData], animatedValues)
+    for frameData, offset in zip(multiFrameData, animatedOffsets):
+        ootAnim.indices[frameData.boneIndex][frameData.field] = ootAnim.limit + offset
+    ootAnim.values.extend(animatedValues)
+
+    unpackedSize = (len(armatureFrameData) + sum(len(frameData.frames) for frameData in multiFrameData)) * 2
+    packedSize = len(ootAnim.values) * 2
+    print(f"Animation values of {ootAnim.name}: {packedSize} bytes, {unpackedSize - packedSize} bytes saved by packing")
+
+
 def ootExportNonLinkAnimation(armatureObj, convertTransformMatrix, skeletonName):
     if armatureObj.animation_data is None or armatureObj.animation_data.action is None:
         raise PluginError("No active animation selected.")
@@ -233,30 +270,7 @@ def ootExportNonLinkAnimation(armatureObj, convertTransformMatrix, skeletonName)
         frame_count=(frame_last - frame_start + 1),
     )
 
-    singleFrameData = []
-    multiFrameData = []
-    for frameData in armatureFrameData:
-        if len(frameData.frames) == 1:
-            singleFrameData.append(frameData)
-        else:
-            multiFrameData.append(frameData)
-
-    for frameData in singleFrameData:
-        frame = frameData.frames[0]
-        if frameData.boneIndex not in ootAnim.indices:
-            ootAnim.indices[frameData.boneIndex] = [None, None, None]
-        if frame in ootAnim.values:
-            ootAnim.indices[frameData.boneIndex][frameData.field] = ootAnim.values.index(frame)
-        else:
-            ootAnim.indices[frameData.boneIndex][frameData.field] = len(ootAnim.values)
-            ootAnim.values.extend(frameData.frames)
-
-    ootAnim.limit = len(ootAnim.values)
-    for frameData in multiFrameData:
-        if frameData.boneIndex not in ootAnim.indices:
-            ootAnim.indices[frameData.boneIndex] = [None, None, None]
-        ootAnim.indices[frameData.boneIndex][frameData.field] = len(ootAnim.values)
-        ootAnim.values.extend(frameData.frames)
+    ootPackAnimationValues(ootAnim, armatureFrameData)
 
     return ootAnim
 
@@ -7,8 +7,11 @@ from ....f3d.f3d_parser import getImportData
 from ...oot_model_classes import ootGetIncludedAssetData
 
 from ....utility_anim import (
+    getTranslationRestInverse,
     getTranslationRelativeToRest,
+    getRotationRestInverse,
     getRotationRelativeToRest,
+    setKeyframes,
     stashActionInArmature,
 )
 
@@ -98,6 +101,8 @@ def ootImportNonLinkAnimationC(armatureObj, filepath, animName, actorScale, isCu
                 )
                 for propertyIndex in range(3)
             ]
+            restInverse = getTranslationRestInverse(armatureObj.data.bones[startBoneName])
+            keyframes = [[], [], []]
             for frame in range(frameCount):
                 rawTranslation = mathutils.Vector((0, 0, 0))
                 for propertyIndex in range(3):
@@ -108,10 +113,15 @@ def ootImportNonLinkAnimationC(armatureObj, filepath, animName, actorScale, isCu
 
                     rawTranslation[propertyIndex] = value
 
-                trueTranslation = getTranslationRelativeToRest(armatureObj.data.bones[startBoneName], rawTranslation)
+                trueTranslation = getTranslationRelativeToRest(
+                    armatureObj.data.bones[startBoneName], rawTranslation, restInverse
+                )
 
                 for propertyIndex in range(3):
-                    fcurves[propertyIndex].keyframe_points.insert(frame, trueTranslation[propertyIndex])
+                    keyframes[propertyIndex].append(trueTranslation[propertyIndex])
+
+            for propertyIndex in range(3):
+                setKeyframes(fcurves[propertyIndex], keyframes[propertyIndex])
 
             isRootTranslation = False
         else:
@@ -128,6 +138,8 @@ def ootImportNonLinkAnimationC(armatureObj, filepath, animName, actorScale, isCu
                 for propertyIndex in range(3)
             ]
 
+            restInverse = getRotationRestInverse(bone)
+            keyframes = [[], [], []]
             for frame in range(frameCount):
                 rawRotation = mathutils.Euler((0, 0, 0), "XYZ")
                 for propertyIndex in range(3):
@@ -138,10 +150,13 @@ def ootImportNonLinkAnimationC(armatureObj, filepath, animName, actorScale, isCu
 
                     rawRotation[propertyIndex] = value
 
-                trueRotation = getRotationRelativeToRest(bone, rawRotation)
+                trueRotation = getRotationRelativeToRest(bone, rawRotation, restInverse)
 
                 for propertyIndex in range(3):
-                    fcurves[propertyIndex].keyframe_points.insert(frame, trueRotation[propertyIndex])
+                    keyframes[propertyIndex].append(trueRotation[propertyIndex])
+
+            for propertyIndex in range(3):
+                setKeyframes(fcurves[propertyIndex], keyframes[propertyIndex])
 
     if armatureObj.animation_data is None:
         armatureObj.animation_data_create()
@@ -231,6 +246,12 @@ def ootImportLinkAnimationC(
     # padding = u8, tex anim = u8
     # root trans vec3 + rot vec3 for each limb + (s16 with eye/mouth indices)
     frameSize = 3 + 3 * numLimbs + 1
+    translationRestInverse = getTranslationRestInverse(boneList[0])
+    rotationRestInverses = [getRotationRestInverse(bone) for bone in boneList[:numLimbs]]
+    translationKeyframes = [[], [], []]
+    rotationKeyframes = [[[], [], []] for _ in range(numLimbs)]
+    eyesKeyframes = []
+    mouthKeyframes = []
     for frame in range(frameCount):
         currentFrame = frameData[frame * frameSize : (frame + 1) * frameSize]
         if len(currentFrame) < frameSize:
@@ -239,20 +260,22 @@ def ootImportLinkAnimationC(
             )
 
         translation = getTranslationRelativeToRest(
-            boneList[0], mathutils.Vector([ootTranslationValue(currentFrame[i], actorScale) for i in range(3)])
+            boneList[0],
+            mathutils.Vector([ootTranslationValue(currentFrame[i], actorScale) for i in range(3)]),
+            translationRestInverse,
         )
 
         for i in range(3):
-            boneCurveTranslation[i].keyframe_points.insert(frame, translation[i])
+            translationKeyframes[i].append(translation[i])
 
         for boneIndex in range(numLimbs):
             bone = boneList[boneIndex]
             rawRotation = mathutils.Euler(
                 [binangToRadians(currentFrame[i + (boneIndex + 1) * 3]) for i in range(3)], "XYZ"
             )
-            trueRotation = getRotationRelativeToRest(bone, rawRotation)
+            trueRotation = getRotationRelativeToRest(bone, rawRotation, rotationRestInverses[boneIndex])
             for i in range(3):
-                boneCurvesRotation[boneIndex][i].keyframe_points.insert(frame, trueRotation[i])
+                rotationKeyframes[boneIndex][i].append(trueRotation[i])
 
         # convert to unsigned short representation
         texAnimValue = int.from_bytes(
@@ -261,8 +284,16 @@ def ootImportLinkAnimationC(
         eyesValue = texAnimValue & 0xF
         mouthValue = texAnimValue >> 4 & 0xF
 
-        eyesCurve.keyframe_points.insert(frame, eyesValue).interpolation = "CONSTANT"
-        mouthCurve.keyframe_points.insert(frame, mouthValue).interpolation = "CONSTANT"
+        eyesKeyframes.append(eyesValue)
+        mouthKeyframes.append(mouthValue)
+
+    for i in range(3):
+        setKeyframes(boneCurveTranslation[i], translationKeyframes[i])
+    for boneIndex in range(numLimbs):
+        for i in range(3):
+            setKeyframes(boneCurvesRotation[boneIndex][i], rotationKeyframes[boneIndex][i])
+    setKeyframes(eyesCurve, eyesKeyframes, "CONSTANT")
+    setKeyframes(mouthCurve, mouthKeyframes, "CONSTANT")
 
     if armatureObj.animation_data is None:
         armatureObj.animation_data_create()
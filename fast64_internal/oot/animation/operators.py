@@ -3,7 +3,7 @@ from bpy.types import Scene, Operator, Armature
 from bpy.props import StringProperty, BoolProperty
 from bpy.utils import register_class, unregister_class
 from bpy.ops import object
-from ...utility import PluginError, toAlnum, writeCData, raisePluginError
+from ...utility import PluginError, toAlnum, writeCData, raisePluginError, fileWriteReport
 from .properties import OOTAnimExportSettingsProperty, OOTAnimImportSettingsProperty
 from .exporter import ootExportLinkAnimation, ootExportNonLinkAnimation
 from .importer import ootImportLinkAnimationC, ootImportNonLinkAnimationC
@@ -130,7 +130,8 @@ class OOT_ExportAnim(Operator):
 
         try:
             settings = context.scene.fast64.oot.animExportSettings
-            exportAnimationC(armatureObj, settings)
+            with fileWriteReport("Animation export"):
+                exportAnimationC(armatureObj, settings)
             self.report({"INFO"}, "Success!")
 
         except Exception as e:
@@ -21,12 +21,13 @@ def updateBounds(position, bounds):
             maxBounds[i] = position[i]
 
 
-def collisionVertIndex(vert, vertArray):
-    for i in range(len(vertArray)):
-        colVert = vertArray[i]
-        if colVert.position == vert:
-            return i
-    return None
+def collisionVertIndex(vert, vertArray, vertIndices):
+    """Returns the index of vert in vertArray, appending it if missing. vertIndices maps positions to indices."""
+    index = vertIndices.get(vert)
+    if index is None:
+        index = vertIndices[vert] = len(vertArray)
+        vertArray.append(OOTCollisionVertex(vert))
+    return index
 
 
 def roundPosition(position):
@@ -90,18 +91,14 @@ def exportCollisionCommon(collision, obj, transformMatrix, includeChildren, name
     collisionDict = {}
 
     addCollisionTriangles(obj, collisionDict, includeChildren, transformMatrix, collision.bounds)
+    vertIndices = {}
     for polygonType, faces in collisionDict.items():
         collision.polygonGroups[polygonType] = []
         for faceVerts, normal, distance in faces:
             assert len(faceVerts) == 3
-            indices = []
-            for roundedPosition in faceVerts:
-                index = collisionVertIndex(roundedPosition, collision.vertices)
-                if index is None:
-                    collision.vertices.append(OOTCollisionVertex(roundedPosition))
-                    indices.append(len(collision.vertices) - 1)
-                else:
-                    indices.append(index)
+            indices = [
+                collisionVertIndex(roundedPosition, collision.vertices, vertIndices) for roundedPosition in faceVerts
+            ]
             assert len(indices) == 3
 
             # We need to ensure two things about the order in which the vertex indices are:
@@ -1,6 +1,5 @@
-from os import path
 from dataclasses import dataclass
-from .oot_getters import getXMLRoot
+from .oot_getters import getXMLRoot, getXMLPath
 from .oot_data import OoT_BaseElement
 
 
@@ -36,7 +35,7 @@ class OoT_ActorData:
 
     def __init__(self):
         # Path to the ``ActorList.xml`` file
-        actorXML = path.dirname(path.abspath(__file__)) + "/xml/ActorList.xml"
+        actorXML = getXMLPath("ActorList.xml")
         actorRoot = getXMLRoot(actorXML)
 
         # general actor list
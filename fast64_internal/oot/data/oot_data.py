@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from .oot_getters import getCachedData
 
 
 @dataclass
@@ -11,13 +12,17 @@ class OoT_BaseElement:
 
 @dataclass
 class OoT_Data:
-    """Contains data related to OoT, like actors or objects"""
+    """
+    Contains data related to OoT, like actors or objects.
+    Enum properties are built from these tables when the add-on is registered, so they are loaded at startup,
+    from the cache of a previous parse if the XML files didn't change.
+    """
 
     def __init__(self):
         from .oot_enum_data import OoT_EnumData
         from .oot_object_data import OoT_ObjectData
         from .oot_actor_data import OoT_ActorData
 
-        self.enumData = OoT_EnumData()
-        self.objectData = OoT_ObjectData()
-        self.actorData = OoT_ActorData()
+        self.enumData = getCachedData(OoT_EnumData, "EnumData.xml")
+        self.objectData = getCachedData(OoT_ObjectData, "ObjectList.xml")
+        self.actorData = getCachedData(OoT_ActorData, "ActorList.xml")
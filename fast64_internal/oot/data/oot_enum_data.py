@@ -1,6 +1,5 @@
 from dataclasses import dataclass, field
-from os import path
-from .oot_getters import getXMLRoot
+from .oot_getters import getXMLRoot, getXMLPath
 from .oot_data import OoT_BaseElement
 
 # Note: "enumData" in this context refers to an OoT Object file (like ``gameplay_keep``)
@@ -59,7 +58,7 @@ class OoT_EnumData:
         self.enumDataList: list[OoT_EnumElement] = []
 
         # Path to the ``EnumData.xml`` file
-        enumDataXML = path.dirname(path.abspath(__file__)) + "/xml/EnumData.xml"
+        enumDataXML = getXMLPath("EnumData.xml")
         enumDataRoot = getXMLRoot(enumDataXML)
 
         for enum in enumDataRoot.iterfind("Enum"):
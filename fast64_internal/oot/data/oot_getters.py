@@ -1,4 +1,16 @@
+import hashlib
+import os
+import pickle
+import sys
+
+from typing import Callable, TypeVar
 from xml.etree.ElementTree import parse as parseXML, Element
+from ...user_cache import getCacheDir, writeCacheFile
+
+T = TypeVar("T")
+
+# Bump this when the cached data classes change in a way their source hash doesn't catch
+DATA_CACHE_VERSION = 1
 
 
 def getXMLRoot(xmlPath: str) -> Element:
@@ -9,3 +21,48 @@ def getXMLRoot(xmlPath: str) -> Element:
         from ...utility import PluginError
 
         raise PluginError(f"ERROR: File '{xmlPath}' is missing or malformed.")
+
+
+def getXMLPath(xmlName: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "xml", xmlName)
+
+
+def getDataCacheDir() -> str:
+    return getCacheDir("oot_data")
+
+
+def getCachedData(dataClass: Callable[[], T], xmlName: str) -> T:
+    """
+    Returns dataClass(), which parses xmlName, from a pickle of a previous result if there is one.
+    Entries are keyed by the hash of the XML file and of the module defining dataClass,
+    so editing either parses the XML again. They are only read from the user's private cache folder.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{DATA_CACHE_VERSION} {dataClass.__module__}.{dataClass.__qualname__}".encode())
+    try:
+        for sourcePath in (getXMLPath(xmlName), sys.modules[dataClass.__module__].__file__):
+            with open(sourcePath, "rb") as sourceFile:
+                hasher.update(sourceFile.read())
+    except OSError:
+        return dataClass()  # reports the missing file
+
+    try:
+        cachePath = os.path.join(getDataCacheDir(), f"{dataClass.__name__}_{hasher.hexdigest()}.pickle")
+    except OSError as e:
+        print(f"Could not use the data cache: {e}")
+        return dataClass()
+
+    try:
+        with open(cachePath, "rb") as cacheFile:
+            data = pickle.load(cacheFile)
+        if isinstance(data, dataClass):
+            return data
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        pass
+
+    data = dataClass()
+    try:
+        writeCacheFile(cachePath, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+    except (OSError, pickle.PicklingError) as e:
+        print(f"Could not write data cache entry {cachePath}: {e}")
+    return data
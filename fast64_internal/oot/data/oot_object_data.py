@@ -1,7 +1,6 @@
 from dataclasses import dataclass
-from os import path
 from ...utility import PluginError
-from .oot_getters import getXMLRoot
+from .oot_getters import getXMLRoot, getXMLPath
 from .oot_data import OoT_BaseElement
 
 # Note: "object" in this context refers to an OoT Object file (like ``gameplay_keep``)
@@ -20,7 +19,7 @@ class OoT_ObjectData:
         self.objectList: list[OoT_ObjectElement] = []
 
         # Path to the ``ObjectList.xml`` file
-        objectXML = path.dirname(path.abspath(__file__)) + "/xml/ObjectList.xml"
+        objectXML = getXMLPath("ObjectList.xml")
         objectRoot = getXMLRoot(objectXML)
 
         for obj in objectRoot.iterfind("Object"):
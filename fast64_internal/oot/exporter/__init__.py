@@ -1,12 +1,16 @@
 import bpy
 import os
 
+from typing import Optional
 from mathutils import Matrix
 from bpy.types import Object
+from ...c_emitter import emitSession
 from ...f3d.f3d_gbi import DLFormat, TextureExportSettings
+from ...file_lock import lockSharedFile
 from ..oot_model_classes import OOTModel
 from ..oot_f3d_writer import writeTextureArraysNew, writeTextureArraysExisting1D
 from .scene import Scene
+from .incremental import IncrementalExport
 from .decomp_edit import Files
 
 from ...utility import (
@@ -31,30 +35,33 @@ from ..oot_utility import (
 
 def writeTextureArraysExistingScene(fModel: OOTModel, exportPath: str, sceneInclude: str):
     drawConfigPath = os.path.join(exportPath, "src/code/z_scene_table.c")
-    drawConfigData = readFile(drawConfigPath)
-    newData = drawConfigData
+    with lockSharedFile(drawConfigPath):
+        drawConfigData = readFile(drawConfigPath)
+        newData = drawConfigData
 
-    if f'#include "{sceneInclude}"' not in newData:
-        additionalIncludes = f'#include "{sceneInclude}"\n'
-    else:
-        additionalIncludes = ""
-
-    for flipbook in fModel.flipbooks:
-        if flipbook.exportMode == "Array":
-            newData = writeTextureArraysExisting1D(newData, flipbook, additionalIncludes)
+        if f'#include "{sceneInclude}"' not in newData:
+            additionalIncludes = f'#include "{sceneInclude}"\n'
         else:
-            raise PluginError("Scenes can only use array flipbooks.")
+            additionalIncludes = ""
+
+        for flipbook in fModel.flipbooks:
+            if flipbook.exportMode == "Array":
+                newData = writeTextureArraysExisting1D(newData, flipbook, additionalIncludes)
+            else:
+                raise PluginError("Scenes can only use array flipbooks.")
 
-    if newData != drawConfigData:
-        writeFile(drawConfigPath, newData)
+        if newData != drawConfigData:
+            writeFile(drawConfigPath, newData)
 
 
 class SceneExport:
     """This class is the main exporter class, it handles generating the C data and writing the files"""
 
     @staticmethod
-    def create_scene(originalSceneObj: Object, transform: Matrix, exportInfo: ExportInfo) -> Scene:
-        """Returns and creates scene data"""
+    def create_scene(
+        originalSceneObj: Object, transform: Matrix, exportInfo: ExportInfo, reusedRooms: Optional[set[int]] = None
+    ) -> Scene:
+        """Returns and creates scene data, the meshes of ``reusedRooms`` aren't converted"""
         # init
         if originalSceneObj.type != "EMPTY" or originalSceneObj.ootEmptyType != "Scene":
             raise PluginError(f'{originalSceneObj.name} is not an empty with the "Scene" empty type.')
@@ -77,6 +84,7 @@ class SceneExport:
                 exportInfo.useMacros,
                 exportInfo.saveTexturesAsPNG,
                 OOTModel(f"{sceneName}_dl", DLFormat.Static, False),
+                reusedRooms,
             )
             newScene.validateScene()
 
@@ -94,7 +102,6 @@ class SceneExport:
         from .decomp_edit.config import Config
 
         checkObjectReference(originalSceneObj, "Scene object")
-        scene = SceneExport.create_scene(originalSceneObj, transform, exportInfo)
 
         isCustomExport = exportInfo.isCustomExportPath
         exportPath = exportInfo.exportPath
@@ -110,7 +117,26 @@ class SceneExport:
         path = ootGetPath(exportPath, isCustomExport, exportSubdir, sceneName, True, True)
         textureExportSettings = TextureExportSettings(False, exportInfo.saveTexturesAsPNG, sceneInclude, path)
 
-        sceneFile = scene.getNewSceneFile(path, exportInfo.isSingleFile, textureExportSettings)
+        incremental = None
+        reusedRooms = None
+        if exportInfo.isIncremental:
+            incremental = IncrementalExport.new(originalSceneObj, transform, exportInfo, path)
+            reusedRooms = incremental.reusedRooms
+            print(f"Incremental export: reusing {len(reusedRooms)} of {len(incremental.roomFingerprints)} rooms.")
+
+        scene = SceneExport.create_scene(originalSceneObj, transform, exportInfo, reusedRooms)
+
+        sceneTexturesData = None
+        reusedRoomHeaders = None
+        if incremental is not None:
+            sceneTexturesData = incremental.getSceneTextures()
+            reusedRoomHeaders = incremental.getRoomHeaders()
+
+        # The scene textures and the rooms share the C export workers of this export
+        with emitSession():
+            sceneFile, sceneTexturesData = scene.getNewSceneFile(
+                path, exportInfo.isSingleFile, textureExportSettings, sceneTexturesData, reusedRoomHeaders
+            )
 
         if not isCustomExport:
             writeTextureArraysExistingScene(scene.model, exportPath, sceneInclude + sceneName + "_scene.h")
@@ -122,6 +148,8 @@ class SceneExport:
         sceneFile.write()
         for room in scene.rooms.entries:
             room.roomShape.copy_bg_images(path)
+        if incremental is not None:
+            incremental.saveState(sceneFile, sceneTexturesData)
 
         if not isCustomExport:
             Files.add_scene_edits(exportInfo, scene, sceneFile)
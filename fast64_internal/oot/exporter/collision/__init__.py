@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 from dataclasses import dataclass
 from mathutils import Matrix, Vector
@@ -37,13 +38,37 @@ class CollisionUtility:
                 maxBounds[i] = position[i]
 
     @staticmethod
-    def getVertexIndex(vertexPos: tuple[int, int, int], vertexList: list[CollisionVertex]):
-        """Returns the index of a CollisionVertex based on position data, returns None if no match found"""
+    def getTransformedPositions(mesh: Mesh, transform: Matrix):
+        """
+        Returns ``transform @ vertex.co`` for every vertex of the mesh.
+        Products are done in single precision and summed in double precision like mathutils does,
+        so the result is the same as transforming each vertex with mathutils.
+        """
+
+        positions = np.empty((len(mesh.vertices), 4), dtype=np.float32)
+        positions[:, 3] = 1.0
+        coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coords)
+        positions[:, :3] = coords.reshape(-1, 3)
+
+        matrix = np.array(transform, dtype=np.float32)
+        transformed = np.zeros((len(positions), 3), dtype=np.float64)
+        for col in range(4):
+            transformed += (positions[:, None, col] * matrix[None, :3, col]).astype(np.float64)
+        return transformed.astype(np.float32)
 
-        for i in range(len(vertexList)):
-            if vertexList[i].pos == vertexPos:
-                return i
-        return None
+    @staticmethod
+    def getLoopTriangleArrays(mesh: Mesh):
+        """Returns the vertex indices, material indices and normals of the mesh's loop triangles"""
+
+        triCount = len(mesh.loop_triangles)
+        vertIndices = np.empty(triCount * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", vertIndices)
+        materialIndices = np.empty(triCount, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("material_index", materialIndices)
+        normals = np.empty(triCount * 3, dtype=np.float32)
+        mesh.loop_triangles.foreach_get("normal", normals)
+        return vertIndices.reshape(-1, 3), materialIndices, normals.reshape(-1, 3)
 
     @staticmethod
     def getMeshObjects(
@@ -74,6 +99,7 @@ class CollisionUtility:
         surfaceList: list[SurfaceType] = []
         polyList: list[CollisionPoly] = []
         vertexList: list[CollisionVertex] = []
+        vertexIndexFromPos: dict[tuple[int, int, int], int] = {}
         colBounds: list[tuple[int, int, int]] = []
 
         transformFromMeshObj: dict[Object, Matrix] = {}
@@ -89,19 +115,26 @@ class CollisionUtility:
                     raise PluginError(f"'{meshObj.name}' must have a material associated with it.")
 
                 meshObj.data.calc_loop_triangles()
-                for face in meshObj.data.loop_triangles:
-                    colProp = meshObj.material_slots[face.material_index].material.ootCollisionProperty
+                positions = CollisionUtility.getTransformedPositions(meshObj.data, transform)
+                roundedPositions = [tuple(pos) for pos in np.round(positions.astype(np.float64)).astype(int).tolist()]
+                positions = positions.tolist()
+                normalTransform = transform.inverted().transposed()
+                faceVertIndices, faceMaterialIndices, faceNormals = CollisionUtility.getLoopTriangleArrays(meshObj.data)
+                for faceVerts, materialIndex, faceNormal in zip(
+                    faceVertIndices.tolist(), faceMaterialIndices.tolist(), faceNormals.tolist()
+                ):
+                    colProp = meshObj.material_slots[materialIndex].material.ootCollisionProperty
 
                     # get bounds and vertices data
-                    planePoint = transform @ meshObj.data.vertices[face.vertices[0]].co
-                    (x1, y1, z1) = Utility.roundPosition(planePoint)
-                    (x2, y2, z2) = Utility.roundPosition(transform @ meshObj.data.vertices[face.vertices[1]].co)
-                    (x3, y3, z3) = Utility.roundPosition(transform @ meshObj.data.vertices[face.vertices[2]].co)
+                    planePoint = positions[faceVerts[0]]
+                    (x1, y1, z1) = roundedPositions[faceVerts[0]]
+                    (x2, y2, z2) = roundedPositions[faceVerts[1]]
+                    (x3, y3, z3) = roundedPositions[faceVerts[2]]
                     CollisionUtility.updateBounds((x1, y1, z1), colBounds)
                     CollisionUtility.updateBounds((x2, y2, z2), colBounds)
                     CollisionUtility.updateBounds((x3, y3, z3), colBounds)
 
-                    normal = (transform.inverted().transposed() @ face.normal).normalized()
+                    normal = (normalTransform @ Vector(faceNormal)).normalized()
                     distance = round(
                         -1 * (normal[0] * planePoint[0] + normal[1] * planePoint[1] + normal[2] * planePoint[2])
                     )
@@ -117,12 +150,11 @@ class CollisionUtility:
 
                     indices: list[int] = []
                     for pos in [(x1, y1, z1), (x2, y2, z2), (x3, y3, z3)]:
-                        vertexIndex = CollisionUtility.getVertexIndex(pos, vertexList)
+                        vertexIndex = vertexIndexFromPos.get(pos)
                         if vertexIndex is None:
+                            vertexIndex = vertexIndexFromPos[pos] = len(vertexList)
                             vertexList.append(CollisionVertex(pos))
-                            indices.append(len(vertexList) - 1)
-                        else:
-                            indices.append(vertexIndex)
+                        indices.append(vertexIndex)
                     assert len(indices) == 3
 
                     # We need to ensure two things about the order in which the vertex indices are:
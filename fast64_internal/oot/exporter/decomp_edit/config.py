@@ -2,6 +2,7 @@ import os
 import re
 
 from ....utility import PluginError, readFile, writeFile
+from ....file_lock import lockSharedFile
 from ...scene.properties import OOTBootupSceneOptions
 
 
@@ -17,51 +18,52 @@ class Config:
         cutsceneIndex: str,
         saveFileNameData: str,
     ):
-        if os.path.exists(configPath):
-            originalData = readFile(configPath)
-            data = originalData
-        else:
-            originalData = ""
-            data = (
-                f"// #define BOOT_TO_SCENE\n"
-                + f"// #define BOOT_TO_SCENE_NEW_GAME_ONLY\n"
-                + f"// #define BOOT_TO_FILE_SELECT\n"
-                + f"// #define BOOT_TO_MAP_SELECT\n"
-                + f"#define BOOT_ENTRANCE 0\n"
-                + f"#define BOOT_AGE LINK_AGE_CHILD\n"
-                + f"#define BOOT_TIME NEXT_TIME_NONE\n"
-                + f"#define BOOT_CUTSCENE 0xFFEF\n"
-                + f"#define BOOT_PLAYER_NAME 0x15, 0x12, 0x17, 0x14, 0x3E, 0x3E, 0x3E, 0x3E\n\n"
-            )
+        with lockSharedFile(configPath):
+            if os.path.exists(configPath):
+                originalData = readFile(configPath)
+                data = originalData
+            else:
+                originalData = ""
+                data = (
+                    f"// #define BOOT_TO_SCENE\n"
+                    + f"// #define BOOT_TO_SCENE_NEW_GAME_ONLY\n"
+                    + f"// #define BOOT_TO_FILE_SELECT\n"
+                    + f"// #define BOOT_TO_MAP_SELECT\n"
+                    + f"#define BOOT_ENTRANCE 0\n"
+                    + f"#define BOOT_AGE LINK_AGE_CHILD\n"
+                    + f"#define BOOT_TIME NEXT_TIME_NONE\n"
+                    + f"#define BOOT_CUTSCENE 0xFFEF\n"
+                    + f"#define BOOT_PLAYER_NAME 0x15, 0x12, 0x17, 0x14, 0x3E, 0x3E, 0x3E, 0x3E\n\n"
+                )
 
-        data = re.sub(
-            r"(//\s*)?#define\s*BOOT_TO_SCENE",
-            ("" if bootMode == "Play" else "// ") + "#define BOOT_TO_SCENE",
-            data,
-        )
-        data = re.sub(
-            r"(//\s*)?#define\s*BOOT_TO_SCENE_NEW_GAME_ONLY",
-            ("" if newGameOnly else "// ") + "#define BOOT_TO_SCENE_NEW_GAME_ONLY",
-            data,
-        )
-        data = re.sub(
-            r"(//\s*)?#define\s*BOOT_TO_FILE_SELECT",
-            ("" if bootMode == "File Select" else "// ") + "#define BOOT_TO_FILE_SELECT",
-            data,
-        )
-        data = re.sub(
-            r"(//\s*)?#define\s*BOOT_TO_MAP_SELECT",
-            ("" if bootMode == "Map Select" else "// ") + "#define BOOT_TO_MAP_SELECT",
-            data,
-        )
-        data = re.sub(r"#define\s*BOOT_ENTRANCE\s*[^\s]*", f"#define BOOT_ENTRANCE {entranceIndex}", data)
-        data = re.sub(r"#define\s*BOOT_AGE\s*[^\s]*", f"#define BOOT_AGE {linkAge}", data)
-        data = re.sub(r"#define\s*BOOT_TIME\s*[^\s]*", f"#define BOOT_TIME {timeOfDay}", data)
-        data = re.sub(r"#define\s*BOOT_CUTSCENE\s*[^\s]*", f"#define BOOT_CUTSCENE {cutsceneIndex}", data)
-        data = re.sub(r"#define\s*BOOT_PLAYER_NAME\s*[^\n]*", f"#define BOOT_PLAYER_NAME {saveFileNameData}", data)
-
-        if data != originalData:
-            writeFile(configPath, data)
+            data = re.sub(
+                r"(//\s*)?#define\s*BOOT_TO_SCENE",
+                ("" if bootMode == "Play" else "// ") + "#define BOOT_TO_SCENE",
+                data,
+            )
+            data = re.sub(
+                r"(//\s*)?#define\s*BOOT_TO_SCENE_NEW_GAME_ONLY",
+                ("" if newGameOnly else "// ") + "#define BOOT_TO_SCENE_NEW_GAME_ONLY",
+                data,
+            )
+            data = re.sub(
+                r"(//\s*)?#define\s*BOOT_TO_FILE_SELECT",
+                ("" if bootMode == "File Select" else "// ") + "#define BOOT_TO_FILE_SELECT",
+                data,
+            )
+            data = re.sub(
+                r"(//\s*)?#define\s*BOOT_TO_MAP_SELECT",
+                ("" if bootMode == "Map Select" else "// ") + "#define BOOT_TO_MAP_SELECT",
+                data,
+            )
+            data = re.sub(r"#define\s*BOOT_ENTRANCE\s*[^\s]*", f"#define BOOT_ENTRANCE {entranceIndex}", data)
+            data = re.sub(r"#define\s*BOOT_AGE\s*[^\s]*", f"#define BOOT_AGE {linkAge}", data)
+            data = re.sub(r"#define\s*BOOT_TIME\s*[^\s]*", f"#define BOOT_TIME {timeOfDay}", data)
+            data = re.sub(r"#define\s*BOOT_CUTSCENE\s*[^\s]*", f"#define BOOT_CUTSCENE {cutsceneIndex}", data)
+            data = re.sub(r"#define\s*BOOT_PLAYER_NAME\s*[^\n]*", f"#define BOOT_PLAYER_NAME {saveFileNameData}", data)
+
+            if data != originalData:
+                writeFile(configPath, data)
 
     @staticmethod
     def setBootupScene(configPath: str, entranceIndex: str, options: "OOTBootupSceneOptions"):
@@ -4,6 +4,7 @@ import bpy
 from dataclasses import dataclass, field
 from typing import Optional
 from ....utility import PluginError, writeFile
+from ....file_lock import lockSharedFile
 from ...oot_constants import ootEnumSceneID, ootSceneNameToID
 
 ADDED_SCENES_COMMENT = "// Added scenes"
@@ -267,22 +268,24 @@ class SceneTableUtility:
     def edit_scene_table(export_path: str, export_name: str, draw_config: str):
         """Update the scene table entry of the selected scene"""
         path = os.path.join(export_path, "include/tables/scene_table.h")
-        scene_table = SceneTable.new(path)
-        export_enum = get_scene_enum_from_name(export_name)
+        with lockSharedFile(path):
+            scene_table = SceneTable.new(path)
+            export_enum = get_scene_enum_from_name(export_name)
 
-        scene_table.update(SceneTableEntry.from_scene(export_name, draw_config), export_enum)
+            scene_table.update(SceneTableEntry.from_scene(export_name, draw_config), export_enum)
 
-        # write the file with the final data
-        writeFile(path, scene_table.to_c())
+            # write the file with the final data
+            writeFile(path, scene_table.to_c())
 
     @staticmethod
     def delete_scene_table_entry(export_path: str, export_name: str):
         """Remove the scene table entry of the selected scene"""
         path = os.path.join(export_path, "include/tables/scene_table.h")
-        scene_table = SceneTable.new(path)
-        export_enum = get_scene_enum_from_name(export_name)
+        with lockSharedFile(path):
+            scene_table = SceneTable.new(path)
+            export_enum = get_scene_enum_from_name(export_name)
 
-        scene_table.remove(export_enum)
+            scene_table.remove(export_enum)
 
-        # write the file with the final data
-        writeFile(path, scene_table.to_c())
+            # write the file with the final data
+            writeFile(path, scene_table.to_c())
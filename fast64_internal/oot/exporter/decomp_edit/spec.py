@@ -5,6 +5,7 @@ import re
 from dataclasses import dataclass, field
 from typing import Optional
 from ....utility import PluginError, writeFile, indent
+from ....file_lock import lockSharedFile
 from ...oot_utility import ExportInfo, getSceneDirFromLevelName
 from ..scene import Scene
 from ..file import SceneFile
@@ -194,9 +195,10 @@ class SpecUtility:
     @staticmethod
     def remove_segments(export_path: str, scene_name: str):
         path = os.path.join(export_path, "spec")
-        spec_file = SpecFile.new(path)
-        SpecUtility.remove_segments_from_spec(spec_file, scene_name)
-        writeFile(path, spec_file.to_c())
+        with lockSharedFile(path):
+            spec_file = SpecFile.new(path)
+            SpecUtility.remove_segments_from_spec(spec_file, scene_name)
+            writeFile(path, spec_file.to_c())
 
     @staticmethod
     def remove_segments_from_spec(spec_file: SpecFile, scene_name: str):
@@ -229,72 +231,73 @@ class SpecUtility:
 
         # get the spec's data
         exportPath = os.path.join(exportInfo.exportPath, "spec")
-        specFile = SpecFile.new(exportPath)
-        build_directory = specFile.build_directory
-
-        # get the scene and current segment name and remove the scene
-        sceneName = exportInfo.name
-        sceneSegmentName = f"{sceneName}_scene"
-        SpecUtility.remove_segments_from_spec(specFile, exportInfo.name)
-
-        assert build_directory is not None
-        isSingleFile = bpy.context.scene.ootSceneExportSettings.singleFile
-        includeDir = f"{build_directory}/"
-        if exportInfo.customSubPath is not None:
-            includeDir += f"{exportInfo.customSubPath + sceneName}"
-        else:
-            includeDir += f"{getSceneDirFromLevelName(sceneName)}"
-
-        sceneCmds = [
-            SpecCommand("name", f'"{sceneSegmentName}"'),
-            SpecCommand("compress", ""),
-            SpecCommand("romalign", "0x1000"),
-        ]
-
-        # scene
-        if isSingleFile:
-            sceneCmds.append(SpecCommand("include", f'"{includeDir}/{sceneSegmentName}.o"'))
-        else:
-            sceneCmds.extend(
-                [
-                    SpecCommand("include", f'"{includeDir}/{sceneSegmentName}_main.o"'),
-                    SpecCommand("include", f'"{includeDir}/{sceneSegmentName}_col.o"'),
-                ]
-            )
-
-            if hasSceneTex:
-                sceneCmds.append(SpecCommand("include", f'"{includeDir}/{sceneSegmentName}_tex.o"'))
-
-            if hasSceneCS:
-                for i in range(csTotal):
-                    sceneCmds.append(SpecCommand("include", f'"{includeDir}/{sceneSegmentName}_cs_{i}.o"'))
-
-        sceneCmds.append(SpecCommand("number", "2"))
-        specFile.append(SpecEntry(sceneCmds))
-
-        # rooms
-        for i in range(roomTotal):
-            roomSegmentName = f"{sceneName}_room_{i}"
+        with lockSharedFile(exportPath):
+            specFile = SpecFile.new(exportPath)
+            build_directory = specFile.build_directory
+
+            # get the scene and current segment name and remove the scene
+            sceneName = exportInfo.name
+            sceneSegmentName = f"{sceneName}_scene"
+            SpecUtility.remove_segments_from_spec(specFile, exportInfo.name)
+
+            assert build_directory is not None
+            isSingleFile = bpy.context.scene.ootSceneExportSettings.singleFile
+            includeDir = f"{build_directory}/"
+            if exportInfo.customSubPath is not None:
+                includeDir += f"{exportInfo.customSubPath + sceneName}"
+            else:
+                includeDir += f"{getSceneDirFromLevelName(sceneName)}"
 
-            roomCmds = [
-                SpecCommand("name", f'"{roomSegmentName}"'),
-                SpecCommand("compress"),
+            sceneCmds = [
+                SpecCommand("name", f'"{sceneSegmentName}"'),
+                SpecCommand("compress", ""),
                 SpecCommand("romalign", "0x1000"),
             ]
 
+            # scene
             if isSingleFile:
-                roomCmds.append(SpecCommand("include", f'"{includeDir}/{roomSegmentName}.o"'))
+                sceneCmds.append(SpecCommand("include", f'"{includeDir}/{sceneSegmentName}.o"'))
             else:
-                roomCmds.extend(
+                sceneCmds.extend(
                     [
-                        SpecCommand("include", f'"{includeDir}/{roomSegmentName}_main.o"'),
-                        SpecCommand("include", f'"{includeDir}/{roomSegmentName}_model_info.o"'),
-                        SpecCommand("include", f'"{includeDir}/{roomSegmentName}_model.o"'),
+                        SpecCommand("include", f'"{includeDir}/{sceneSegmentName}_main.o"'),
+                        SpecCommand("include", f'"{includeDir}/{sceneSegmentName}_col.o"'),
                     ]
                 )
 
-            roomCmds.append(SpecCommand("number", "3"))
-            specFile.append(SpecEntry(roomCmds))
+                if hasSceneTex:
+                    sceneCmds.append(SpecCommand("include", f'"{includeDir}/{sceneSegmentName}_tex.o"'))
+
+                if hasSceneCS:
+                    for i in range(csTotal):
+                        sceneCmds.append(SpecCommand("include", f'"{includeDir}/{sceneSegmentName}_cs_{i}.o"'))
+
+            sceneCmds.append(SpecCommand("number", "2"))
+            specFile.append(SpecEntry(sceneCmds))
+
+            # rooms
+            for i in range(roomTotal):
+                roomSegmentName = f"{sceneName}_room_{i}"
+
+                roomCmds = [
+                    SpecCommand("name", f'"{roomSegmentName}"'),
+                    SpecCommand("compress"),
+                    SpecCommand("romalign", "0x1000"),
+                ]
 
-        # finally, write the spec file
-        writeFile(exportPath, specFile.to_c())
+                if isSingleFile:
+                    roomCmds.append(SpecCommand("include", f'"{includeDir}/{roomSegmentName}.o"'))
+                else:
+                    roomCmds.extend(
+                        [
+                            SpecCommand("include", f'"{includeDir}/{roomSegmentName}_main.o"'),
+                            SpecCommand("include", f'"{includeDir}/{roomSegmentName}_model_info.o"'),
+                            SpecCommand("include", f'"{includeDir}/{roomSegmentName}_model.o"'),
+                        ]
+                    )
+
+                roomCmds.append(SpecCommand("number", "3"))
+                specFile.append(SpecEntry(roomCmds))
+
+            # finally, write the spec file
+            writeFile(exportPath, specFile.to_c())
@@ -16,6 +16,11 @@ class RoomFile:
     path: str
     header: str
 
+    def getFilePaths(self):
+        if self.singleFileExport:
+            return [os.path.join(self.path, f"{self.name}.c")]
+        return [os.path.join(self.path, f"{self.name}_{suffix}.c") for suffix in ("main", "model_info", "model")]
+
     def write(self):
         """Writes the room files"""
 
@@ -43,6 +48,7 @@ class SceneFile:
     singleFileExport: bool
     path: str
     header: str
+    roomsWritten: bool = False  # rooms can be written as they are generated, before the scene files
 
     def hasCutscenes(self):
         return len(self.sceneCutscenes) > 0
@@ -50,6 +56,12 @@ class SceneFile:
     def hasSceneTextures(self):
         return len(self.sceneTextures) > 0
 
+    def getSceneTexturesPaths(self):
+        """Returns the path of the scene textures file, if the textures aren't in the main file"""
+        if self.singleFileExport or not self.hasSceneTextures():
+            return []
+        return [os.path.join(self.path, f"{self.name}_tex.c")]
+
     def getSourceWithSceneInclude(self, sceneInclude: str, source: str):
         """Returns the source with the includes if missing"""
         ret = ""
@@ -57,18 +69,32 @@ class SceneFile:
             ret = sceneInclude
         return ret + source
 
+    def getSceneInclude(self):
+        return f'#include "{self.name}.h"\n\n\n'
+
+    def setRoomIncludeData(self, roomData: RoomFile):
+        """Adds the scene include at the beginning of each room file to write"""
+
+        sceneInclude = self.getSceneInclude()
+        roomData.roomMain = self.getSourceWithSceneInclude(sceneInclude, roomData.roomMain)
+
+        if not self.singleFileExport:
+            roomData.roomModelInfo = self.getSourceWithSceneInclude(sceneInclude, roomData.roomModelInfo)
+            roomData.roomModel = self.getSourceWithSceneInclude(sceneInclude, roomData.roomModel)
+
+    def writeRoom(self, roomData: RoomFile):
+        """Writes the room files"""
+        self.setRoomIncludeData(roomData)
+        roomData.write()
+
     def setIncludeData(self):
         """Adds includes at the beginning of each file to write"""
 
-        sceneInclude = f'#include "{self.name}.h"\n\n\n'
+        sceneInclude = self.getSceneInclude()
         csInclude = sceneInclude[:-2] + '#include "z64cutscene.h"\n' + '#include "z64cutscene_commands.h"\n\n\n'
 
         for roomData in self.roomList.values():
-            roomData.roomMain = self.getSourceWithSceneInclude(sceneInclude, roomData.roomMain)
-
-            if not self.singleFileExport:
-                roomData.roomModelInfo = self.getSourceWithSceneInclude(sceneInclude, roomData.roomModelInfo)
-                roomData.roomModel = self.getSourceWithSceneInclude(sceneInclude, roomData.roomModel)
+            self.setRoomIncludeData(roomData)
 
         self.sceneMain = self.getSourceWithSceneInclude(
             sceneInclude if not self.hasCutscenes() else csInclude, self.sceneMain
@@ -90,18 +116,20 @@ class SceneFile:
 
         for room in self.roomList.values():
             self.header += room.header
-            room.write()
+            if not self.roomsWritten:
+                room.write()
 
         if self.singleFileExport:
             sceneMainPath = f"{self.name}.c"
 
-            if self.hasCutscenes():
-                self.sceneMain += "".join(cs for cs in self.sceneCutscenes)
-
-            self.sceneMain += self.sceneCollision
-
-            if self.hasSceneTextures():
-                self.sceneMain += self.sceneTextures
+            self.sceneMain = "".join(
+                [
+                    self.sceneMain,
+                    *(self.sceneCutscenes if self.hasCutscenes() else []),
+                    self.sceneCollision,
+                    self.sceneTextures if self.hasSceneTextures() else "",
+                ]
+            )
         else:
             sceneMainPath = f"{self.name}_main.c"
             writeFile(os.path.join(self.path, f"{self.name}_col.c"), self.sceneCollision)
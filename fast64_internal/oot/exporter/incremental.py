@@ -0,0 +1,437 @@
+import bpy
+import hashlib
+import json
+import os
+import numpy as np
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from bpy.types import ID, Image, Light, Material, Mesh, Object
+from mathutils import Matrix
+from ...utility import CData, create_or_get_world
+from ...user_cache import getCacheDir, writeCacheFile
+from ..oot_utility import ExportInfo, getObjectList
+from .file import SceneFile
+
+"""
+Incremental scene export.
+Each room is fingerprinted from the Blender data its files are generated from (its objects, their transforms,
+meshes, materials and images, and the room header properties), before the scene hierarchy is duplicated.
+Rooms whose fingerprint and files didn't change since the last export of the scene to the same folder
+are not converted nor written again, and the textures shared between rooms are reused from that export.
+The scene files are always generated, and only written if their content changed.
+
+Rooms can only be reused if the changed rooms don't share materials or images with other rooms,
+since sharing moves them to the scene textures file. Otherwise, the whole scene is exported.
+"""
+
+# Bump this when the exported data changes in a way the fingerprints don't catch
+INCREMENTAL_STATE_VERSION = 1
+
+
+@dataclass
+class RoomExportState:
+    fingerprint: str
+    resources: set[str]  # materials, images and lights used by the room
+    header: str  # the room's part of the scene header
+    files: dict[str, tuple[int, int]]  # path : (modification time, size) of the room files after the export
+
+    def toDict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "resources": sorted(self.resources),
+            "header": self.header,
+            "files": self.files,
+        }
+
+    @staticmethod
+    def fromDict(data: dict):
+        return RoomExportState(
+            str(data["fingerprint"]),
+            set(data["resources"]),
+            str(data["header"]),
+            filesFromDict(data["files"]),
+        )
+
+
+@dataclass
+class SceneExportState:
+    settings: str
+    rooms: dict[int, RoomExportState] = field(default_factory=dict)
+    sceneTextures: tuple[str, str] = ("", "")  # shared textures (source, header)
+    files: dict[str, tuple[int, int]] = field(default_factory=dict)  # scene textures file
+
+    def toDict(self) -> dict:
+        return {
+            "settings": self.settings,
+            "rooms": {str(index): roomState.toDict() for index, roomState in self.rooms.items()},
+            "sceneTextures": list(self.sceneTextures),
+            "files": self.files,
+        }
+
+    @staticmethod
+    def fromDict(data: dict):
+        source, header = data["sceneTextures"]
+        return SceneExportState(
+            str(data["settings"]),
+            {int(index): RoomExportState.fromDict(roomData) for index, roomData in data["rooms"].items()},
+            (str(source), str(header)),
+            filesFromDict(data["files"]),
+        )
+
+
+@dataclass
+class IncrementalExport:
+    """Fingerprints of the current scene, and the rooms that can be reused from the previous export"""
+
+    statePath: Optional[str]  # None if the cache folder can't be used
+    settings: str
+    roomFingerprints: dict[int, "Fingerprint"]
+    previousState: Optional[SceneExportState]
+    reusedRooms: set[int]
+
+    @staticmethod
+    def new(sceneObj: Object, transform: Matrix, exportInfo: ExportInfo, path: str):
+        fingerprinter = Fingerprinter(bpy.context.evaluated_depsgraph_get())
+        roomFingerprints = {
+            roomObj.ootRoomHeader.roomIndex: fingerprinter.getRoomFingerprint(roomObj)
+            for roomObj in getObjectList(sceneObj.children_recursive, "EMPTY", "Room")
+        }
+        incremental = IncrementalExport(
+            getStatePath(path),
+            fingerprinter.getSettingsFingerprint(sceneObj, transform, exportInfo),
+            roomFingerprints,
+            None,
+            set(),
+        )
+        incremental.previousState = incremental.loadState()
+        incremental.reusedRooms = incremental.getReusedRooms()
+        return incremental
+
+    def loadState(self) -> Optional[SceneExportState]:
+        if self.statePath is None:
+            return None
+        try:
+            with open(self.statePath, "r", encoding="utf-8") as stateFile:
+                state = SceneExportState.fromDict(json.load(stateFile))
+            if state.settings == self.settings:
+                return state
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            pass
+        return None
+
+    def getReusedRooms(self) -> set[int]:
+        """Returns the indices of the rooms whose files from the previous export are still valid"""
+
+        previous = self.previousState
+        if previous is None or not filesUnchanged(previous.files):
+            return set()
+
+        if any(fingerprint.usesFlipbooks for fingerprint in self.roomFingerprints.values()):
+            print("Incremental export: flipbooks are written with the scene textures, exporting every room.")
+            return set()
+
+        unchanged = {
+            index
+            for index, fingerprint in self.roomFingerprints.items()
+            if index in previous.rooms
+            and previous.rooms[index].fingerprint == fingerprint.digest
+            and filesUnchanged(previous.rooms[index].files)
+        }
+
+        # Materials and images used by more than one room are moved to the scene textures,
+        # so changed or removed rooms must only use their own to keep the previous scene textures valid
+        users: dict[str, set[int]] = {}
+        for index, roomState in previous.rooms.items():
+            for resource in roomState.resources:
+                users.setdefault(resource, set()).add(index)
+        for index, fingerprint in self.roomFingerprints.items():
+            for resource in fingerprint.resources:
+                users.setdefault(resource, set()).add(index)
+
+        for roomUsers in users.values():
+            if len(roomUsers) > 1 and not roomUsers <= unchanged:
+                print("Incremental export: changed rooms share materials with other rooms, exporting every room.")
+                return set()
+
+        return unchanged
+
+    def getRoomHeaders(self) -> dict[int, str]:
+        """Returns the scene header parts of the reused rooms"""
+        return {index: self.previousState.rooms[index].header for index in self.reusedRooms}
+
+    def getSceneTextures(self) -> Optional[CData]:
+        """Returns the previous scene textures if rooms are reused, as the textures they share aren't converted"""
+        if len(self.reusedRooms) == 0:
+            return None
+        sceneTextures = CData()
+        sceneTextures.source, sceneTextures.header = self.previousState.sceneTextures
+        return sceneTextures
+
+    def saveState(self, sceneFile: SceneFile, sceneTextures: CData):
+        """Records the exported rooms, once the files are written"""
+
+        state = SceneExportState(
+            self.settings,
+            {},
+            (sceneTextures.source, sceneTextures.header),
+            getFileStats(sceneFile.getSceneTexturesPaths()),
+        )
+        for index, fingerprint in self.roomFingerprints.items():
+            roomFile = sceneFile.roomList[index]
+            state.rooms[index] = RoomExportState(
+                fingerprint.digest, fingerprint.resources, roomFile.header, getFileStats(roomFile.getFilePaths())
+            )
+
+        if self.statePath is None:
+            return
+        try:
+            writeCacheFile(self.statePath, json.dumps(state.toDict()).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not write incremental export state {self.statePath}: {e}")
+
+
+def getStatePath(path: str) -> Optional[str]:
+    """The state of the previous export is kept in the user's cache folder, keyed by the scene folder"""
+    key = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=16).hexdigest()
+    try:
+        return os.path.join(getCacheDir("scene_export"), f"{key}.json")
+    except OSError as e:
+        print(f"Incremental export: could not use the cache folder, exporting every room. {e}")
+        return None
+
+
+def filesFromDict(data: dict) -> dict[str, tuple[int, int]]:
+    return {str(path): tuple(stat) if stat is not None else None for path, stat in data.items()}
+
+
+def getFileStats(paths: list[str]) -> dict[str, tuple[int, int]]:
+    stats = {}
+    for path in paths:
+        try:
+            fileStat = os.stat(path)
+            stats[path] = (fileStat.st_mtime_ns, fileStat.st_size)
+        except OSError:
+            stats[path] = None
+    return stats
+
+
+def filesUnchanged(stats: dict[str, tuple[int, int]]) -> bool:
+    """Files edited or deleted since the export are written again"""
+    return all(stat is not None for stat in stats.values()) and getFileStats(list(stats.keys())) == stats
+
+
+def getAddonSourceKey() -> list[tuple[str, int]]:
+    """Updating fast64 can change the exported data, so its sources are part of the settings fingerprint"""
+    addonDir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    sources = []
+    for root, dirs, files in os.walk(addonDir):
+        dirs[:] = sorted(directory for directory in dirs if not directory.startswith((".", "__pycache__")))
+        sources.extend(
+            (os.path.relpath(os.path.join(root, name), addonDir), os.stat(os.path.join(root, name)).st_mtime_ns)
+            for name in sorted(files)
+            if name.endswith(".py")
+        )
+    return sources
+
+
+def getHashableValue(value: Any):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    try:
+        return tuple(getHashableValue(item) for item in value)
+    except TypeError:
+        return value
+
+
+class Fingerprint:
+    def __init__(self):
+        self.hasher = hashlib.blake2b(digest_size=16)
+        self.resources: set[str] = set()
+        self.usesFlipbooks = False
+
+    @property
+    def digest(self) -> str:
+        return self.hasher.hexdigest()
+
+    def update(self, value: Any):
+        self.hasher.update(repr(getHashableValue(value)).encode())
+
+    def updateArray(self, collection, attribute: str, dtype, width: int = 1):
+        data = np.empty(len(collection) * width, dtype=dtype)
+        collection.foreach_get(attribute, data)
+        self.hasher.update(data.tobytes())
+
+    def merge(self, other: "Fingerprint"):
+        self.hasher.update(other.hasher.digest())
+        self.resources |= other.resources
+        self.usesFlipbooks = self.usesFlipbooks or other.usesFlipbooks
+
+
+class Fingerprinter:
+    """Hashes the Blender data exported rooms are generated from"""
+
+    def __init__(self, depsgraph: bpy.types.Depsgraph):
+        self.depsgraph = depsgraph
+        self.idFingerprints: dict[str, Fingerprint] = {}  # materials, images and lights are often used by several rooms
+
+    def getSettingsFingerprint(self, sceneObj: Object, transform: Matrix, exportInfo: ExportInfo) -> str:
+        """Settings that apply to every room, if they change no room is reused"""
+
+        scene = bpy.context.scene
+        fingerprint = Fingerprint()
+        fingerprint.update(
+            (
+                INCREMENTAL_STATE_VERSION,
+                getAddonSourceKey(),
+                exportInfo.isCustomExportPath,
+                exportInfo.exportPath,
+                exportInfo.customSubPath,
+                exportInfo.name,
+                exportInfo.saveTexturesAsPNG,
+                exportInfo.isSingleFile,
+                exportInfo.useMacros,
+                transform,
+                sceneObj.matrix_world,
+                scene.gameEditorMode,
+                scene.f3d_type,
+                scene.isHWv1,
+                scene.ootBlenderScale,
+                scene.exportHiddenGeometry,
+            )
+        )
+        self.updateProperties(fingerprint, scene.fast64.settings)
+        self.updateProperties(fingerprint, scene.fast64.oot)
+        # Materials are exported relative to the world's default render modes and RDP settings
+        world = create_or_get_world(scene)
+        self.updateProperties(fingerprint, world.ootDefaultRenderModes)
+        self.updateProperties(fingerprint, world.rdp_defaults)
+        return fingerprint.digest
+
+    def getRoomFingerprint(self, roomObj: Object) -> Fingerprint:
+        fingerprint = Fingerprint()
+        for obj in [roomObj] + sorted(roomObj.children_recursive, key=lambda childObj: childObj.name):
+            self.updateObject(fingerprint, obj)
+        return fingerprint
+
+    def updateObject(self, fingerprint: Fingerprint, obj: Object):
+        fingerprint.update(
+            (
+                obj.name,
+                obj.type,
+                obj.parent.name if obj.parent is not None else None,
+                obj.matrix_world,
+                obj.hide_get(),
+                obj.hide_viewport,
+            )
+        )
+        # Room headers, actors, cull groups, LODs, draw layers...
+        self.updateProperties(fingerprint, obj, True)
+
+        if obj.type == "MESH":
+            # The evaluated mesh includes modifiers, which are applied when exporting
+            self.updateMesh(fingerprint, obj.evaluated_get(self.depsgraph).data)
+            for slot in obj.material_slots:
+                self.updateID(fingerprint, slot.material)
+
+    def updateMesh(self, fingerprint: Fingerprint, mesh: Mesh):
+        fingerprint.update((len(mesh.vertices), len(mesh.loops), len(mesh.polygons)))
+        fingerprint.updateArray(mesh.vertices, "co", np.float32, 3)
+        fingerprint.updateArray(mesh.loops, "vertex_index", np.int32)
+        fingerprint.updateArray(mesh.polygons, "loop_start", np.int32)
+        fingerprint.updateArray(mesh.polygons, "material_index", np.int32)
+        fingerprint.updateArray(mesh.polygons, "use_smooth", np.bool_)
+
+        if hasattr(mesh, "corner_normals"):
+            fingerprint.updateArray(mesh.corner_normals, "vector", np.float32, 3)
+        else:
+            fingerprint.updateArray(mesh.loops, "normal", np.float32, 3)
+
+        fingerprint.update(mesh.uv_layers.active.name if mesh.uv_layers.active is not None else None)
+        for uvLayer in mesh.uv_layers:
+            fingerprint.update(uvLayer.name)
+            fingerprint.updateArray(uvLayer.data, "uv", np.float32, 2)
+
+        fingerprint.update(getattr(mesh.color_attributes, "active_color_name", None))
+        for colorAttribute in mesh.color_attributes:
+            fingerprint.update((colorAttribute.name, colorAttribute.domain, colorAttribute.data_type))
+            fingerprint.updateArray(colorAttribute.data, "color", np.float32, 4)
+
+        self.updateProperties(fingerprint, mesh, True)
+
+    def updateID(self, fingerprint: Fingerprint, data: Optional[ID]):
+        if data is None:
+            fingerprint.update(None)
+            return
+
+        key = f"{type(data).__name__}:{data.name_full}"
+        if not isinstance(data, (Material, Image, Light)):
+            fingerprint.update(key)
+            return
+
+        if key not in self.idFingerprints:
+            idFingerprint = Fingerprint()
+            idFingerprint.resources.add(key)
+            idFingerprint.update(key)
+            if isinstance(data, Material):
+                self.updateProperties(idFingerprint, data, True)
+                idFingerprint.usesFlipbooks = any(
+                    getattr(data.flipbookGroup, f"flipbook{index}").enable for index in range(2)
+                )
+            elif isinstance(data, Image):
+                self.updateImage(idFingerprint, data)
+            else:
+                # Material lights use the direction of the light object
+                idFingerprint.update((data.color, [obj.matrix_world for obj in bpy.data.objects if obj.data == data]))
+            self.idFingerprints[key] = idFingerprint
+        fingerprint.merge(self.idFingerprints[key])
+
+    def updateImage(self, fingerprint: Fingerprint, image: Image):
+        filepath = bpy.path.abspath(image.filepath)
+        fingerprint.update(
+            (
+                image.filepath,
+                image.source,
+                image.size,
+                image.packed_file.size if image.packed_file is not None else None,
+            )
+        )
+        if not image.is_dirty and image.packed_file is None and os.path.isfile(filepath):
+            fileStat = os.stat(filepath)
+            fingerprint.update((fileStat.st_mtime_ns, fileStat.st_size))
+        else:
+            # Generated, packed or edited images
+            pixels = np.empty(len(image.pixels), dtype=np.float32)
+            image.pixels.foreach_get(pixels)
+            fingerprint.hasher.update(pixels.tobytes())
+
+    def updateProperties(self, fingerprint: Fingerprint, data, runtimeOnly: bool = False):
+        """
+        Hashes the properties of a property group, or the fast64 properties of a Blender struct if runtimeOnly.
+        Properties that were never set have their default value, so they're skipped.
+        """
+        for prop in data.bl_rna.properties:
+            identifier = prop.identifier
+            if identifier == "rna_type" or (runtimeOnly and not prop.is_runtime):
+                continue
+            if not data.is_property_set(identifier):
+                continue
+
+            value = getattr(data, identifier)
+            fingerprint.update(identifier)
+            if prop.type == "POINTER":
+                if value is None or isinstance(value, ID):
+                    self.updateID(fingerprint, value)
+                else:
+                    self.updateProperties(fingerprint, value)
+            elif prop.type == "COLLECTION":
+                fingerprint.update(len(value))
+                for item in value:
+                    if isinstance(item, ID):
+                        self.updateID(fingerprint, item)
+                    else:
+                        self.updateProperties(fingerprint, item)
+            else:
+                fingerprint.update(value)
@@ -35,6 +35,7 @@ class Room:
         roomIndex: int,
         sceneName: str,
         saveTexturesAsPNG: bool,
+        convertMesh: bool = True,
     ):
         i = 0
         mainHeaderProps = roomObj.ootRoomHeader
@@ -93,7 +94,16 @@ class Room:
         addMissingObjectsToAllRoomHeaders(roomObj, headers)
 
         roomShape = RoomShapeUtility.create_shape(
-            sceneName, name, roomShapeType, model, transform, sceneObj, roomObj, saveTexturesAsPNG, mainHeaderProps
+            sceneName,
+            name,
+            roomShapeType,
+            model,
+            transform,
+            sceneObj,
+            roomObj,
+            saveTexturesAsPNG,
+            mainHeaderProps,
+            convertMesh,
         )
         return Room(name, roomIndex, mainHeader, altHeader, roomShape, hasAlternateHeaders)
 
@@ -188,7 +198,7 @@ class Room:
         return roomC
 
     def getRoomShapeModelC(self, textureSettings: TextureExportSettings):
-        """Returns the C data of the room model"""
+        """Returns the C data of the room model, its textures are saved by ``saveTextures``"""
         roomModel = CData()
 
         for i, entry in enumerate(self.roomShape.dl_entries):
@@ -202,7 +212,7 @@ class Room:
             if i == 0 and isinstance(self.roomShape, RoomShapeImageBase):
                 break
 
-        roomModel.append(self.roomShape.model.to_c(textureSettings, OOTGfxFormatter(ScrollMethod.Vertex)).all())
+        roomModel.append(self.roomShape.model.generate_c(textureSettings, OOTGfxFormatter(ScrollMethod.Vertex)).all())
 
         if isinstance(self.roomShape, RoomShapeImageMulti):
             # roomModel.append(self.roomShape.multiImg.getC()) # Error? double call in getRoomShapeC()?
@@ -210,8 +220,11 @@ class Room:
 
         return roomModel
 
+    def saveTextures(self, textureSettings: TextureExportSettings):
+        self.roomShape.model.save_c_textures(textureSettings)
+
     def getNewRoomFile(self, path: str, isSingleFile: bool, textureExportSettings: TextureExportSettings):
-        """Returns a new ``RoomFile`` element"""
+        """Returns a new ``RoomFile`` element, this doesn't access bpy so that rooms can be generated in parallel"""
 
         roomMainData = self.getRoomMainC()
         roomModelData = self.getRoomShapeModelC(textureExportSettings)
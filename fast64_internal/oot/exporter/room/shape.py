@@ -1,4 +1,6 @@
 import bpy
+import math
+import numpy as np
 import shutil
 import os
 
@@ -7,11 +9,12 @@ from typing import Optional
 from ....utility import PluginError, CData, toAlnum, indent
 from ....f3d.f3d_gbi import SPDisplayList, SPEndDisplayList, GfxListTag, GfxList, DLFormat
 from ....f3d.f3d_writer import TriangleConverterInfo, saveStaticModel, getInfoDict
+from ....f3d.f3d_bounds import getMeshVertices, getMinimalSphere, transformPoints
 from ...room.properties import OOTRoomHeaderProperty, OOTBGProperty
 from ...oot_model_classes import OOTModel
 from ..utility import Utility
 from bpy.types import Object
-from mathutils import Matrix, Vector
+from mathutils import Matrix
 from ....f3d.occlusion_planes.exporter import addOcclusionQuads, OcclusionPlaneCandidatesList
 
 from ...oot_utility import (
@@ -203,11 +206,19 @@ class RoomShapeImageEntry:  # OOTBGImage
     size: str = field(init=False, default="G_IM_SIZ_16b")
     tlut_count: int = field(init=False, default=0)  # tlutCount
 
+    # read from the image once, so that C generation doesn't access bpy
+    width: int = field(init=False, default=0)
+    height: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        if self.image:
+            self.width, self.height = self.image.size[0], self.image.size[1]
+
     def get_width(self) -> int:
-        return self.image.size[0] if self.image else 0
+        return self.width
 
     def get_height(self) -> int:
-        return self.image.size[1] if self.image else 0
+        return self.height
 
     @staticmethod
     def new(name: str, prop: OOTBGProperty):
@@ -521,7 +532,9 @@ class RoomShapeUtility:
         roomObj: Object,
         saveTexturesAsPNG: bool,
         props: OOTRoomHeaderProperty,
+        convertMesh: bool = True,
     ):
+        """Creates the room shape, its display lists are only converted if ``convertMesh`` is set"""
         name = f"{room_name}_shapeHeader"
         dl_name = f"{room_name}_shapeDListsEntry"
         room_shape = None
@@ -543,6 +556,9 @@ class RoomShapeUtility:
                 for bg_image in props.bgImageList:
                     room_shape.bg_entries.append(RoomShapeImageEntry.new(scene_name, bg_image))
 
+        if not convertMesh:
+            return room_shape
+
         pos, _, scale, _ = Utility.getConvertedTransform(transform, sceneObj, roomObj, True)
         cull_group = CullGroup(pos, scale, roomObj.ootRoomHeader.defaultCullDistance)
         dl_entry = room_shape.add_dl_entry(cull_group)
@@ -570,40 +586,24 @@ class RoomShapeUtility:
 
 class BoundingBox:
     def __init__(self):
-        self.minPoint = None
-        self.maxPoint = None
-        self.points = []
+        self.points: list[np.ndarray] = []
 
     def addPoint(self, point: tuple[float, float, float]):
-        if self.minPoint is None:
-            self.minPoint = list(point[:])
-        else:
-            for i in range(3):
-                if point[i] < self.minPoint[i]:
-                    self.minPoint[i] = point[i]
-        if self.maxPoint is None:
-            self.maxPoint = list(point[:])
-        else:
-            for i in range(3):
-                if point[i] > self.maxPoint[i]:
-                    self.maxPoint[i] = point[i]
-        self.points.append(point)
+        self.points.append(np.array([point], dtype=np.float64))
 
     def addMeshObj(self, obj: bpy.types.Object, transform: Matrix):
-        mesh = obj.data
-        for vertex in mesh.vertices:
-            self.addPoint(transform @ vertex.co)
-
-    def getEnclosingSphere(self) -> tuple[float, float]:
-        centroid = (Vector(self.minPoint) + Vector(self.maxPoint)) / 2
-        radius = 0
-        for point in self.points:
-            distance = (Vector(point) - centroid).length
-            if distance > radius:
-                radius = distance
-
-        transformedCentroid = [round(value) for value in centroid]
-        transformedRadius = round(radius)
+        self.points.append(transformPoints(getMeshVertices(obj.data), transform))
+
+    def getEnclosingSphere(self) -> tuple[list[int], int]:
+        if len(self.points) == 0:
+            return [0, 0, 0], 0
+
+        points = np.concatenate(self.points)
+        center, _ = getMinimalSphere(points)
+
+        # the radius is measured from the rounded center, so that the exported sphere still encloses every point
+        transformedCentroid = [round(value) for value in center]
+        transformedRadius = math.ceil(np.sqrt(np.max(np.sum((points - transformedCentroid) ** 2, axis=1))))
         return transformedCentroid, transformedRadius
 
 
@@ -641,6 +641,8 @@ def ootProcessMesh(
                 obj.empty_display_size if cullProp.sizeControlsCull else 1,
             )
         )
+        # The cull group's bounds are set by the user, the geometry drawn in it doesn't enlarge the parent entry's
+        boundingBox = BoundingBox()
 
     elif obj.type == "MESH" and not obj.ignore_render:
         triConverterInfo = TriangleConverterInfo(obj, None, roomShape.model.f3d, relativeTransform, getInfoDict(obj))
@@ -1,12 +1,14 @@
 from dataclasses import dataclass
+from functools import partial
 from mathutils import Matrix
 from bpy.types import Object
 from typing import Optional
 from ....utility import PluginError, CData, indent
+from ....c_emitter import emitParallel
 from ....f3d.f3d_gbi import TextureExportSettings, ScrollMethod
 from ...scene.properties import OOTSceneHeaderProperty
 from ...oot_model_classes import OOTModel, OOTGfxFormatter
-from ..file import SceneFile
+from ..file import RoomFile, SceneFile
 from ..utility import Utility, altHeaderList
 from ..collision import CollisionHeader
 from .header import SceneAlternateHeader, SceneHeader
@@ -26,10 +28,18 @@ class Scene:
     hasAlternateHeaders: bool
 
     @staticmethod
-    def new(name: str, sceneObj: Object, transform: Matrix, useMacros: bool, saveTexturesAsPNG: bool, model: OOTModel):
+    def new(
+        name: str,
+        sceneObj: Object,
+        transform: Matrix,
+        useMacros: bool,
+        saveTexturesAsPNG: bool,
+        model: OOTModel,
+        reusedRooms: Optional[set[int]] = None,
+    ):
         i = 0
         rooms = RoomEntries.new(
-            f"{name}_roomList", name.removesuffix("_scene"), model, sceneObj, transform, saveTexturesAsPNG
+            f"{name}_roomList", name.removesuffix("_scene"), model, sceneObj, transform, saveTexturesAsPNG, reusedRooms
         )
 
         colHeader = CollisionHeader.new(
@@ -199,13 +209,26 @@ class Scene:
 
         return self.model.to_c(textureExportSettings, OOTGfxFormatter(ScrollMethod.Vertex)).all()
 
-    def getNewSceneFile(self, path: str, isSingleFile: bool, textureExportSettings: TextureExportSettings):
-        """Returns a new scene file containing the C data"""
+    def getNewSceneFile(
+        self,
+        path: str,
+        isSingleFile: bool,
+        textureExportSettings: TextureExportSettings,
+        sceneTexturesData: Optional[CData] = None,
+        reusedRoomHeaders: Optional[dict[int, str]] = None,
+    ) -> tuple[SceneFile, CData]:
+        """
+        Returns a new scene file containing the C data, and the scene textures data.
+        The rooms and the scene textures are generated by the C export workers,
+        and the room files are written as soon as they are generated.
+        Rooms in ``reusedRoomHeaders`` are kept from a previous export, along with ``sceneTexturesData``.
+        """
 
         sceneMainData = self.getSceneMainC()
         sceneCollisionData = self.colHeader.getC()
         sceneCutsceneData = self.getSceneCutscenesC()
-        sceneTexturesData = self.getSceneTexturesC(textureExportSettings)
+        if reusedRoomHeaders is None:
+            reusedRoomHeaders = {}
 
         includes = (
             "\n".join(
@@ -218,25 +241,57 @@ class Scene:
             + "\n\n\n"
         )
 
-        return SceneFile(
+        # The scene textures are set once generated, rooms only need the scene's name to be written
+        sceneFile = SceneFile(
             self.name,
             sceneMainData.source,
             sceneCollisionData.source,
             [cs.source for cs in sceneCutsceneData],
-            sceneTexturesData.source,
-            {
-                room.roomIndex: room.getNewRoomFile(path, isSingleFile, textureExportSettings)
-                for room in self.rooms.entries
-            },
+            "",
+            {},
             isSingleFile,
             path,
-            (
-                f"#ifndef {self.name.upper()}_H\n"
-                + f"#define {self.name.upper()}_H\n\n"
-                + includes
-                + sceneMainData.header
-                + "".join(cs.header for cs in sceneCutsceneData)
-                + sceneCollisionData.header
-                + sceneTexturesData.header
-            ),
+            "",
+        )
+
+        # Everything is generated in one call, so that the export only starts the C export workers once
+        exportedRooms = [room for room in self.rooms.entries if room.roomIndex not in reusedRoomHeaders]
+        jobs = [partial(room.getNewRoomFile, path, isSingleFile, textureExportSettings) for room in exportedRooms]
+        if sceneTexturesData is None:
+            jobs.append(partial(self.model.generate_c, textureExportSettings, OOTGfxFormatter(ScrollMethod.Vertex)))
+
+        def onResult(result):
+            if isinstance(result, RoomFile):
+                sceneFile.writeRoom(result)
+
+        results = emitParallel(jobs, onResult)
+        if sceneTexturesData is None:
+            sceneTexturesData = results.pop().all()
+            self.model.save_c_textures(textureExportSettings)
+
+        sceneFile.sceneTextures = sceneTexturesData.source
+        sceneFile.header = (
+            f"#ifndef {self.name.upper()}_H\n"
+            + f"#define {self.name.upper()}_H\n\n"
+            + includes
+            + sceneMainData.header
+            + "".join(cs.header for cs in sceneCutsceneData)
+            + sceneCollisionData.header
+            + sceneTexturesData.header
         )
+
+        exportedRoomFiles: dict[int, RoomFile] = {}
+        for room, roomFile in zip(exportedRooms, results):
+            room.saveTextures(textureExportSettings)
+            exportedRoomFiles[room.roomIndex] = roomFile
+
+        for room in self.rooms.entries:
+            if room.roomIndex in exportedRoomFiles:
+                sceneFile.roomList[room.roomIndex] = exportedRoomFiles[room.roomIndex]
+            else:
+                # Only its part of the scene header is needed, its files are already written
+                sceneFile.roomList[room.roomIndex] = RoomFile(
+                    room.name, "", "", "", isSingleFile, path, reusedRoomHeaders[room.roomIndex]
+                )
+        sceneFile.roomsWritten = True
+        return sceneFile, sceneTexturesData
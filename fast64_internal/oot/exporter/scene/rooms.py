@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 from mathutils import Matrix
 from bpy.types import Object
 from ....utility import PluginError, CData, indent
@@ -13,8 +14,19 @@ class RoomEntries:
     entries: list[Room]
 
     @staticmethod
-    def new(name: str, sceneName: str, model: OOTModel, sceneObj: Object, transform: Matrix, saveTexturesAsPNG: bool):
-        """Returns the room list from empty objects with the type 'Room'"""
+    def new(
+        name: str,
+        sceneName: str,
+        model: OOTModel,
+        sceneObj: Object,
+        transform: Matrix,
+        saveTexturesAsPNG: bool,
+        reusedRooms: Optional[set[int]] = None,
+    ):
+        """
+        Returns the room list from empty objects with the type 'Room'.
+        The meshes of ``reusedRooms`` aren't converted, their files are kept from a previous export.
+        """
 
         roomDict: dict[int, Room] = {}
         roomObjs = getObjectList(sceneObj.children_recursive, "EMPTY", "Room")
@@ -46,6 +58,7 @@ class RoomEntries:
                 roomIndex,
                 sceneName,
                 saveTexturesAsPNG,
+                reusedRooms is None or roomIndex not in reusedRooms,
             )
 
         for i in range(min(roomDict.keys()), len(roomDict)):
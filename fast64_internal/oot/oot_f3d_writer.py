@@ -1,5 +1,6 @@
 import bpy, os, re
 from ..utility import CData, getGroupIndexFromname, readFile, writeFile
+from ..file_lock import lockSharedFile
 from ..f3d.flipbook import flipbook_to_c, flipbook_2d_to_c, flipbook_data_to_c
 from ..f3d.f3d_material import createF3DMat, F3DMaterial_UpdateLock, update_preset_manual
 from .oot_utility import replaceMatchContent, getOOTScale
@@ -201,9 +202,9 @@ def writeTextureArraysNew(fModel: OOTModel, arrayIndex: int):
     for flipbook in fModel.flipbooks:
         if flipbook.exportMode == "Array":
             if arrayIndex is not None:
-                textureArrayData.source += flipbook_2d_to_c(flipbook, True, arrayIndex + 1) + "\n"
+                textureArrayData.add_source(flipbook_2d_to_c(flipbook, True, arrayIndex + 1) + "\n")
             else:
-                textureArrayData.source += flipbook_to_c(flipbook, True) + "\n"
+                textureArrayData.add_source(flipbook_to_c(flipbook, True) + "\n")
     return textureArrayData
 
 
@@ -229,18 +230,19 @@ def writeTextureArraysExisting(
         print(f"{actorFilePath} not found, ignoring texture array writing.")
         return
 
-    actorData = readFile(actorFilePath)
-    newData = actorData
+    with lockSharedFile(actorFilePath):
+        actorData = readFile(actorFilePath)
+        newData = actorData
 
-    for flipbook in fModel.flipbooks:
-        if flipbook.exportMode == "Array":
-            if flipbookArrayIndex2D is None:
-                newData = writeTextureArraysExisting1D(newData, flipbook, "")
-            else:
-                newData = writeTextureArraysExisting2D(newData, flipbook, flipbookArrayIndex2D)
+        for flipbook in fModel.flipbooks:
+            if flipbook.exportMode == "Array":
+                if flipbookArrayIndex2D is None:
+                    newData = writeTextureArraysExisting1D(newData, flipbook, "")
+                else:
+                    newData = writeTextureArraysExisting2D(newData, flipbook, flipbookArrayIndex2D)
 
-    if newData != actorData:
-        writeFile(actorFilePath, newData)
+        if newData != actorData:
+            writeFile(actorFilePath, newData)
 
 
 def writeTextureArraysExisting1D(data: str, flipbook: TextureFlipbook, additionalIncludes: str) -> str:
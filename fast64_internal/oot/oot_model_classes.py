@@ -7,8 +7,7 @@ from ..f3d.flipbook import TextureFlipbook, FlipbookProperty, usesFlipbook, ootF
 
 from ..f3d.f3d_writer import VertexGroupInfo, TriangleConverterInfo
 from ..f3d.f3d_texture_writer import (
-    getColorsUsedInImage,
-    mergePalettes,
+    getColorsUsedInImages,
     writeCITextureData,
     writeNonCITextureData,
     getTextureNamesFromImage,
@@ -179,7 +178,6 @@ class OOTModel(FModel):
 
         flipbook = TextureFlipbook(flipbookProp.name, flipbookProp.exportMode, [], [])
 
-        pal = []
         allImages = self.validateImages(material, index)
         for flipbookTexture in flipbookProp.textures:
             # print(f"Texture: {str(flipbookTexture.image)}")
@@ -200,11 +198,13 @@ class OOTModel(FModel):
                 filename,
             )
 
-            pal = mergePalettes(pal, getColorsUsedInImage(flipbookTexture.image, texProp.ci_format))
-
             flipbook.textureNames.append(fImage_temp.name)
             flipbook.images.append((flipbookTexture.image, fImage_temp))
 
+        # One pass over all flipbook textures, since they share a palette
+        pal = getColorsUsedInImages(
+            [flipbookTexture.image for flipbookTexture in flipbookProp.textures], texProp.ci_format
+        )
         # print(f"Palette length: {len(pal)}") # Checked in moreSetupFromModel
         return allImages, flipbook, pal
 
@@ -296,6 +296,9 @@ class ExportInfo:
     hackerootBootOption: "OOTBootupSceneOptions"
     """ Options for setting the bootup scene in HackerOoT."""
 
+    isIncremental: bool = False
+    """ Whether to keep the files of the rooms that didn't change since the previous export."""
+
 
 @dataclass
 class RemoveInfo:
@@ -8,7 +8,7 @@ from bpy.utils import register_class, unregister_class
 from bpy.ops import object
 from mathutils import Matrix, Vector
 from ...f3d.f3d_gbi import TextureExportSettings, DLFormat
-from ...utility import PluginError, raisePluginError, ootGetSceneOrRoomHeader
+from ...utility import PluginError, raisePluginError, ootGetSceneOrRoomHeader, fileWriteReport
 from ..oot_utility import ExportInfo, RemoveInfo, sceneNameFromID
 from ..oot_constants import ootEnumMusicSeq, ootEnumSceneID
 from ..importer import parseScene
@@ -180,13 +180,15 @@ class OOT_ExportScene(Operator):
                 settings.singleFile,
                 context.scene.fast64.oot.useDecompFeatures if not hackerFeaturesEnabled else hackerFeaturesEnabled,
                 bootOptions if hackerFeaturesEnabled else None,
+                settings.incremental,
             )
 
-            SceneExport.export(
-                obj,
-                finalTransform,
-                exportInfo,
-            )
+            with fileWriteReport("Scene export"):
+                SceneExport.export(
+                    obj,
+                    finalTransform,
+                    exportInfo,
+                )
 
             self.report({"INFO"}, "Success!")
 
@@ -487,6 +487,11 @@ class OOTExportSceneSettingsProperty(PropertyGroup):
         default=False,
         description="Does not split the scene and rooms into multiple files.",
     )
+    incremental: BoolProperty(
+        name="Incremental Export",
+        default=False,
+        description="Only converts and writes the rooms that changed since the previous export of this scene",
+    )
     option: EnumProperty(items=ootEnumSceneID, default="SCENE_DEKU_TREE")
 
     # keeping this on purpose, will be removed once old code is cleaned-up
@@ -505,6 +510,7 @@ class OOTExportSceneSettingsProperty(PropertyGroup):
         prop_split(layout, bpy.context.scene, "ootSceneExportObj", "Scene Object")
 
         layout.prop(self, "singleFile")
+        layout.prop(self, "incremental")
         layout.prop(self, "customExport")
         # layout.prop(self, "useNewExporter")
 
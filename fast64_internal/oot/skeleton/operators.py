@@ -4,7 +4,7 @@ from bpy.utils import register_class, unregister_class
 from bpy.path import abspath
 from mathutils import Matrix
 from ...f3d.f3d_gbi import DLFormat
-from ...utility import PluginError, raisePluginError
+from ...utility import PluginError, raisePluginError, fileWriteReport
 from ..oot_utility import getStartBone, getNextBone, getOOTScale
 from .exporter import ootConvertArmatureToC
 from .importer import ootImportSkeletonC
@@ -122,7 +122,10 @@ class OOT_ExportSkeleton(Operator):
             saveTextures = context.scene.saveTextures
             drawLayer = armatureObj.ootDrawLayer
 
-            ootConvertArmatureToC(armatureObj, finalTransform, DLFormat.Static, saveTextures, drawLayer, exportSettings)
+            with fileWriteReport("Skeleton export"):
+                ootConvertArmatureToC(
+                    armatureObj, finalTransform, DLFormat.Static, saveTextures, drawLayer, exportSettings
+                )
 
             self.report({"INFO"}, "Success!")
             return {"FINISHED"}
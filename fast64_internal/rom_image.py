@@ -0,0 +1,112 @@
+import mmap
+import struct
+
+import numpy as np
+
+from .utility import PluginError
+
+u16Struct = struct.Struct(">H")
+s16Struct = struct.Struct(">h")
+u32Struct = struct.Struct(">I")
+s32Struct = struct.Struct(">i")
+
+
+class RomImage:
+    """
+    Read only view of a ROM file, memory mapped so that reads don't go through the file.
+    The typed accessors read big endian values at an offset.
+    Open one per import and pass it to every parser, instead of reopening the ROM.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        self.ownsFile = True
+        self.mapFile()
+
+    @classmethod
+    def fromFile(cls, file) -> "RomImage":
+        """
+        Maps a ROM file that is already open, like the ROM an exporter writes to, so that it can be parsed.
+        Closing the image leaves the file open.
+        """
+        if file.writable():
+            file.flush()
+        image = cls.__new__(cls)
+        image.path = file.name
+        image.file = file
+        image.ownsFile = False
+        image.mapFile()
+        return image
+
+    def mapFile(self):
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError) as e:
+            if self.ownsFile:
+                self.file.close()
+            raise PluginError(f"Could not read ROM {self.path}: {e}")
+        self.data = memoryview(self.mmap)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.data)
+
+    def close(self):
+        if self.mmap.closed:
+            return
+        try:
+            self.data.release()
+            self.mmap.close()
+        except BufferError:
+            pass  # arrays still reference the mapping, it is unmapped once they are freed
+        if self.ownsFile:
+            self.file.close()
+
+    # Typed accessors
+
+    def view(self, offset: int, size: int) -> memoryview:
+        """Zero copy slice of the ROM, only valid until the RomImage is closed"""
+        return self.data[offset : offset + size]
+
+    def readBytes(self, offset: int, size: int) -> bytes:
+        """Copy of a slice of the ROM, for data kept after the RomImage is closed"""
+        return self.data[offset : offset + size].tobytes()
+
+    def u8(self, offset: int) -> int:
+        return self.data[offset]
+
+    def u16(self, offset: int) -> int:
+        return u16Struct.unpack_from(self.data, offset)[0]
+
+    def s16(self, offset: int) -> int:
+        return s16Struct.unpack_from(self.data, offset)[0]
+
+    def u32(self, offset: int) -> int:
+        return u32Struct.unpack_from(self.data, offset)[0]
+
+    def s32(self, offset: int) -> int:
+        return s32Struct.unpack_from(self.data, offset)[0]
+
+    def u16Array(self, offset: int, count: int) -> np.ndarray:
+        return np.frombuffer(self.data, dtype=">u2", count=count, offset=offset)
+
+    def s16Array(self, offset: int, count: int) -> np.ndarray:
+        return np.frombuffer(self.data, dtype=">i2", count=count, offset=offset)
+
+    def readSegmentedPointer(self, offset: int, segmentData: dict[int, tuple[int, int]]) -> int:
+        """Reads a segmented pointer and returns its ROM address"""
+        return segmentedToRomAddress(self.u32(offset), segmentData)
+
+
+def segmentedToRomAddress(address: int, segmentData: dict[int, tuple[int, int]]) -> int:
+    """Same as decodeSegmentedAddr, for an int address"""
+    segment = address >> 24
+    if segment not in segmentData:
+        raise PluginError("Segment " + str(segment) + " not found in segment list.")
+    return segmentData[segment][0] + (address & 0xFFFFFF)
@@ -1,6 +1,9 @@
 import bpy, os, copy, shutil, mathutils, math
+import numpy as np
 from bpy.utils import register_class, unregister_class
 from ..panels import SM64_Panel
+from ..rom_image import RomImage, segmentedToRomAddress
+from ..file_lock import lockSharedFile
 from .sm64_level_parser import parseLevelAtPointer
 from .sm64_rom_tweaks import ExtendBank0x04
 from .sm64_geolayout_bone import animatableBoneTypes
@@ -15,6 +18,7 @@ from ..utility import (
     getExportDir,
     toAlnum,
     writeIfNotFound,
+    writeFileIfChanged,
     get64bitAlignedAddr,
     writeInsertableFile,
     getFrameInterval,
@@ -33,6 +37,9 @@ from ..utility import (
     makeWriteInfoBox,
     writeBoxExportType,
     stashActionInArmature,
+    setKeyframes,
+    ArmatureFrameSampler,
+    packValueSequences,
     enumExportHeaderType,
 )
 
@@ -225,55 +232,50 @@ def exportAnimationC(armatureObj, loopAnim, dirPath, dirName, groupName, customE
     animPath = os.path.join(animDirPath, animFileName)
 
     data = sm64_anim.to_c()
-    outFile = open(animPath, "w", newline="\n")
-    outFile.write(data.source)
-    outFile.close()
+    writeFileIfChanged(animPath, data.source_chunks())
 
     headerPath = os.path.join(geoDirPath, "anim_header.h")
-    headerFile = open(headerPath, "w", newline="\n")
-    headerFile.write("extern const struct Animation *const " + animsName + "[];\n")
-    headerFile.close()
+    writeFileIfChanged(headerPath, "extern const struct Animation *const " + animsName + "[];\n")
 
     # write to data.inc.c
     dataFilePath = os.path.join(animDirPath, "data.inc.c")
-    if not os.path.exists(dataFilePath):
-        dataFile = open(dataFilePath, "w", newline="\n")
-        dataFile.close()
-    writeIfNotFound(dataFilePath, '#include "' + animFileName + '"\n', "")
+    with lockSharedFile(dataFilePath):
+        if not os.path.exists(dataFilePath):
+            dataFile = open(dataFilePath, "w", newline="\n")
+            dataFile.close()
+        writeIfNotFound(dataFilePath, '#include "' + animFileName + '"\n', "")
 
     # write to table.inc.c
     tableFilePath = os.path.join(animDirPath, "table.inc.c")
-
-    # if table doesn´t exist, create one
-    if not os.path.exists(tableFilePath):
-        tableFile = open(tableFilePath, "w", newline="\n")
-        tableFile.write("const struct Animation *const " + animsName + "[] = {\n\tNULL,\n};\n")
-        tableFile.close()
-
-    stringData = ""
-    with open(tableFilePath, "r") as f:
-        stringData = f.read()
-
-    # if animation header isn´t already in the table then add it.
-    if sm64_anim.header.name not in stringData:
-        # search for the NULL value which represents the end of the table
-        # (this value is not present in vanilla animation tables)
-        footerIndex = stringData.rfind("\tNULL,\n")
-
-        # if the null value cant be found, look for the end of the array
-        if footerIndex == -1:
-            footerIndex = stringData.rfind("};")
-
-            # if that can´t be found then throw an error.
+    with lockSharedFile(tableFilePath):
+        # if table doesn´t exist, create one
+        if not os.path.exists(tableFilePath):
+            writeFileIfChanged(tableFilePath, "const struct Animation *const " + animsName + "[] = {\n\tNULL,\n};\n")
+
+        stringData = ""
+        with open(tableFilePath, "r") as f:
+            stringData = f.read()
+
+        # if animation header isn´t already in the table then add it.
+        if sm64_anim.header.name not in stringData:
+            # search for the NULL value which represents the end of the table
+            # (this value is not present in vanilla animation tables)
+            footerIndex = stringData.rfind("\tNULL,\n")
+
+            # if the null value cant be found, look for the end of the array
             if footerIndex == -1:
-                raise PluginError("Animation table´s footer does not seem to exist.")
+                footerIndex = stringData.rfind("};")
+
+                # if that can´t be found then throw an error.
+                if footerIndex == -1:
+                    raise PluginError("Animation table´s footer does not seem to exist.")
 
-            stringData = stringData[:footerIndex] + "\tNULL,\n" + stringData[footerIndex:]
+                stringData = stringData[:footerIndex] + "\tNULL,\n" + stringData[footerIndex:]
 
-        stringData = stringData[:footerIndex] + f"\t&{sm64_anim.header.name},\n" + stringData[footerIndex:]
+            stringData = stringData[:footerIndex] + f"\t&{sm64_anim.header.name},\n" + stringData[footerIndex:]
 
-        with open(tableFilePath, "w") as f:
-            f.write(stringData)
+            with open(tableFilePath, "w") as f:
+                f.write(stringData)
 
     if not customExport:
         if headerType == "Actor":
@@ -368,40 +370,37 @@ def exportAnimationCommon(armatureObj, loopAnim, name):
     repetitions = 0 if loopAnim else 1
     marioYOffset = 0x00  # ??? Seems to be this value for most animations
 
-    transformValuesOffset = 0
     headerSize = 0x1A
     transformIndicesStart = headerSize  # 0x18 if including animSize?
 
-    # all node rotations + root translation
-    # *3 for each property (xyz) and *4 for entry size
-    # each keyframe stored as 2 bytes
-    # transformValuesStart = transformIndicesStart + (nodeCount + 1) * 3 * 4
-    transformValuesStart = transformIndicesStart
+    # root translation + all node rotations, one sequence per property (xyz)
+    valueSequences = [
+        [
+            int.from_bytes(value.to_bytes(2, "big", signed=True), byteorder="big", signed=False)
+            for value in translationFrameProperty.frames
+        ]
+        for translationFrameProperty in translationData
+    ]
+    for boneFrameData in armatureFrameData:
+        for boneFrameDataProperty in boneFrameData:
+            valueSequences.append(boneFrameDataProperty.frames)
 
-    for translationFrameProperty in translationData:
-        frameCount = len(translationFrameProperty.frames)
-        sm64_anim.indices.shortData.append(frameCount)
-        sm64_anim.indices.shortData.append(transformValuesOffset)
-        if (transformValuesOffset) > 2**16 - 1:
+    # identical and overlapping sequences share values
+    transformValuesOffsets = packValueSequences(valueSequences, sm64_anim.values.shortData)
+    for frames, transformValuesOffset in zip(valueSequences, transformValuesOffsets):
+        if transformValuesOffset > 2**16 - 1:
             raise PluginError("Animation is too large.")
-        transformValuesOffset += frameCount
-        transformValuesStart += 4
-        for value in translationFrameProperty.frames:
-            sm64_anim.values.shortData.append(
-                int.from_bytes(value.to_bytes(2, "big", signed=True), byteorder="big", signed=False)
-            )
+        sm64_anim.indices.shortData.append(len(frames))
+        sm64_anim.indices.shortData.append(transformValuesOffset)
 
-    for boneFrameData in armatureFrameData:
-        for boneFrameDataProperty in boneFrameData:
-            frameCount = len(boneFrameDataProperty.frames)
-            sm64_anim.indices.shortData.append(frameCount)
-            sm64_anim.indices.shortData.append(transformValuesOffset)
-            if (transformValuesOffset) > 2**16 - 1:
-                raise PluginError("Animation is too large.")
-            transformValuesOffset += frameCount
-            transformValuesStart += 4
-            for value in boneFrameDataProperty.frames:
-                sm64_anim.values.shortData.append(value)
+    unpackedSize = sum(len(frames) for frames in valueSequences) * 2
+    packedSize = len(sm64_anim.values.shortData) * 2
+    print(
+        f"Animation values of {sm64_anim.name}: {packedSize} bytes, {unpackedSize - packedSize} bytes saved by packing"
+    )
+
+    # each index entry is 4 bytes (frame count, value offset)
+    transformValuesStart = transformIndicesStart + len(sm64_anim.indices.shortData) * 2
 
     animSize = headerSize + len(sm64_anim.indices.shortData) * 2 + len(sm64_anim.values.shortData) * 2
 
@@ -445,34 +444,30 @@ def convertAnimationData(anim, armatureObj, *, frame_start, frame_count):
         [ValueFrameData(i, 0, []), ValueFrameData(i, 1, []), ValueFrameData(i, 2, [])] for i in range(len(animBones))
     ]
 
-    currentFrame = bpy.context.scene.frame_current
-    for frame in range(frame_start, frame_start + frame_count):
-        bpy.context.scene.frame_set(frame)
-        rootPoseBone = armatureObj.pose.bones[animBones[0]]
-
+    sampler = ArmatureFrameSampler(armatureObj)
+    for frame in sampler.frames(frame_start, frame_count):
         translation = (
-            mathutils.Matrix.Scale(bpy.context.scene.fast64.sm64.blender_to_sm64_scale, 4) @ rootPoseBone.matrix_basis
+            mathutils.Matrix.Scale(bpy.context.scene.fast64.sm64.blender_to_sm64_scale, 4)
+            @ sampler.matrixBasis(animBones[0])
         ).decompose()[0]
         saveTranslationFrame(translationData, translation)
 
         for boneIndex in range(len(animBones)):
             boneName = animBones[boneIndex]
             currentBone = armatureObj.data.bones[boneName]
-            currentPoseBone = armatureObj.pose.bones[boneName]
 
-            rotationValue = (currentBone.matrix.to_4x4().inverted() @ currentPoseBone.matrix).to_quaternion()
+            rotationValue = (currentBone.matrix.to_4x4().inverted() @ sampler.matrix(boneName)).to_quaternion()
             if currentBone.parent is not None:
                 rotationValue = (
                     currentBone.matrix.to_4x4().inverted()
-                    @ currentPoseBone.parent.matrix.inverted()
-                    @ currentPoseBone.matrix
+                    @ sampler.matrix(currentBone.parent.name).inverted()
+                    @ sampler.matrix(boneName)
                 ).to_quaternion()
 
                 # rest pose local, compared to current pose local
 
             saveQuaternionFrame(armatureFrameData[boneIndex], rotationValue)
 
-    bpy.context.scene.frame_set(currentFrame)
     removeTrailingFrames(translationData)
     for frameData in armatureFrameData:
         removeTrailingFrames(frameData)
@@ -527,8 +522,7 @@ def importAnimationToBlender(romfile, startAddress, armatureObj, segmentData, is
                     index=propertyIndex,
                     action_group=startBoneName,
                 )
-                for frame in range(len(boneFrameData[propertyIndex])):
-                    fcurve.keyframe_points.insert(frame, boneFrameData[propertyIndex][frame])
+                setKeyframes(fcurve, boneFrameData[propertyIndex])
             isRootTranslation = False
         else:
             bone, boneStack = getNextBone(boneStack, armatureObj)
@@ -538,8 +532,7 @@ def importAnimationToBlender(romfile, startAddress, armatureObj, segmentData, is
                     index=propertyIndex,
                     action_group=bone.name,
                 )
-                for frame in range(len(boneFrameData[propertyIndex])):
-                    fcurve.keyframe_points.insert(frame, boneFrameData[propertyIndex][frame])
+                setKeyframes(fcurve, boneFrameData[propertyIndex])
 
     if armatureObj.animation_data is None:
         armatureObj.animation_data_create()
@@ -598,105 +591,51 @@ def readAnimation(name, romfile, startAddress, segmentData, isDMA):
     return (animationHeader, armatureFrameData)
 
 
-def getKeyFramesRotation(romfile, transformValuesStart, boneIndex):
-    ptrToValue = transformValuesStart + boneIndex.startOffset
-    romfile.seek(ptrToValue)
-
-    keyframes = []
-    for frame in range(boneIndex.numFrames):
-        romfile.seek(ptrToValue + frame * 2)
-        value = int.from_bytes(romfile.read(2), "big") * 360 / (2**16)
-        keyframes.append(math.radians(value))
+def getKeyFramesRotation(romfile: RomImage, transformValuesStart, boneIndex):
+    values = romfile.u16Array(transformValuesStart + boneIndex.startOffset, boneIndex.numFrames)
+    return np.radians(values.astype(np.int64) * 360 / (2**16)).tolist()
 
-    return keyframes
 
+def getKeyFramesTranslation(romfile: RomImage, transformValuesStart, boneIndex):
+    values = romfile.s16Array(transformValuesStart + boneIndex.startOffset, boneIndex.numFrames)
+    return (values.astype(np.int64) / bpy.context.scene.fast64.sm64.blender_to_sm64_scale).tolist()
 
-def getKeyFramesTranslation(romfile, transformValuesStart, boneIndex):
-    ptrToValue = transformValuesStart + boneIndex.startOffset
-    romfile.seek(ptrToValue)
-
-    keyframes = []
-    for frame in range(boneIndex.numFrames):
-        romfile.seek(ptrToValue + frame * 2)
-        keyframes.append(
-            int.from_bytes(romfile.read(2), "big", signed=True) / bpy.context.scene.fast64.sm64.blender_to_sm64_scale
-        )
 
-    return keyframes
+def readAnimHeader(name, romfile: RomImage, startAddress, segmentData, isDMA):
+    numRepeats = romfile.u16(startAddress + 0x00)
+    marioYOffset = romfile.u16(startAddress + 0x02)
+    frameInterval = [romfile.u16(startAddress + 0x06), romfile.u16(startAddress + 0x08)]
+    numNodes = romfile.u16(startAddress + 0x0A)
 
-
-def readAnimHeader(name, romfile, startAddress, segmentData, isDMA):
-    frameInterval = [0, 0]
-
-    romfile.seek(startAddress + 0x00)
-    numRepeats = int.from_bytes(romfile.read(2), "big")
-
-    romfile.seek(startAddress + 0x02)
-    marioYOffset = int.from_bytes(romfile.read(2), "big")
-
-    romfile.seek(startAddress + 0x06)
-    frameInterval[0] = int.from_bytes(romfile.read(2), "big")
-
-    romfile.seek(startAddress + 0x08)
-    frameInterval[1] = int.from_bytes(romfile.read(2), "big")
-
-    romfile.seek(startAddress + 0x0A)
-    numNodes = int.from_bytes(romfile.read(2), "big")
-
-    romfile.seek(startAddress + 0x0C)
-    transformValuesOffset = int.from_bytes(romfile.read(4), "big")
+    transformValuesOffset = romfile.u32(startAddress + 0x0C)
     if isDMA:
         transformValuesStart = startAddress + transformValuesOffset
     else:
-        transformValuesStart = decodeSegmentedAddr(transformValuesOffset.to_bytes(4, byteorder="big"), segmentData)
+        transformValuesStart = segmentedToRomAddress(transformValuesOffset, segmentData)
 
-    romfile.seek(startAddress + 0x10)
-    transformIndicesOffset = int.from_bytes(romfile.read(4), "big")
+    transformIndicesOffset = romfile.u32(startAddress + 0x10)
     if isDMA:
         transformIndicesStart = startAddress + transformIndicesOffset
     else:
-        transformIndicesStart = decodeSegmentedAddr(transformIndicesOffset.to_bytes(4, byteorder="big"), segmentData)
+        transformIndicesStart = segmentedToRomAddress(transformIndicesOffset, segmentData)
 
-    romfile.seek(startAddress + 0x14)
-    animSize = int.from_bytes(romfile.read(4), "big")
+    animSize = romfile.u32(startAddress + 0x14)
 
     return SM64_AnimationHeader(
         name, numRepeats, marioYOffset, frameInterval, numNodes, transformValuesStart, transformIndicesStart, animSize
     )
 
 
-def readAnimIndices(romfile, ptrAddress, nodeCount):
-    indices = []
-
-    # Handle root transform
-    rootPosIndex = readTransformIndex(romfile, ptrAddress)
-    indices.append(rootPosIndex)
-
-    # Handle rotations
-    for i in range(nodeCount):
-        rotationIndex = readTransformIndex(romfile, ptrAddress + (i + 1) * 12)
-        indices.append(rotationIndex)
-
-    return indices
-
-
-def readTransformIndex(romfile, startAddress):
-    x = readValueIndex(romfile, startAddress + 0)
-    y = readValueIndex(romfile, startAddress + 4)
-    z = readValueIndex(romfile, startAddress + 8)
-
-    return SM64_AnimIndexNode(x, y, z)
-
-
-def readValueIndex(romfile, startAddress):
-    romfile.seek(startAddress)
-    numFrames = int.from_bytes(romfile.read(2), "big")
-    romfile.seek(startAddress + 2)
-
-    # multiply 2 because value is the index in array of shorts (???)
-    startOffset = int.from_bytes(romfile.read(2), "big") * 2
-    # print(str(hex(startAddress)) + ": " + str(numFrames) + " " + str(startOffset))
-    return SM64_AnimIndex(numFrames, startOffset)
+def readAnimIndices(romfile: RomImage, ptrAddress, nodeCount):
+    # Root translation, then one rotation per node, each as x / y / z pairs of (frame count, value index)
+    values = romfile.u16Array(ptrAddress, (nodeCount + 1) * 6).tolist()
+    return [
+        SM64_AnimIndexNode(
+            # multiply 2 because value is the index in array of shorts (???)
+            *(SM64_AnimIndex(values[i + axis * 2], values[i + axis * 2 + 1] * 2) for axis in range(3))
+        )
+        for i in range(0, len(values), 6)
+    ]
 
 
 def writeAnimation(romfile, startAddress, segmentData):
@@ -772,7 +711,8 @@ class SM64_ExportAnimMario(bpy.types.Operator):
                 romfileOutput = open(bpy.path.abspath(tempROM), "rb+")
 
                 # Note actual level doesn't matter for Mario, since he is in all of 	them
-                levelParsed = parseLevelAtPointer(romfileOutput, level_pointers[context.scene.levelAnimExport])
+                with RomImage.fromFile(romfileOutput) as romImage:
+                    levelParsed = parseLevelAtPointer(romImage, level_pointers[context.scene.levelAnimExport])
                 segmentData = levelParsed.segmentData
                 if context.scene.fast64.sm64.extend_bank_4:
                     ExtendBank0x04(romfileOutput, segmentData, defaultExtendSegment4)
@@ -931,7 +871,7 @@ class SM64_ImportAnimMario(bpy.types.Operator):
         romfileSrc = None
         try:
             import_rom_checks(bpy.path.abspath(context.scene.fast64.sm64.import_rom))
-            romfileSrc = open(bpy.path.abspath(context.scene.fast64.sm64.import_rom), "rb")
+            romfileSrc = RomImage(bpy.path.abspath(context.scene.fast64.sm64.import_rom))
         except Exception as e:
             raisePluginError(self, e)
             return {"CANCELLED"}
@@ -944,9 +884,9 @@ class SM64_ImportAnimMario(bpy.types.Operator):
                 animStart = decodeSegmentedAddr(animStart.to_bytes(4, "big"), segmentData)
 
             if not context.scene.isDMAImport and context.scene.animIsAnimList:
-                romfileSrc.seek(animStart + 4 * context.scene.animListIndexImport)
-                actualPtr = romfileSrc.read(4)
-                animStart = decodeSegmentedAddr(actualPtr, segmentData)
+                animStart = romfileSrc.readSegmentedPointer(
+                    animStart + 4 * context.scene.animListIndexImport, segmentData
+                )
 
             if len(context.selected_objects) == 0:
                 raise PluginError("Armature not selected.")
@@ -979,7 +919,7 @@ class SM64_ImportAllMarioAnims(bpy.types.Operator):
         romfileSrc = None
         try:
             import_rom_checks(bpy.path.abspath(context.scene.fast64.sm64.import_rom))
-            romfileSrc = open(bpy.path.abspath(context.scene.fast64.sm64.import_rom), "rb")
+            romfileSrc = RomImage(bpy.path.abspath(context.scene.fast64.sm64.import_rom))
         except Exception as e:
             raisePluginError(self, e)
             return {"CANCELLED"}
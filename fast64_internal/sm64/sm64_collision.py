@@ -10,6 +10,7 @@ from .sm64_constants import (
 )
 from .sm64_utility import export_rom_checks
 from .sm64_objects import SM64_Area, start_process_sm64_objects
+from ..rom_image import RomImage
 from .sm64_level_parser import parseLevelAtPointer
 from .sm64_rom_tweaks import ExtendBank0x04
 from ..panels import SM64_Panel
@@ -24,6 +25,8 @@ from ..utility import (
     prop_split,
     getExportDir,
     writeIfNotFound,
+    writeFileIfChanged,
+    fileWriteReport,
     deleteIfFound,
     duplicateHierarchy,
     cleanupDuplicatedObjects,
@@ -311,25 +314,19 @@ def exportCollisionC(
 
     colPath = os.path.join(colDirPath, "collision.inc.c")
 
-    fileObj = open(colPath, "w", newline="\n")
     collision = exportCollisionCommon(obj, transformMatrix, includeSpecials, includeChildren, name, None)
     collisionC = collision.to_c()
-    fileObj.write(collisionC.source)
-    fileObj.close()
+    writeFileIfChanged(colPath, collisionC.source_chunks())
 
     cDefine = collisionC.header
     if writeRoomsFile:
         roomsData = collision.to_c_rooms()
         cDefine += roomsData.header
         roomsPath = os.path.join(colDirPath, "rooms.inc.c")
-        roomsFile = open(roomsPath, "w", newline="\n")
-        roomsFile.write(roomsData.source)
-        roomsFile.close()
+        writeFileIfChanged(roomsPath, roomsData.source_chunks())
 
     headerPath = os.path.join(colDirPath, "collision_header.h")
-    cDefFile = open(headerPath, "w", newline="\n")
-    cDefFile.write(cDefine)
-    cDefFile.close()
+    writeFileIfChanged(headerPath, cDefine)
 
     if headerType == "Actor":
         # Write to group files
@@ -398,17 +395,13 @@ def exportCollisionCommon(obj, transformMatrix, includeSpecials, includeChildren
         raise Exception(str(e))
 
     collision = Collision(toAlnum(name) + "_collision")
+    vertIndices = {}
     for collisionType, faces in collisionDict.items():
         collision.triangles[collisionType] = []
         for faceVerts, specialParam, room in faces:
-            indices = []
-            for roundedPosition in faceVerts:
-                index = collisionVertIndex(roundedPosition, collision.vertices)
-                if index is None:
-                    collision.vertices.append(CollisionVertex(roundedPosition))
-                    indices.append(len(collision.vertices) - 1)
-                else:
-                    indices.append(index)
+            indices = [
+                collisionVertIndex(roundedPosition, collision.vertices, vertIndices) for roundedPosition in faceVerts
+            ]
             collision.triangles[collisionType].append(CollisionTriangle(indices, specialParam, room))
     if includeSpecials:
         area = SM64_Area(areaIndex, "", "", "", None, None, [], name, None)
@@ -461,12 +454,13 @@ def roundPosition(position):
     return (int(round(position[0])), int(round(position[1])), int(round(position[2])))
 
 
-def collisionVertIndex(vert, vertArray):
-    for i in range(len(vertArray)):
-        colVert = vertArray[i]
-        if colVert.position == vert:
-            return i
-    return None
+def collisionVertIndex(vert, vertArray, vertIndices):
+    """Returns the index of vert in vertArray, appending it if missing. vertIndices maps positions to indices."""
+    index = vertIndices.get(vert)
+    if index is None:
+        index = vertIndices[vert] = len(vertArray)
+        vertArray.append(CollisionVertex(vert))
+    return index
 
 
 class SM64_ExportCollision(bpy.types.Operator):
@@ -506,19 +500,20 @@ class SM64_ExportCollision(bpy.types.Operator):
                 )
                 if not props.is_actor_custom_export:
                     applyBasicTweaks(export_path)
-                exportCollisionC(
-                    obj,
-                    final_transform,
-                    export_path,
-                    False,
-                    props.include_children,
-                    props.obj_name_col,
-                    props.is_actor_custom_export,
-                    props.export_rooms,
-                    props.export_header_type,
-                    props.actor_group_name,
-                    level_name,
-                )
+                with fileWriteReport("Collision export"):
+                    exportCollisionC(
+                        obj,
+                        final_transform,
+                        export_path,
+                        False,
+                        props.include_children,
+                        props.obj_name_col,
+                        props.is_actor_custom_export,
+                        props.export_rooms,
+                        props.export_header_type,
+                        props.actor_group_name,
+                        level_name,
+                    )
                 self.report({"INFO"}, "Success!")
             elif context.scene.fast64.sm64.export_type == "Insertable Binary":
                 exportCollisionInsertableBinary(
@@ -537,7 +532,8 @@ class SM64_ExportCollision(bpy.types.Operator):
                 romfileExport.close()
                 romfileOutput = open(bpy.path.abspath(tempROM), "rb+")
 
-                levelParsed = parseLevelAtPointer(romfileOutput, level_pointers[context.scene.colExportLevel])
+                with RomImage.fromFile(romfileOutput) as romImage:
+                    levelParsed = parseLevelAtPointer(romImage, level_pointers[context.scene.colExportLevel])
                 segmentData = levelParsed.segmentData
 
                 if context.scene.fast64.sm64.extend_bank_4:
@@ -7,6 +7,7 @@ from bpy.ops import object
 from bpy.props import StringProperty, EnumProperty, BoolProperty
 from ..panels import SM64_Panel
 from ..f3d.f3d_parser import F3DtoBlenderObject
+from ..rom_image import RomImage
 from .sm64_constants import level_enums, level_pointers
 from .sm64_utility import import_rom_checks
 from .sm64_level_parser import parseLevelAtPointer
@@ -39,7 +40,7 @@ class SM64_ImportDL(Operator):
             return {"CANCELLED"}
         try:
             import_rom_checks(abspath(context.scene.fast64.sm64.import_rom))
-            romfileSrc = open(abspath(context.scene.fast64.sm64.import_rom), "rb")
+            romfileSrc = RomImage(abspath(context.scene.fast64.sm64.import_rom))
             levelParsed = parseLevelAtPointer(romfileSrc, level_pointers[context.scene.levelDLImport])
             segmentData = levelParsed.segmentData
             start = (
@@ -15,6 +15,7 @@ from ..f3d.f3d_material import (
 )
 from .sm64_texscroll import modifyTexScrollFiles, modifyTexScrollHeadersGroup
 from .sm64_utility import export_rom_checks, starSelectWarning
+from ..rom_image import RomImage
 from .sm64_level_parser import parseLevelAtPointer
 from .sm64_rom_tweaks import ExtendBank0x04
 from typing import Tuple, Union, Iterable
@@ -62,6 +63,7 @@ from ..utility import (
     toAlnum,
     checkIfPathExists,
     writeIfNotFound,
+    writeFileIfChanged,
     overwriteData,
     getExportDir,
     writeMaterialFiles,
@@ -214,9 +216,7 @@ def exportTexRectToC(dirPath, texProp, texDir, savePNG, name, exportToProject, p
         )
         singleFileData += data
         singleFilePath = os.path.join(dirPath, fTexRect.name + ".c")
-        singleFile = open(singleFilePath, "w", newline="\n")
-        singleFile.write(singleFileData)
-        singleFile.close()
+        writeFileIfChanged(singleFilePath, singleFileData)
 
     if bpy.context.mode != "OBJECT":
         bpy.ops.object.mode_set(mode="OBJECT")
@@ -411,19 +411,13 @@ def sm64ExportF3DtoC(
         )
 
     if texSeparate:
-        texCFile = open(os.path.join(modelDirPath, "texture.inc.c"), "w", newline="\n")
-        texCFile.write(texC.source)
-        texCFile.close()
+        writeFileIfChanged(os.path.join(modelDirPath, "texture.inc.c"), texC.source_chunks())
 
     modelPath = os.path.join(modelDirPath, "model.inc.c")
-    outFile = open(modelPath, "w", newline="\n")
-    outFile.write(staticData.source)
-    outFile.close()
+    writeFileIfChanged(modelPath, staticData.source_chunks())
 
     headerPath = os.path.join(modelDirPath, "header.h")
-    cDefFile = open(headerPath, "w", newline="\n")
-    cDefFile.write(staticData.header)
-    cDefFile.close()
+    writeFileIfChanged(headerPath, staticData.header_chunks())
 
     fileStatus = None
     if not customExport:
@@ -632,7 +626,8 @@ class SM64_ExportDL(bpy.types.Operator):
                 romfileExport.close()
                 romfileOutput = open(bpy.path.abspath(tempROM), "rb+")
 
-                levelParsed = parseLevelAtPointer(romfileOutput, level_pointers[context.scene.levelDLExport])
+                with RomImage.fromFile(romfileOutput) as romImage:
+                    levelParsed = parseLevelAtPointer(romImage, level_pointers[context.scene.levelDLExport])
                 segmentData = levelParsed.segmentData
                 if context.scene.fast64.sm64.extend_bank_4:
                     ExtendBank0x04(romfileOutput, segmentData, defaultExtendSegment4)
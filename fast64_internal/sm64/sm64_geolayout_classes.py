@@ -18,7 +18,7 @@ from ..utility import (
     radians_to_s16,
     geoNodeRotateOrder,
 )
-from ..f3d.f3d_bleed import BleedGraphics
+from ..f3d.f3d_bleed import BleedGraphics, build_material_jump_index
 from ..f3d.f3d_gbi import FModel
 
 from .sm64_geolayout_constants import (
@@ -244,10 +244,8 @@ class Geolayout:
         data = CData()
         data.header = "extern const GeoLayout " + self.name + "[];\n"
         data.source = "const GeoLayout " + self.name + "[] = {\n"
-        for node in self.nodes:
-            data.source += node.to_c(1)
-        data.source += "\t" + endCmd + "(),\n"
-        data.source += "};\n"
+        data.add_source(*(node.to_c(1) for node in self.nodes))
+        data.add_source("\t" + endCmd + "(),\n", "};\n")
         return data
 
     def toTextDump(self, segmentData):
@@ -473,6 +471,7 @@ class JumpNode:
 class GeoLayoutBleed(BleedGraphics):
     def bleed_geo_layout_graph(self, fModel: FModel, geo_layout_graph: GeolayoutGraph, use_rooms: bool = False):
         last_materials = dict()  # last used material should be kept track of per layer
+        material_index = build_material_jump_index(fModel)
 
         def walk(node, last_materials):
             base_node = node.node
@@ -493,7 +492,7 @@ class GeoLayoutBleed(BleedGraphics):
                     fMesh,
                     last_mat if not base_node.bleed_independently else None,
                     cmd_list,
-                    fModel.getAllMaterials().items(),
+                    material_index,
                     default_render_mode,
                 )
                 # if the mesh has culling, it can be culled, and create invalid combinations of f3d to represent the current full DL
@@ -511,6 +510,7 @@ class GeoLayoutBleed(BleedGraphics):
         for node in geo_layout_graph.startGeolayout.nodes:
             last_materials = walk(node, last_materials)
         self.clear_gfx_lists(fModel)
+        self.report_draw_order()
 
 
 # We add Function commands to nonDeformTransformData because any skinned
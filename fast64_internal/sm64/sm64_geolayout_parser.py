@@ -2,6 +2,7 @@ import bpy, mathutils, math, bmesh, copy
 from bpy.utils import register_class, unregister_class
 from ..f3d.f3d_parser import createBlankMaterial, parseF3DBinary
 from ..panels import SM64_Panel
+from ..rom_image import RomImage, segmentedToRomAddress
 from .sm64_level_parser import parseLevelAtPointer
 from .sm64_constants import level_pointers, level_enums
 from .sm64_geolayout_bone import enumShadowType, animatableBoneTypes, enumBoneType
@@ -12,12 +13,8 @@ from ..utility import (
     PluginError,
     decodeSegmentedAddr,
     raisePluginError,
-    bytesToHexClean,
     bitMask,
-    readVectorFromShorts,
     findStartBones,
-    readEulerVectorFromShorts,
-    readFloatFromShort,
     doRotation,
     prop_split,
     sm64BoneUp,
@@ -56,13 +53,30 @@ from .sm64_geolayout_classes import (
 
 blender_modes = {"OBJECT", "BONE"}
 
+
+def readCmdHeader(romfile: RomImage, address: int) -> tuple[int, int]:
+    """Returns the command type and the parameter byte of the command at address"""
+    return romfile.u8(address), romfile.u8(address + 1)
+
+
+def readRomVector(romfile: RomImage, address: int) -> list[float]:
+    """Same as readVectorFromShorts, for shorts at a ROM address"""
+    scale = bpy.context.scene.fast64.sm64.blender_to_sm64_scale
+    return [romfile.s16(address + offset) / scale for offset in range(0, 6, 2)]
+
+
+def readRomEulerVector(romfile: RomImage, address: int) -> list[float]:
+    """Same as readEulerVectorFromShorts, for shorts at a ROM address"""
+    return [math.radians(romfile.s16(address + offset)) for offset in range(0, 6, 2)]
+
+
 # This geolayout parser is designed to rip armature / model.
 # It will only handle transform/mesh related commands.
 # For switch cases, only the first option will be chosen.
 
 
 def parseGeoLayout(
-    romfile,
+    romfile: RomImage,
     startAddress,
     scene,
     segmentData,
@@ -72,7 +86,6 @@ def parseGeoLayout(
     shadeSmooth,
 ):
     currentAddress = startAddress
-    romfile.seek(currentAddress)
 
     # Create new skinned mesh
     # bpy.ops.object.mode_set(mode = 'OBJECT')
@@ -205,8 +218,7 @@ def parseNode(
     currentTransform = copy.deepcopy(currentTransform)
     originalTransform = copy.deepcopy(currentTransform)
     currentAddress += getGeoLayoutCmdLength(*currentCmd)
-    romfile.seek(currentAddress)
-    currentCmd = romfile.read(2)
+    currentCmd = readCmdHeader(romfile, currentAddress)
     armatureMeshGroups = []
 
     # True if at least one complete node processed.
@@ -490,9 +502,8 @@ def parseNode(
 
         nodeIndex[-1] += 1
 
-        romfile.seek(currentAddress)
         previousCmdType = currentCmd[0]
-        currentCmd = romfile.read(2)
+        currentCmd = readCmdHeader(romfile, currentAddress)
 
         if previousCmdType not in nodeGroupCmds or currentCmd[0] != GEO_NODE_OPEN:
             completeNodeProcessed = True
@@ -815,10 +826,8 @@ def parseSwitch(
     commandSize = 8
 
     if not ignoreNode:
-        romfile.seek(currentAddress)
-        command = romfile.read(commandSize)
-        funcParam = int.from_bytes(command[2:4], "big", signed=True)
-        switchFunc = bytesToHexClean(command[4:8])
+        funcParam = romfile.s16(currentAddress + 2)
+        switchFunc = format(romfile.u32(currentAddress + 4), "08x")
 
         boneName = format(nodeIndex, "03") + "-switch"
         if armatureObj is not None:
@@ -848,10 +857,7 @@ def parseDL(
     vertexBuffer,
 ):
     drawLayer = bitMask(currentCmd[1], 0, 4)
-
-    romfile.seek(currentAddress)
     commandSize = 8
-    command = romfile.read(commandSize)
 
     if not ignoreNode:
         boneName = handleNodeCommon(
@@ -860,7 +866,7 @@ def parseDL(
             parentBoneName,
             currentTransform,
             True,
-            command,
+            currentAddress + commandSize - 4,
             segmentData,
             bMesh,
             obj,
@@ -891,13 +897,10 @@ def parseDLWithOffset(
     vertexBuffer,
 ):
     print("DL_OFFSET " + hex(currentAddress))
-    romfile.seek(currentAddress)
 
-    command = romfile.read(getGeoLayoutCmdLength(*currentCmd))
+    drawLayer = currentCmd[1]
 
-    drawLayer = command[1]
-
-    translationVector = readVectorFromShorts(command, 2)
+    translationVector = readRomVector(romfile, currentAddress + 2)
     translation = mathutils.Matrix.Translation(mathutils.Vector(translationVector))
     finalTransform = currentTransform @ translation
 
@@ -906,8 +909,8 @@ def parseDLWithOffset(
     # Handle parent object and transformation
     # Note: Since we are storing the world transform for each node,
     # we must set the transforms in preorder traversal.
-    segmentedAddr = command[8:12]
-    hasMeshData = int.from_bytes(segmentedAddr, "big") != 0
+    segmentedAddr = romfile.u32(currentAddress + 8)
+    hasMeshData = segmentedAddr != 0
 
     if not ignoreNode:
         if armatureObj is not None:
@@ -922,7 +925,7 @@ def parseDLWithOffset(
 
         # load mesh data
         if hasMeshData:
-            displayListStartAddress = decodeSegmentedAddr(segmentedAddr, segmentData=segmentData)
+            displayListStartAddress = segmentedToRomAddress(segmentedAddr, segmentData)
             # print(displayListStartAddress)
             parseF3DBinary(
                 romfile,
@@ -939,33 +942,27 @@ def parseDLWithOffset(
     # Handle child objects
     # Validate that next command is 04 (open node)
     currentAddress += getGeoLayoutCmdLength(*currentCmd)
-    romfile.seek(currentAddress)  # DONT FORGET THIS, FIXES PARENTING BUG
-    currentCmd = romfile.read(2)
 
     return currentAddress, boneName, finalTransform
 
 
 def parseBranch(romfile, currentCmd, currentAddress, jumps, segmentData=None):
     print("BRANCH " + hex(currentAddress))
-    romfile.seek(currentAddress)
     postJumpAddr = currentAddress + getGeoLayoutCmdLength(*currentCmd)
-    currentCmd = romfile.read(getGeoLayoutCmdLength(*currentCmd))
 
     if currentCmd[1] == 1:
         jumps.append(postJumpAddr)
-    currentAddress = decodeSegmentedAddr(currentCmd[4:8], segmentData=segmentData)
+    currentAddress = romfile.readSegmentedPointer(currentAddress + 4, segmentData)
 
     return currentAddress
 
 
 def parseBranchStore(romfile, currentCmd, currentAddress, jumps, segmentData=None):
     print("BRANCH AND STORE " + hex(currentAddress))
-    romfile.seek(currentAddress)
     postJumpAddr = currentAddress + getGeoLayoutCmdLength(*currentCmd)
-    currentCmd = romfile.read(getGeoLayoutCmdLength(*currentCmd))
 
     jumps.append(postJumpAddr)
-    currentAddress = decodeSegmentedAddr(currentCmd[4:8], segmentData=segmentData)
+    currentAddress = romfile.readSegmentedPointer(currentAddress + 4, segmentData)
 
     return currentAddress
 
@@ -983,7 +980,7 @@ def handleNodeCommon(
     parentBoneName,
     finalTransform,
     loadDL,
-    command,
+    dlPointerAddress,
     segmentData,
     bMesh,
     obj,
@@ -998,10 +995,10 @@ def handleNodeCommon(
         boneName = createBone(armatureObj, parentBoneName, boneName, finalTransform, boneGroupName, loadDL)
 
     if loadDL:
-        segmentedAddr = command[-4:]
-        hasMeshData = int.from_bytes(segmentedAddr, "big") != 0
+        segmentedAddr = romfile.u32(dlPointerAddress)
+        hasMeshData = segmentedAddr != 0
         if hasMeshData:
-            startAddress = decodeSegmentedAddr(segmentedAddr, segmentData)
+            startAddress = segmentedToRomAddress(segmentedAddr, segmentData)
             parseF3DBinary(
                 romfile,
                 startAddress,
@@ -1037,11 +1034,9 @@ def parseScale(
     loadDL = bitMask(currentCmd[1], 7, 1)
     drawLayer = bitMask(currentCmd[1], 0, 4)
 
-    romfile.seek(currentAddress)
     commandSize = 8 + (4 if loadDL else 0)
-    command = romfile.read(commandSize)
 
-    scale = int.from_bytes(command[4:8], "big") / 0x10000
+    scale = romfile.u32(currentAddress + 4) / 0x10000
     # finalTransform = currentTransform @ mathutils.Matrix.Scale(scale, 4)
     finalTransform = currentTransform  # Don't apply to armature
 
@@ -1052,7 +1047,7 @@ def parseScale(
             parentBoneName,
             finalTransform,
             loadDL,
-            command,
+            currentAddress + commandSize - 4,
             segmentData,
             bMesh,
             obj,
@@ -1100,29 +1095,26 @@ def parseTranslateRotate(
     if loadDL:
         commandSize += 4
 
-    romfile.seek(currentAddress)
-    command = romfile.read(commandSize)
-
     if fieldLayout == 0:
-        pos = readVectorFromShorts(command, 4)
-        rot = readEulerVectorFromShorts(command, 10)
+        pos = readRomVector(romfile, currentAddress + 4)
+        rot = readRomEulerVector(romfile, currentAddress + 10)
 
         rotation = mathutils.Euler(rot, geoNodeRotateOrder).to_matrix().to_4x4()
         translation = mathutils.Matrix.Translation(mathutils.Vector(pos))
         finalTransform = currentTransform @ translation @ rotation
 
     elif fieldLayout == 1:
-        pos = readVectorFromShorts(command, 2)
+        pos = readRomVector(romfile, currentAddress + 2)
         translation = mathutils.Matrix.Translation(mathutils.Vector(pos))
         finalTransform = currentTransform @ translation
 
     elif fieldLayout == 2:
-        rot = readEulerVectorFromShorts(command, 2)
+        rot = readRomEulerVector(romfile, currentAddress + 2)
         rotation = mathutils.Euler(rot, geoNodeRotateOrder).to_matrix().to_4x4()
         finalTransform = currentTransform @ rotation
 
     else:
-        yRot = readFloatFromShort(command, 2)
+        yRot = romfile.s16(currentAddress + 2) / bpy.context.scene.fast64.sm64.blender_to_sm64_scale
         rotation = mathutils.Euler((0, yRot, 0), geoNodeRotateOrder).to_matrix().to_4x4()
         finalTransform = currentTransform @ rotation
 
@@ -1133,7 +1125,7 @@ def parseTranslateRotate(
             parentBoneName,
             finalTransform,
             loadDL,
-            command,
+            currentAddress + commandSize - 4,
             segmentData,
             bMesh,
             obj,
@@ -1181,10 +1173,7 @@ def parseTranslate(
     else:
         commandSize = 8
 
-    romfile.seek(currentAddress)
-    command = romfile.read(commandSize)
-
-    pos = readVectorFromShorts(command, 2)
+    pos = readRomVector(romfile, currentAddress + 2)
     translation = mathutils.Matrix.Translation(mathutils.Vector(pos))
     finalTransform = currentTransform @ translation
 
@@ -1195,7 +1184,7 @@ def parseTranslate(
             parentBoneName,
             finalTransform,
             loadDL,
-            command,
+            currentAddress + commandSize - 4,
             segmentData,
             bMesh,
             obj,
@@ -1238,10 +1227,7 @@ def parseRotate(
     else:
         commandSize = 8
 
-    romfile.seek(currentAddress)
-    command = romfile.read(commandSize)
-
-    rot = readEulerVectorFromShorts(command, 2)
+    rot = readRomEulerVector(romfile, currentAddress + 2)
     rotation = mathutils.Euler(rot, geoNodeRotateOrder).to_matrix().to_4x4()
     finalTransform = currentTransform @ rotation
 
@@ -1252,7 +1238,7 @@ def parseRotate(
             parentBoneName,
             finalTransform,
             loadDL,
-            command,
+            currentAddress + commandSize - 4,
             segmentData,
             bMesh,
             obj,
@@ -1294,10 +1280,7 @@ def parseBillboard(
     else:
         commandSize = 8
 
-    romfile.seek(currentAddress)
-    command = romfile.read(commandSize)
-
-    pos = readVectorFromShorts(command, 2)
+    pos = readRomVector(romfile, currentAddress + 2)
     translation = mathutils.Matrix.Translation(mathutils.Vector(pos))
     finalTransform = currentTransform @ translation
 
@@ -1308,7 +1291,7 @@ def parseBillboard(
             parentBoneName,
             finalTransform,
             loadDL,
-            command,
+            currentAddress + commandSize - 4,
             segmentData,
             bMesh,
             obj,
@@ -1333,9 +1316,7 @@ def parseShadow(
     print("SHADOW " + hex(currentAddress))
     commandSize = 8
 
-    romfile.seek(currentAddress)
-    command = romfile.read(commandSize)
-    shadowType = int.from_bytes(command[2:4], "big")
+    shadowType = romfile.u16(currentAddress + 2)
     if str(shadowType) not in enumShadowType:
         if shadowType > 12 and shadowType < 50:  # Square Shadow
             shadowType = 12
@@ -1343,8 +1324,8 @@ def parseShadow(
             shadowType = 50
         else:  # Invalid shadow
             shadowType = 0
-    shadowSolidity = int.from_bytes(command[4:6], "big")
-    shadowScale = int.from_bytes(command[6:8], "big")
+    shadowSolidity = romfile.u16(currentAddress + 4)
+    shadowScale = romfile.u16(currentAddress + 6)
 
     if not ignoreNode:
         boneName = format(nodeIndex, "03") + "-shadow"
@@ -1367,7 +1348,6 @@ def parseStart(
     print("START " + hex(currentAddress))
 
     commandSize = 4
-    romfile.seek(currentAddress)
 
     if not ignoreNode:
         boneName = format(nodeIndex, "03") + "-start"
@@ -1386,9 +1366,7 @@ def parseStartWithRenderArea(
     print("START W/ RENDER AREA" + hex(currentAddress))
 
     commandSize = 4
-    romfile.seek(currentAddress)
-    command = romfile.read(commandSize)
-    cullingRadius = int.from_bytes(command[2:4], "big") / bpy.context.scene.fast64.sm64.blender_to_sm64_scale
+    cullingRadius = romfile.u16(currentAddress + 2) / bpy.context.scene.fast64.sm64.blender_to_sm64_scale
 
     if not ignoreNode:
         boneName = format(nodeIndex, "03") + "-start_render_area"
@@ -1411,10 +1389,8 @@ def parseFunction(
 
     commandSize = 8
 
-    romfile.seek(currentAddress)
-    command = romfile.read(commandSize)
-    asmParam = int.from_bytes(command[2:4], "big", signed=True)
-    asmFunc = bytesToHexClean(command[4:8])
+    asmParam = romfile.s16(currentAddress + 2)
+    asmFunc = format(romfile.u32(currentAddress + 4), "08x")
 
     boneName = format(nodeIndex, "03") + "-asm"
     if armatureObj is not None and not ignoreNode:
@@ -1432,13 +1408,11 @@ def parseHeldObject(
 ):
     print("HELD OBJECT " + hex(currentAddress))
     commandSize = 12
-    romfile.seek(currentAddress)
-    command = romfile.read(commandSize)
 
-    pos = readVectorFromShorts(command, 2)
+    pos = readRomVector(romfile, currentAddress + 2)
     translation = mathutils.Matrix.Translation(mathutils.Vector(pos))
     finalTransform = currentTransform @ translation
-    asmFunc = bytesToHexClean(command[8:12])
+    asmFunc = format(romfile.u32(currentAddress + 8), "08x")
 
     if not ignoreNode:
         boneName = format(nodeIndex, "03") + "-held_object"
@@ -1535,7 +1509,7 @@ class SM64_ImportGeolayout(bpy.types.Operator):
         try:
             import_rom_checks(bpy.path.abspath(context.scene.fast64.sm64.import_rom))
 
-            romfileSrc = open(bpy.path.abspath(context.scene.fast64.sm64.import_rom), "rb")
+            romfileSrc = RomImage(bpy.path.abspath(context.scene.fast64.sm64.import_rom))
 
             armatureObj = None
 
@@ -6,11 +6,13 @@ from io import BytesIO
 
 from ..operators import ObjectDataExporter
 from ..panels import SM64_Panel
+from ..file_lock import lockSharedFile
 from .sm64_objects import InlineGeolayoutObjConfig, inlineGeoLayoutObjects
 from .sm64_geolayout_bone import getSwitchOptionBone, animatableBoneTypes
 from .sm64_camera import saveCameraSettingsToGeolayout
 from .sm64_f3d_writer import SM64Model, SM64GfxFormatter
 from .sm64_texscroll import modifyTexScrollFiles, modifyTexScrollHeadersGroup
+from ..rom_image import RomImage
 from .sm64_level_parser import parseLevelAtPointer
 from .sm64_rom_tweaks import ExtendBank0x04
 from .sm64_utility import export_rom_checks, starSelectWarning
@@ -27,6 +29,8 @@ from ..utility import (
     toAlnum,
     writeMaterialFiles,
     writeIfNotFound,
+    writeFileIfChanged,
+    fileWriteReport,
     get64bitAlignedAddr,
     encodeSegmentedAddr,
     writeMaterialHeaders,
@@ -61,6 +65,7 @@ from ..utility import (
 
 from ..f3d.f3d_bleed import (
     find_material_from_jump_cmd,
+    build_material_jump_index,
 )
 
 from ..f3d.f3d_material import (
@@ -80,6 +85,7 @@ from ..f3d.f3d_writer import (
     saveMeshWithLargeTexturesByFaces,
     saveMeshByFaces,
     getF3DVert,
+    convertVertsToVtx,
 )
 
 from ..f3d.f3d_gbi import (
@@ -280,16 +286,15 @@ def replaceCapReferences(basePath):
 def replaceDLReferenceInGeo(geoPath, pattern, replacement):
     if not os.path.exists(geoPath):
         return
-    geoFile = open(geoPath, "r", newline="\n")
-    geoData = geoFile.read()
-    geoFile.close()
-
-    newData = re.sub(pattern, replacement, geoData, flags=re.DOTALL)
-    if newData != geoData:
-        geoFile = open(geoPath, "w", newline="\n")
-        geoFile.write(newData)
+    with lockSharedFile(geoPath):
+        geoFile = open(geoPath, "r", newline="\n")
+        geoData = geoFile.read()
         geoFile.close()
 
+        newData = re.sub(pattern, replacement, geoData, flags=re.DOTALL)
+        if newData != geoData:
+            writeFileIfChanged(geoPath, newData)
+
 
 def prepareGeolayoutExport(armatureObj, obj):
     # Make object and armature space the same.
@@ -696,7 +701,7 @@ def saveGeolayoutC(
     modifyTexScrollFiles(exportDir, geoDirPath, scrollData)
 
     if DLFormat == DLFormat.Static:
-        staticData.source += "\n" + dynamicData.source
+        staticData.add_source("\n", dynamicData.source)
         staticData.header = geoData.header + staticData.header + dynamicData.header
     else:
         geoData.source = writeMaterialFiles(
@@ -711,29 +716,21 @@ def saveGeolayoutC(
         )
 
     modelPath = os.path.join(geoDirPath, "model.inc.c")
-    modelFile = open(modelPath, "w", newline="\n")
-    modelFile.write(staticData.source)
-    modelFile.close()
+    writeFileIfChanged(modelPath, staticData.source_chunks())
 
     if texSeparate:
         texPath = os.path.join(geoDirPath, "texture.inc.c")
-        texFile = open(texPath, "w", newline="\n")
-        texFile.write(texC.source)
-        texFile.close()
+        writeFileIfChanged(texPath, texC.source_chunks())
 
     fModel.freePalettes()
 
     # save geolayout
     geoPath = os.path.join(geoDirPath, "geo.inc.c")
-    geoFile = open(geoPath, "w", newline="\n")
-    geoFile.write(geoData.source)
-    geoFile.close()
+    writeFileIfChanged(geoPath, geoData.source_chunks())
 
     # save header
     headerPath = os.path.join(geoDirPath, "geo_header.h")
-    cDefFile = open(headerPath, "w", newline="\n")
-    cDefFile.write(staticData.header)
-    cDefFile.close()
+    writeFileIfChanged(headerPath, staticData.header_chunks())
 
     fileStatus = None
     if not customExport:
@@ -1021,9 +1018,7 @@ def geoWriteLevelCommand(romfile, segPointerData, levelCommandPos, modelID):
 
 def geoWriteTextDump(textDumpFilePath, geolayoutGraph, levelData):
     if textDumpFilePath is not None:
-        openfile = open(textDumpFilePath, "w", newline="\n")
-        openfile.write(geolayoutGraph.toTextDump(levelData))
-        openfile.close()
+        writeFileIfChanged(textDumpFilePath, geolayoutGraph.toTextDump(levelData))
 
 
 # Switch Handling Process
@@ -2512,6 +2507,7 @@ def saveOverrideDraw(
     prev_material = None
     last_replaced = None
     command_index = 0
+    material_index = build_material_jump_index(fModel)
 
     while command_index < len(meshMatOverride.commands):
         command = meshMatOverride.commands[command_index]
@@ -2520,7 +2516,7 @@ def saveOverrideDraw(
             continue
         # get the material referenced, and then check if it should be overriden
         # a material override will either have a list of mats it overrides, or a mask of mats it doesn't based on type
-        bpy_material, fmaterial = find_material_from_jump_cmd(fModel.getAllMaterials().items(), command)
+        bpy_material, fmaterial = find_material_from_jump_cmd(material_index, command)
         shouldModify = (overrideType == "Specific" and bpy_material in specificMat) or (
             overrideType == "All" and bpy_material not in specificMat
         )
@@ -2729,15 +2725,15 @@ def saveSkinnedMeshByMaterial(
         )
         curIndex += len(vertData)
 
-        for bufferVert in vertData:
-            skinnedTriGroup.vertexList.vertices.append(
-                bufferVert.f3dVert.toVtx(
-                    obj.data,
-                    texDimensions,
-                    parentMatrix,
-                    isPointSampled,
-                )
+        skinnedTriGroup.vertexList.vertices.extend(
+            convertVertsToVtx(
+                [bufferVert.f3dVert for bufferVert in vertData],
+                obj.data,
+                texDimensions,
+                parentMatrix,
+                isPointSampled,
             )
+        )
 
         skinnedTriGroup.triList.commands.append(SPEndDisplayList())
         if fMaterial.revert is not None:
@@ -2854,21 +2850,22 @@ class SM64_ExportGeolayoutObject(ObjectDataExporter):
                 )
                 if not props.is_actor_custom_export:
                     applyBasicTweaks(export_path)
-                exportGeolayoutObjectC(
-                    obj,
-                    final_transform,
-                    export_path,
-                    props.custom_include_directory,
-                    save_textures,
-                    save_textures and bpy.context.scene.geoSeparateTextureDef,
-                    props.actor_group_name,
-                    props.export_header_type,
-                    props.obj_name_gfx,
-                    props.geo_name,
-                    level_name,
-                    props.is_actor_custom_export,
-                    DLFormat.Static,
-                )
+                with fileWriteReport("Geolayout export"):
+                    exportGeolayoutObjectC(
+                        obj,
+                        final_transform,
+                        export_path,
+                        props.custom_include_directory,
+                        save_textures,
+                        save_textures and bpy.context.scene.geoSeparateTextureDef,
+                        props.actor_group_name,
+                        props.export_header_type,
+                        props.obj_name_gfx,
+                        props.geo_name,
+                        level_name,
+                        props.is_actor_custom_export,
+                        DLFormat.Static,
+                    )
                 self.report({"INFO"}, "Success!")
             elif context.scene.fast64.sm64.export_type == "Insertable Binary":
                 exportGeolayoutObjectInsertableBinary(
@@ -2885,7 +2882,8 @@ class SM64_ExportGeolayoutObject(ObjectDataExporter):
                 romfileExport.close()
                 romfileOutput = open(bpy.path.abspath(tempROM), "rb+")
 
-                levelParsed = parseLevelAtPointer(romfileOutput, level_pointers[context.scene.levelGeoExport])
+                with RomImage.fromFile(romfileOutput) as romImage:
+                    levelParsed = parseLevelAtPointer(romImage, level_pointers[context.scene.levelGeoExport])
                 segmentData = levelParsed.segmentData
 
                 if context.scene.fast64.sm64.extend_bank_4:
@@ -3049,23 +3047,24 @@ class SM64_ExportGeolayoutArmature(bpy.types.Operator):
                 save_textures = bpy.context.scene.saveTextures
                 if not props.is_actor_custom_export:
                     applyBasicTweaks(export_path)
-                header, fileStatus = exportGeolayoutArmatureC(
-                    armatureObj,
-                    obj,
-                    final_transform,
-                    export_path,
-                    props.custom_include_directory,
-                    save_textures,
-                    save_textures and bpy.context.scene.geoSeparateTextureDef,
-                    None,
-                    props.actor_group_name,
-                    props.export_header_type,
-                    props.obj_name_gfx,
-                    props.geo_name,
-                    level_name,
-                    props.is_actor_custom_export,
-                    DLFormat.Static,
-                )
+                with fileWriteReport("Geolayout export"):
+                    header, fileStatus = exportGeolayoutArmatureC(
+                        armatureObj,
+                        obj,
+                        final_transform,
+                        export_path,
+                        props.custom_include_directory,
+                        save_textures,
+                        save_textures and bpy.context.scene.geoSeparateTextureDef,
+                        None,
+                        props.actor_group_name,
+                        props.export_header_type,
+                        props.obj_name_gfx,
+                        props.geo_name,
+                        level_name,
+                        props.is_actor_custom_export,
+                        DLFormat.Static,
+                    )
                 starSelectWarning(self, fileStatus)
                 self.report({"INFO"}, "Success!")
             elif context.scene.fast64.sm64.export_type == "Insertable Binary":
@@ -3085,7 +3084,8 @@ class SM64_ExportGeolayoutArmature(bpy.types.Operator):
                 romfileExport.close()
                 romfileOutput = open(bpy.path.abspath(tempROM), "rb+")
 
-                levelParsed = parseLevelAtPointer(romfileOutput, level_pointers[context.scene.levelGeoExport])
+                with RomImage.fromFile(romfileOutput) as romImage:
+                    levelParsed = parseLevelAtPointer(romImage, level_pointers[context.scene.levelGeoExport])
                 segmentData = levelParsed.segmentData
 
                 if context.scene.fast64.sm64.extend_bank_4:
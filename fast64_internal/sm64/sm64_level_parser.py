@@ -1,9 +1,9 @@
 import copy
 from .sm64_constants import mainLevelLoadScriptSegment, loadSegmentAddresses
+from ..rom_image import RomImage
 
 from ..utility import (
     PluginError,
-    decodeSegmentedAddr,
     writeVectorToShorts,
     writeFloatToShort,
     readVectorFromShorts,
@@ -43,18 +43,13 @@ from .sm64_level_constants import (
 )
 
 
-def parseLevelAtPointer(romfile, pointerAddress):
+def parseLevelAtPointer(romfile: RomImage, pointerAddress):
     segmentData = parseCommonSegmentLoad(romfile)
 
-    romfile.seek(pointerAddress)
-    command = romfile.read(16)
-    segment = command[3]
-    segmentStart = int.from_bytes(command[4:8], "big")
-    segmentEnd = int.from_bytes(command[8:12], "big")
+    segment = romfile.u8(pointerAddress + 3)
+    segmentData[segment] = (romfile.u32(pointerAddress + 4), romfile.u32(pointerAddress + 8))
 
-    segmentData[segment] = (segmentStart, segmentEnd)
-
-    startAddress = decodeSegmentedAddr(command[12:16], segmentData)
+    startAddress = romfile.readSegmentedPointer(pointerAddress + 12, segmentData)
 
     parsedLevel = parseLevel(romfile, startAddress, segmentData)
     for segment, interval in parsedLevel.segmentData.items():
@@ -63,30 +58,23 @@ def parseLevelAtPointer(romfile, pointerAddress):
     return parsedLevel
 
 
-def parseCommonSegmentLoad(romfile):
+def parseCommonSegmentLoad(romfile: RomImage):
     segmentData = copy.deepcopy(mainLevelLoadScriptSegment)
     for segment, pointer in loadSegmentAddresses.items():
-        romfile.seek(pointer)
-        command = romfile.read(12)
+        segment = romfile.u8(pointer + 3)
+        segmentData[segment] = (romfile.u32(pointer + 4), romfile.u32(pointer + 8))
 
-        segment = command[3]
-        segmentStart = int.from_bytes(command[4:8], "big")
-        segmentEnd = int.from_bytes(command[8:12], "big")
+    return segmentData
 
-        segmentData[segment] = (segmentStart, segmentEnd)
 
-    return segmentData
+def readLevelCommand(romfile: RomImage, address: int) -> bytes:
+    # second byte = command length
+    return romfile.readBytes(address, romfile.u8(address + 1))
 
 
-# second byte = command length
-def parseLevel(romfile, startAddress, segmentData):
+def parseLevel(romfile: RomImage, startAddress, segmentData):
     currentAddress = startAddress
-
-    romfile.seek(currentAddress)
-    currentCmd = romfile.read(2)
-    romfile.seek(currentAddress)  # second seek is because reading moves read pointer forward
-    currentCmd = romfile.read(currentCmd[1])
-    # currentAddress += currentCmd[1]
+    currentCmd = readLevelCommand(romfile, currentAddress)
 
     scriptStack = [currentAddress]
     currentLevel = SM64_Level()
@@ -99,19 +87,16 @@ def parseLevel(romfile, startAddress, segmentData):
         # print(bytesToHex(currentCmd) + " at " + hex(currentAddress))
 
         if currentCmd[0] == L_JUMP:
-            currentAddress = decodeSegmentedAddr(currentCmd[4:8], segmentData)
+            currentAddress = romfile.readSegmentedPointer(currentAddress + 4, segmentData)
 
         elif currentCmd[0] == L_PUSH:
             scriptStack.append(currentAddress)
             # print([hex(value) for value in scriptStack])
-            currentAddress = decodeSegmentedAddr(currentCmd[4:8], segmentData)
+            currentAddress = romfile.readSegmentedPointer(currentAddress + 4, segmentData)
 
         elif currentCmd[0] == L_POP:
             currentAddress = scriptStack.pop()
-            romfile.seek(currentAddress)
-            currentCmd = romfile.read(2)
-            romfile.seek(currentAddress)
-            currentCmd = romfile.read(currentCmd[1])
+            currentCmd = readLevelCommand(romfile, currentAddress)
             currentAddress += currentCmd[1]
             # print([hex(value) for value in scriptStack])
 
@@ -120,8 +105,8 @@ def parseLevel(romfile, startAddress, segmentData):
 
         elif currentCmd[0] == L_LOAD_ROM_SEG or currentCmd[0] == L_LOAD_MIO0_SEG or currentCmd[0] == L_LOAD_MIO0_TEX:
             segmentData[currentCmd[3]] = [
-                int.from_bytes(currentCmd[4:8], "big"),
-                int.from_bytes(currentCmd[8:12], "big"),
+                romfile.u32(currentAddress + 4),
+                romfile.u32(currentAddress + 8),
             ]
 
         elif currentCmd[0] == L_AREA_START:
@@ -183,11 +168,7 @@ def parseLevel(romfile, startAddress, segmentData):
 
         if currentCmd[0] != L_PUSH and currentCmd[0] != L_JUMP and currentCmd[0] != L_POP:
             currentAddress += currentCmd[1]
-        romfile.seek(currentAddress)
-        currentCmd = romfile.read(2)
-        romfile.seek(currentAddress)
-        currentCmd = romfile.read(currentCmd[1])
-        # currentAddress += currentCmd[1]
+        currentCmd = readLevelCommand(romfile, currentAddress)
 
     return currentLevel
 
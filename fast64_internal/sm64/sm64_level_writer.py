@@ -5,6 +5,7 @@ from dataclasses import dataclass
 from bpy.utils import register_class, unregister_class
 from ..panels import SM64_Panel
 from ..operators import ObjectDataExporter
+from ..file_lock import lockSharedFile
 from .sm64_constants import cameraTriggerNames, levelIDNames, enumLevelNames
 from .sm64_objects import exportAreaCommon, backgroundSegments
 from .sm64_collision import exportCollisionCommon
@@ -18,6 +19,8 @@ from ..utility import (
     writeIfNotFound,
     getDataFromFile,
     saveDataToFile,
+    writeFileIfChanged,
+    fileWriteReport,
     unhideAllAndGetHiddenState,
     restoreHiddenState,
     overwriteData,
@@ -76,9 +79,7 @@ def createGeoFile(levelName, filepath):
         + '/header.h"\n\n'
     )
 
-    geoFile = open(filepath, "w", newline="\n")
-    geoFile.write(result)
-    geoFile.close()
+    writeFileIfChanged(filepath, result)
 
 
 def createLevelDataFile(levelName, filepath):
@@ -95,9 +96,7 @@ def createLevelDataFile(levelName, filepath):
         + '#include "make_const_nonconst.h"\n\n'
     )
 
-    levelDataFile = open(filepath, "w", newline="\n")
-    levelDataFile.write(result)
-    levelDataFile.close()
+    writeFileIfChanged(filepath, result)
 
 
 def createHeaderFile(levelName, filepath):
@@ -116,9 +115,7 @@ def createHeaderFile(levelName, filepath):
         + "#endif\n"
     )
 
-    headerFile = open(filepath, "w", newline="\n")
-    headerFile.write(result)
-    headerFile.close()
+    writeFileIfChanged(filepath, result)
 
 
 class ZoomOutMasks:
@@ -141,9 +138,7 @@ class ZoomOutMasks:
         if data == self.originalData:
             return
 
-        maskFile = open(filepath, "w", newline="\n")
-        maskFile.write(data)
-        maskFile.close()
+        writeFileIfChanged(filepath, data)
 
     def updateMaskCount(self, levelCount):
         if len(self.masks) - 1 < int(levelCount / 2):
@@ -188,9 +183,7 @@ class CourseDefines:
         data = self.to_c()
         if data == self.originalData:
             return
-        defineFile = open(filepath, "w", newline="\n")
-        defineFile.write(data)
-        defineFile.close()
+        writeFileIfChanged(filepath, data)
 
     def getOrMakeMacroByCourseName(self, courseEnum, isBonus):
         for course in self.courses:
@@ -228,9 +221,7 @@ class LevelDefines:
         data = self.to_c()
         if data == self.originalData:
             return
-        defineFile = open(filepath, "w", newline="\n")
-        defineFile.write(data)
-        defineFile.close()
+        writeFileIfChanged(filepath, data)
 
         # Headers won't be updated unless this file is touched
         if self.newLevelAdded:
@@ -532,56 +523,61 @@ def macrosToString(macro_cmds, tabDepth=1, comma=True):
 
 def setStartLevel(basePath, levelEnum):
     filepath = os.path.join(basePath, "levels/menu/script.c")
-    data = getDataFromFile(filepath)
+    with lockSharedFile(filepath):
+        data = getDataFromFile(filepath)
 
-    newData = re.sub("SET\_REG\((((?!\)).)*)\)", "SET_REG(" + levelEnum + ")", data, count=1)
-    if newData != data:
-        saveDataToFile(filepath, newData)
+        newData = re.sub("SET\_REG\((((?!\)).)*)\)", "SET_REG(" + levelEnum + ")", data, count=1)
+        if newData != data:
+            saveDataToFile(filepath, newData)
 
 
 def addActSelectorIgnore(basePath, levelEnum):
     filepath = os.path.join(basePath, "src/game/level_update.c")
-    data = getDataFromFile(filepath)
+    with lockSharedFile(filepath):
+        data = getDataFromFile(filepath)
 
-    checkResult = re.search("if\s*\(gCurrLevelNum\s*==\s*" + levelEnum + "\)\s*return\s*0;", data, re.DOTALL)
-    if checkResult is not None:
-        return
+        checkResult = re.search("if\s*\(gCurrLevelNum\s*==\s*" + levelEnum + "\)\s*return\s*0;", data, re.DOTALL)
+        if checkResult is not None:
+            return
 
-    # This won't actually match whole function, but only up to first closing bracket.
-    # This should be okay though... ?
-    matchResultFunction = re.search(
-        "s32\s*lvl\_set\_current\_level\s*\((((?!\)).)*)\)\s*\{" + "(((?!\}).)*)\}", data, re.DOTALL
-    )
+        # This won't actually match whole function, but only up to first closing bracket.
+        # This should be okay though... ?
+        matchResultFunction = re.search(
+            "s32\s*lvl\_set\_current\_level\s*\((((?!\)).)*)\)\s*\{" + "(((?!\}).)*)\}", data, re.DOTALL
+        )
 
-    if matchResultFunction is None:
-        raise PluginError('Could not find lvl_set_current_level in "' + filepath + '".')
+        if matchResultFunction is None:
+            raise PluginError('Could not find lvl_set_current_level in "' + filepath + '".')
 
-    functionContents = matchResultFunction.group(3)
+        functionContents = matchResultFunction.group(3)
 
-    matchResult = re.search("gCurrCourseNum\s*\=\s*gLevelToCourseNumTable(((?!\;).)*)\;", functionContents, re.DOTALL)
-    if matchResult is None:
-        raise PluginError('Could not find gCurrCourseNum setting in lvl_set_current_level in "' + filepath + '".')
-
-    functionContents = (
-        functionContents[: matchResult.end(0)]
-        + "\n\tif (gCurrLevelNum == "
-        + levelEnum
-        + ") return 0;"
-        + functionContents[matchResult.end(0) :]
-    )
+        matchResult = re.search(
+            "gCurrCourseNum\s*\=\s*gLevelToCourseNumTable(((?!\;).)*)\;", functionContents, re.DOTALL
+        )
+        if matchResult is None:
+            raise PluginError('Could not find gCurrCourseNum setting in lvl_set_current_level in "' + filepath + '".')
+
+        functionContents = (
+            functionContents[: matchResult.end(0)]
+            + "\n\tif (gCurrLevelNum == "
+            + levelEnum
+            + ") return 0;"
+            + functionContents[matchResult.end(0) :]
+        )
 
-    newData = data[: matchResultFunction.start(3)] + functionContents + data[matchResultFunction.end(3) :]
+        newData = data[: matchResultFunction.start(3)] + functionContents + data[matchResultFunction.end(3) :]
 
-    saveDataToFile(filepath, newData)
+        saveDataToFile(filepath, newData)
 
 
 def removeActSelectorIgnore(basePath, levelEnum):
     filepath = os.path.join(basePath, "src/game/level_update.c")
-    data = getDataFromFile(filepath)
+    with lockSharedFile(filepath):
+        data = getDataFromFile(filepath)
 
-    newData = re.sub("if\s*\(gCurrLevelNum\s*\=\=\s*" + levelEnum + "\)\s*return\s*0\;\n", "", data, re.DOTALL)
-    if data != newData:
-        saveDataToFile(filepath, newData)
+        newData = re.sub("if\s*\(gCurrLevelNum\s*\=\=\s*" + levelEnum + "\)\s*return\s*0\;\n", "", data, re.DOTALL)
+        if data != newData:
+            saveDataToFile(filepath, newData)
 
 
 areaNumReg = re.compile(r".*AREA\(([0-9]+),.+\),")
@@ -700,39 +696,38 @@ def overwritePuppycamData(filePath, levelToReplace, newPuppycamTriggers):
     # Splits the individual entries in the array apart
     structEntry = "(.+?\{.+?\}.+?\n)"
 
-    if os.path.exists(filePath):
-        dataFile = open(filePath, "r")
-        data = dataFile.read()
-        dataFile.close()
-
-        matchResult = re.search(arrayEntiresRegex, data, re.DOTALL)
-
-        if matchResult:
-            data = ""
-            entriesString = matchResult.group(2)
-
-            # Iterate through each existing entry, getting rid of any that are in the level we're importing to.
-            entriesList = re.findall(structEntry, entriesString, re.DOTALL)
-            for entry in entriesList:
-                if (
-                    re.search(
-                        "(\{\s?" + levelToReplace + "\s?,)", re.sub("(/\*.+?\*/)|(//.+?\n)", "", entry), re.DOTALL
-                    )
-                    is None
-                ):
-                    data += entry
-
-            # Add the new entries from this export, then put the file back together again.
-            data += "\n\n" + newPuppycamTriggers
-            data = matchResult.group(1) + data + "\n" + matchResult.group(3)
-        else:
-            raise PluginError("Could not find 'struct newcam_hardpos newcam_fixedcam[]'.")
+    with lockSharedFile(filePath):
+        if os.path.exists(filePath):
+            dataFile = open(filePath, "r")
+            data = dataFile.read()
+            dataFile.close()
+
+            matchResult = re.search(arrayEntiresRegex, data, re.DOTALL)
+
+            if matchResult:
+                data = ""
+                entriesString = matchResult.group(2)
+
+                # Iterate through each existing entry, getting rid of any that are in the level we're importing to.
+                entriesList = re.findall(structEntry, entriesString, re.DOTALL)
+                for entry in entriesList:
+                    if (
+                        re.search(
+                            "(\{\s?" + levelToReplace + "\s?,)", re.sub("(/\*.+?\*/)|(//.+?\n)", "", entry), re.DOTALL
+                        )
+                        is None
+                    ):
+                        data += entry
+
+                # Add the new entries from this export, then put the file back together again.
+                data += "\n\n" + newPuppycamTriggers
+                data = matchResult.group(1) + data + "\n" + matchResult.group(3)
+            else:
+                raise PluginError("Could not find 'struct newcam_hardpos newcam_fixedcam[]'.")
 
-        dataFile = open(filePath, "w", newline="\n")
-        dataFile.write(data)
-        dataFile.close()
-    else:
-        raise PluginError(filePath + " does not exist.")
+            writeFileIfChanged(filePath, data)
+        else:
+            raise PluginError(filePath + " does not exist.")
 
 
 class SM64OptionalFileStatus:
@@ -1038,31 +1033,34 @@ def exportLevelC(obj, transformMatrix, level_name, exportDir, savePNG, customExp
 
         levelHeadersPath = os.path.join(exportDir, "levels/level_headers.h.in")
         levelDefinesPath = os.path.join(exportDir, "levels/level_defines.h")
-        levelDefines = parseLevelDefines(levelDefinesPath)
-        levelDefineMacro = levelDefines.getOrMakeMacroByLevelName(level_name)
-        levelIndex = levelDefines.defineMacros.index(levelDefineMacro)
-        levelEnum = levelDefineMacro[1][levelDefineArgs["level enum"]]
+        with lockSharedFile(levelDefinesPath):
+            levelDefines = parseLevelDefines(levelDefinesPath)
+            levelDefineMacro = levelDefines.getOrMakeMacroByLevelName(level_name)
+            levelIndex = levelDefines.defineMacros.index(levelDefineMacro)
+            levelEnum = levelDefineMacro[1][levelDefineArgs["level enum"]]
 
-        levelDefineMacro[1][levelDefineArgs["camera table"]] = levelCameraVolumeName
-        levelDefineMacro[1][levelDefineArgs["acoustic reach"]] = obj.acousticReach
-        levelDefineMacro[1][levelDefineArgs["echo level 1"]] = echoLevels[0]
-        levelDefineMacro[1][levelDefineArgs["echo level 2"]] = echoLevels[1]
-        levelDefineMacro[1][levelDefineArgs["echo level 3"]] = echoLevels[2]
+            levelDefineMacro[1][levelDefineArgs["camera table"]] = levelCameraVolumeName
+            levelDefineMacro[1][levelDefineArgs["acoustic reach"]] = obj.acousticReach
+            levelDefineMacro[1][levelDefineArgs["echo level 1"]] = echoLevels[0]
+            levelDefineMacro[1][levelDefineArgs["echo level 2"]] = echoLevels[1]
+            levelDefineMacro[1][levelDefineArgs["echo level 3"]] = echoLevels[2]
 
-        levelDefines.write(levelDefinesPath, levelHeadersPath)
+            levelDefines.write(levelDefinesPath, levelHeadersPath)
 
         courseDefinesPath = os.path.join(exportDir, "levels/course_defines.h")
-        courseDefines = parseCourseDefines(courseDefinesPath)
-        courseEnum = levelDefineMacro[1][levelDefineArgs["course name"]]
-        courseMacro = courseDefines.getOrMakeMacroByCourseName(courseEnum, False)
-        courseMacro[1][1] = obj.starGetCutscenes.value()
-        courseDefines.write(courseDefinesPath)
-
-        if os.path.exists(cameraPath):
-            zoomMasks = parseZoomMasks(cameraPath)
-            zoomMasks.updateMaskCount(len(levelDefines.defineMacros))
-            zoomMasks.setMask(levelIndex, zoomFlags)
-            zoomMasks.write(cameraPath)
+        with lockSharedFile(courseDefinesPath):
+            courseDefines = parseCourseDefines(courseDefinesPath)
+            courseEnum = levelDefineMacro[1][levelDefineArgs["course name"]]
+            courseMacro = courseDefines.getOrMakeMacroByCourseName(courseEnum, False)
+            courseMacro[1][1] = obj.starGetCutscenes.value()
+            courseDefines.write(courseDefinesPath)
+
+        with lockSharedFile(cameraPath):
+            if os.path.exists(cameraPath):
+                zoomMasks = parseZoomMasks(cameraPath)
+                zoomMasks.updateMaskCount(len(levelDefines.defineMacros))
+                zoomMasks.setMask(levelIndex, zoomFlags)
+                zoomMasks.write(cameraPath)
 
         if obj.actSelectorIgnore:
             addActSelectorIgnore(exportDir, levelEnum)
@@ -1076,18 +1074,19 @@ def exportLevelC(obj, transformMatrix, level_name, exportDir, savePNG, customExp
         levelDataPath = os.path.join(level_dir, "leveldata.c")
         headerPath = os.path.join(level_dir, "header.h")
 
-        # Create files if not already existing
-        if not os.path.exists(geoPath):
-            createGeoFile(level_name, geoPath)
-        if not os.path.exists(levelDataPath):
-            createLevelDataFile(level_name, levelDataPath)
-        if not os.path.exists(headerPath):
-            createHeaderFile(level_name, headerPath)
-
-        # Write level data
-        writeIfNotFound(geoPath, include_proto("geo.inc.c", new_line_first=True), "")
-        writeIfNotFound(levelDataPath, include_proto("leveldata.inc.c", new_line_first=True), "")
-        writeIfNotFound(headerPath, include_proto("header.inc.h", new_line_first=True), "#endif")
+        # Create files if not already existing, and write level data
+        with lockSharedFile(geoPath):
+            if not os.path.exists(geoPath):
+                createGeoFile(level_name, geoPath)
+            writeIfNotFound(geoPath, include_proto("geo.inc.c", new_line_first=True), "")
+        with lockSharedFile(levelDataPath):
+            if not os.path.exists(levelDataPath):
+                createLevelDataFile(level_name, levelDataPath)
+            writeIfNotFound(levelDataPath, include_proto("leveldata.inc.c", new_line_first=True), "")
+        with lockSharedFile(headerPath):
+            if not os.path.exists(headerPath):
+                createHeaderFile(level_name, headerPath)
+            writeIfNotFound(headerPath, include_proto("header.inc.h", new_line_first=True), "#endif")
 
         if fModel.texturesSavedLastExport == 0:
             textureIncludePath = os.path.join(level_dir, "texture_include.inc.c")
@@ -1216,16 +1215,17 @@ class SM64_ExportLevel(ObjectDataExporter):
 
             if not props.non_decomp_level:
                 applyBasicTweaks(export_path)
-            fileStatus = exportLevelC(
-                obj,
-                final_transform,
-                level_name,
-                export_path,
-                context.scene.saveTextures,
-                props.non_decomp_level,
-                triggerName,
-                DLFormat.Static,
-            )
+            with fileWriteReport("Level export"):
+                fileStatus = exportLevelC(
+                    obj,
+                    final_transform,
+                    level_name,
+                    export_path,
+                    context.scene.saveTextures,
+                    props.non_decomp_level,
+                    triggerName,
+                    DLFormat.Static,
+                )
 
             cameraWarning(self, fileStatus)
             starSelectWarning(self, fileStatus)
@@ -1,7 +1,16 @@
 import os, re, bpy
-from ..utility import PluginError, writeIfNotFound, getDataFromFile, saveDataToFile, CScrollData, CData
+from ..utility import (
+    PluginError,
+    writeIfNotFound,
+    getDataFromFile,
+    saveDataToFile,
+    writeFileIfChanged,
+    CScrollData,
+    CData,
+)
 from .c_templates.tile_scroll import tile_scroll_c, tile_scroll_h
 from .sm64_utility import getMemoryCFilePath
+from ..file_lock import lockSharedFile
 
 # This is for writing framework for scroll code.
 # Actual scroll code found in f3d_gbi.py (FVertexScrollData)
@@ -54,46 +63,48 @@ def readSegmentInfo(baseDir):
 
 def writeSegmentROMTable(baseDir):
     memPath = getMemoryCFilePath(baseDir)
-    memFile = open(memPath, "r", newline="\n")
-    memData = memFile.read()
-    memFile.close()
-
-    if "uintptr_t sSegmentROMTable[32];" not in memData:
-        memData = re.sub(
-            "(?<!extern )uintptr\_t sSegmentTable\[32\]\;",
-            "\nuintptr_t sSegmentTable[32];\nuintptr_t sSegmentROMTable[32];",
-            memData,
-            re.DOTALL,
-        )
-
-        memData = re.sub(
-            "set\_segment\_base\_addr\s*\((((?!\)).)*)\)\s*;",
-            r"set_segment_base_addr(\1); sSegmentROMTable[segment] = (uintptr_t) srcStart;",
-            memData,
-            re.DOTALL,
-        )
-
-        memFile = open(memPath, "w", newline="\n")
-        memFile.write(memData)
+    with lockSharedFile(memPath):
+        memFile = open(memPath, "r", newline="\n")
+        memData = memFile.read()
         memFile.close()
 
-    # Add extern definition of segment table
-    writeIfNotFound(os.path.join(baseDir, "src/game/memory.h"), "\nextern uintptr_t sSegmentROMTable[32];", "#endif")
+        if "uintptr_t sSegmentROMTable[32];" not in memData:
+            memData = re.sub(
+                "(?<!extern )uintptr\_t sSegmentTable\[32\]\;",
+                "\nuintptr_t sSegmentTable[32];\nuintptr_t sSegmentROMTable[32];",
+                memData,
+                re.DOTALL,
+            )
+
+            memData = re.sub(
+                "set\_segment\_base\_addr\s*\((((?!\)).)*)\)\s*;",
+                r"set_segment_base_addr(\1); sSegmentROMTable[segment] = (uintptr_t) srcStart;",
+                memData,
+                re.DOTALL,
+            )
+
+            writeFileIfChanged(memPath, memData)
+
+        # Add extern definition of segment table
+        writeIfNotFound(
+            os.path.join(baseDir, "src/game/memory.h"), "\nextern uintptr_t sSegmentROMTable[32];", "#endif"
+        )
 
 
 def writeScrollTextureCall(path, include, callString):
-    data = getDataFromFile(path)
-    if include not in data:
-        data = include + "\n" + data
-
-        callScrollIndex = data.index(callString)
-        if callScrollIndex != -1:
-            callScrollIndex += len(callString)
-            data = data[:callScrollIndex] + " scroll_textures();" + data[callScrollIndex:]
-        else:
-            raise PluginError("Cannot find " + callString + " in " + path)
+    with lockSharedFile(path):
+        data = getDataFromFile(path)
+        if include not in data:
+            data = include + "\n" + data
 
-        saveDataToFile(path, data)
+            callScrollIndex = data.index(callString)
+            if callScrollIndex != -1:
+                callScrollIndex += len(callString)
+                data = data[:callScrollIndex] + " scroll_textures();" + data[callScrollIndex:]
+            else:
+                raise PluginError("Cannot find " + callString + " in " + path)
+
+            saveDataToFile(path, data)
 
 
 TILE_SCROLL_REL_PATH = "src/game/tile_scroll"
@@ -253,9 +264,7 @@ def createTexScrollHeadersGroup(exportDir, groupName, dataInclude):
         else:
             raise PluginError("Texture scroll function not found.")
 
-        texscrollFileH = open(texscrollPathH, "w", newline="\n")
-        texscrollFileH.write(texscrollDataH)
-        texscrollFileH.close()
+        writeFileIfChanged(texscrollPathH, texscrollDataH)
 
     # Include group inc.c in texscroll.c
     includeCText = '#include "' + includeC + '"'
@@ -315,9 +324,7 @@ def createTexScrollHeadersGroup(exportDir, groupName, dataInclude):
         raise PluginError("Texture scroll function not found.")
 
     if originalTexScrollC != texscrollDataC:
-        texscrollFileC = open(texscrollPathC, "w", newline="\n")
-        texscrollFileC.write(texscrollDataC)
-        texscrollFileC.close()
+        writeFileIfChanged(texscrollPathC, texscrollDataC)
 
     return fileStatus
 
@@ -335,14 +342,16 @@ def modifyTexScrollHeadersGroup(
     dataInclude: str,
     hasScrolling: bool,
 ):
-    if not bpy.context.scene.fast64.sm64.disable_scroll and hasScrolling:
-        fileStatus = writeTexScrollHeadersGroup(
-            exportDir, includeC, includeH, groupName, topLevelScrollFunc, dataInclude
-        )
-        return fileStatus
-    else:
-        removeTexScrollHeadersGroup(exportDir, includeC, includeH, groupName, topLevelScrollFunc)
-        return None
+    # The base texture scrolling files are shared by every group, so groups are edited one at a time
+    with lockSharedFile(os.path.join(exportDir, "src/game/texscroll.c")):
+        if not bpy.context.scene.fast64.sm64.disable_scroll and hasScrolling:
+            fileStatus = writeTexScrollHeadersGroup(
+                exportDir, includeC, includeH, groupName, topLevelScrollFunc, dataInclude
+            )
+            return fileStatus
+        else:
+            removeTexScrollHeadersGroup(exportDir, includeC, includeH, groupName, topLevelScrollFunc)
+            return None
 
 
 def writeTexScrollHeadersGroup(
@@ -359,9 +368,7 @@ def writeTexScrollHeadersGroup(
 
     if includeH not in groupDataH:
         groupDataH = includeH + "\n" + groupDataH
-        groupFileH = open(groupPathH, "w", newline="\n")
-        groupFileH.write(groupDataH)
-        groupFileH.close()
+        writeFileIfChanged(groupPathH, groupDataH)
 
     # Write to group inc.c
     groupPathC = os.path.join(exportDir, "src/game/texscroll/" + groupName + "_texscroll.inc.c")
@@ -390,9 +397,7 @@ def writeTexScrollHeadersGroup(
         raise PluginError("Texture scroll function not found.")
 
     if originalGroupDataC != groupDataC:
-        groupFileC = open(groupPathC, "w", newline="\n")
-        groupFileC.write(groupDataC)
-        groupFileC.close()
+        writeFileIfChanged(groupPathC, groupDataC)
 
     return fileStatus
 
@@ -410,9 +415,7 @@ def removeTexScrollHeadersGroup(exportDir: str, includeC: str, includeH: str, gr
 
         if includeH in groupDataH:
             groupDataH = groupDataH.replace(includeH, "")
-            groupFileH = open(groupPathH, "w", newline="\n")
-            groupFileH.write(groupDataH)
-            groupFileH.close()
+            writeFileIfChanged(groupPathH, groupDataH)
 
     # Remove include and function call from group inc.c
     groupPathC = os.path.join(exportDir, "src/game/texscroll/" + groupName + "_texscroll.inc.c")
@@ -437,9 +440,7 @@ def removeTexScrollHeadersGroup(exportDir: str, includeC: str, includeH: str, gr
             groupDataC = groupDataC[: matchResult.start(1)] + functionCalls + groupDataC[matchResult.end(1) :]
 
         if originalGroupDataC != groupDataC:
-            groupFileC = open(groupPathC, "w", newline="\n")
-            groupFileC.write(groupDataC)
-            groupFileC.close()
+            writeFileIfChanged(groupPathC, groupDataC)
 
 
 def modifyTexScrollFiles(exportDir: str, assetDir: str, scrollData: CScrollData):
@@ -462,10 +463,6 @@ def writeTexScrollFiles(exportDir: str, assetDir: str, scrollData: CData):
     texscrollCPath = os.path.join(assetDir, "texscroll.inc.c")
     texscrollHPath = os.path.join(assetDir, "texscroll.inc.h")
 
-    texscrollCFile = open(texscrollCPath, "w", newline="\n")
-    texscrollCFile.write(scrollData.source)
-    texscrollCFile.close()
+    writeFileIfChanged(texscrollCPath, scrollData.source_chunks())
 
-    texscrollHFile = open(texscrollHPath, "w", newline="\n")
-    texscrollHFile.write(scrollData.header)
-    texscrollHFile.close()
+    writeFileIfChanged(texscrollHPath, scrollData.header_chunks())
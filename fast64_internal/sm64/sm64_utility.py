@@ -3,7 +3,6 @@ import bpy
 from bpy.types import UILayout
 
 from ..utility import PluginError, filepath_checks, run_and_draw_errors, multilineLabel, prop_split
-from .sm64_function_map import func_map
 
 
 def starSelectWarning(operator, fileStatus):
@@ -113,6 +112,9 @@ def string_int_prop(layout: UILayout, data, prop: str, name="", split=True, **pr
 def convert_addr_to_func(addr: str):
     if addr == "":
         raise PluginError("Empty function name/address.")
+    # The function map is a large table, only loaded when a function address needs converting
+    from .sm64_function_map import func_map
+
     refresh_version: str = bpy.context.scene.fast64.sm64.refresh_version
     if refresh_version.startswith("HackerSM64"):  # hacker uses refresh 13
         refresh_version = "Refresh 13"
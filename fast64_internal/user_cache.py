@@ -0,0 +1,55 @@
+import os
+import stat
+import tempfile
+
+import bpy
+
+"""
+Folders for the on-disk caches of the add-on (converted triangles, parsed OoT data, incremental export state).
+They are kept in the user's Blender folder, and only readable and writable by the user,
+instead of the shared temporary folder where any local user could plant cache entries.
+"""
+
+
+def getCacheRoot() -> str:
+    try:
+        return bpy.utils.user_resource("CACHE", path="fast64", create=True)
+    except (TypeError, ValueError):
+        # CACHE isn't a resource type in every Blender version
+        return bpy.utils.user_resource("CONFIG", path="fast64_cache", create=True)
+
+
+def makePrivateDir(path: str):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.name == "posix":
+        dirStat = os.stat(path)
+        if dirStat.st_uid != os.getuid():
+            raise OSError(f"Cache folder {path} is not owned by the current user.")
+        if stat.S_IMODE(dirStat.st_mode) != 0o700:
+            os.chmod(path, 0o700)
+
+
+def getCacheDir(name: str) -> str:
+    """Returns the cache folder name, creating it if needed. Raises OSError if it can't be used."""
+    cacheRoot = getCacheRoot()
+    if not cacheRoot:
+        raise OSError("Could not create the fast64 cache folder.")
+    makePrivateDir(cacheRoot)
+    cacheDir = os.path.join(cacheRoot, name)
+    makePrivateDir(cacheDir)
+    return cacheDir
+
+
+def writeCacheFile(path: str, data: bytes):
+    """Writes data to path atomically, so that concurrent exports never read a partial entry"""
+    fileHandle, tempPath = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fileHandle, "wb") as cacheFile:
+            cacheFile.write(data)
+        os.replace(tempPath, path)
+    except BaseException:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        raise
@@ -1,8 +1,11 @@
 from pathlib import Path
+from contextlib import contextmanager
+import hashlib
 import bpy, random, string, os, math, traceback, re, os, mathutils, ast, operator
 from math import pi, ceil, degrees, radians, copysign
 from mathutils import *
 from .utility_anim import *
+from .file_lock import lockSharedFile
 from typing import Callable, Iterable, Any, Optional, Tuple, TypeVar, Union
 from bpy.types import UILayout, Scene, World
 
@@ -152,10 +155,123 @@ def readFile(filepath):
     return data
 
 
+class FileWriteStats:
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+
+
+# Stats of the enclosing fileWriteReport blocks, and (mtime, size, hash) of files written or checked this session,
+# so that a file that was not touched since is compared by hash without reading it back
+fileWriteStatsStack: list[FileWriteStats] = []
+fileContentHashes: dict[str, tuple[int, int, bytes]] = {}
+
+
+@contextmanager
+def fileWriteReport(title: str):
+    """Counts the files written by writeFileIfChanged in this block, and prints them at the end"""
+    stats = FileWriteStats()
+    fileWriteStatsStack.append(stats)
+    try:
+        yield stats
+    finally:
+        fileWriteStatsStack.remove(stats)
+        print(f"{title}: wrote {stats.written} files, {stats.skipped} unchanged files skipped.")
+
+
+def copyFilePrefix(sourceFile, destinationFile, size: int):
+    sourceFile.seek(0)
+    while size > 0:
+        block = sourceFile.read(min(size, 2**20))
+        if len(block) == 0:
+            break
+        destinationFile.write(block)
+        size -= len(block)
+
+
+def writeFileIfChanged(filepath: str, data: str | bytes | Iterable[str | bytes]) -> bool:
+    """
+    Writes data (text is written as utf-8 with unix newlines) only if the file content differs,
+    so that unchanged files keep their modification time and don't trigger rebuilds.
+    data can also be an iterable of chunks, which are hashed, compared and written one at a time without joining them.
+    The file is replaced atomically, returns whether it was written.
+    """
+    if isinstance(data, (str, bytes)):
+        data = (data,)
+    path = os.path.abspath(filepath)
+    tempPath = f"{path}.{os.getpid()}.tmp"
+    hasher = hashlib.blake2b(digest_size=20)
+
+    # A file that wasn't touched since it was written or checked is compared by hash, others are read back
+    try:
+        stat = os.stat(path)
+        cached = fileContentHashes.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            existingFile = None
+        else:
+            existingFile = open(path, "rb")
+    except FileNotFoundError:
+        stat = cached = existingFile = None
+
+    tempFile = None
+    size = 0
+    try:
+        for chunk in data:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            hasher.update(chunk)
+            if tempFile is None:
+                if existingFile is not None and existingFile.read(len(chunk)) == chunk:
+                    size += len(chunk)
+                    continue
+                # The content differs (or is compared by hash), the identical start is copied from the file
+                tempFile = open(tempPath, "wb")
+                if existingFile is not None:
+                    copyFilePrefix(existingFile, tempFile, size)
+            tempFile.write(chunk)
+            size += len(chunk)
+
+        if existingFile is not None:
+            changed = tempFile is not None or existingFile.read(1) != b""
+        elif stat is not None:
+            changed = cached != (stat.st_mtime_ns, stat.st_size, hasher.digest())
+        else:
+            changed = True
+
+        if changed and tempFile is None:
+            tempFile = open(tempPath, "wb")
+            if existingFile is not None:
+                copyFilePrefix(existingFile, tempFile, size)
+        if tempFile is not None:
+            tempFile.close()
+        if changed:
+            if stat is not None:
+                os.chmod(tempPath, stat.st_mode)
+            os.replace(tempPath, path)
+            stat = os.stat(path)
+        elif tempFile is not None:
+            os.remove(tempPath)
+    except BaseException:
+        if tempFile is not None:
+            tempFile.close()
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+        raise
+    finally:
+        if existingFile is not None:
+            existingFile.close()
+    fileContentHashes[path] = (stat.st_mtime_ns, stat.st_size, hasher.digest())
+
+    for stats in fileWriteStatsStack:
+        if changed:
+            stats.written += 1
+        else:
+            stats.skipped += 1
+    return changed
+
+
 def writeFile(filepath, data):
-    datafile = open(filepath, "w", newline="\n", encoding="utf-8")
-    datafile.write(data)
-    datafile.close()
+    writeFileIfChanged(filepath, data)
 
 
 def checkObjectReference(obj, title):
@@ -347,35 +463,76 @@ def propertyGroupEquals(oldProp, newProp):
 
 
 def writeCData(data, headerPath, sourcePath):
-    sourceFile = open(sourcePath, "w", newline="\n", encoding="utf-8")
-    sourceFile.write(data.source)
-    sourceFile.close()
-
-    headerFile = open(headerPath, "w", newline="\n", encoding="utf-8")
-    headerFile.write(data.header)
-    headerFile.close()
+    writeCDataSourceOnly(data, sourcePath)
+    writeCDataHeaderOnly(data, headerPath)
 
 
 def writeCDataSourceOnly(data, sourcePath):
-    sourceFile = open(sourcePath, "w", newline="\n", encoding="utf-8")
-    sourceFile.write(data.source)
-    sourceFile.close()
+    writeFileIfChanged(sourcePath, data.source_chunks())
 
 
 def writeCDataHeaderOnly(data, headerPath):
-    headerFile = open(headerPath, "w", newline="\n", encoding="utf-8")
-    headerFile.write(data.header)
-    headerFile.close()
+    writeFileIfChanged(headerPath, data.header_chunks())
 
 
 class CData:
+    """
+    Source and header text are stored as lists of chunks, so that appending never copies what was already written.
+    Reading source / header joins the chunks once, and writing to a file streams them without joining.
+    Prefer add_source / add_header / append over `+=` when building large data.
+    """
+
     def __init__(self):
-        self.source = ""
-        self.header = ""
+        self._source: list[str] = []
+        self._header: list[str] = []
+
+    @staticmethod
+    def _join(chunks: list[str]) -> str:
+        if len(chunks) > 1:
+            chunks[:] = ["".join(chunks)]
+        return chunks[0] if len(chunks) > 0 else ""
+
+    @property
+    def source(self) -> str:
+        return CData._join(self._source)
+
+    @source.setter
+    def source(self, value: str):
+        self._source = [value]
+
+    @property
+    def header(self) -> str:
+        return CData._join(self._header)
+
+    @header.setter
+    def header(self, value: str):
+        self._header = [value]
+
+    def add_source(self, *text: str):
+        self._source.extend(text)
+
+    def add_header(self, *text: str):
+        self._header.extend(text)
 
     def append(self, other):
-        self.source += other.source
-        self.header += other.header
+        if isinstance(other, CData):
+            self._source.extend(other._source)
+            self._header.extend(other._header)
+        else:
+            self._source.append(other.source)
+            self._header.append(other.header)
+
+    def write_source(self, file):
+        file.writelines(self._source)
+
+    def write_header(self, file):
+        file.writelines(self._header)
+
+    def source_chunks(self) -> list[str]:
+        return self._source
+
+    def header_chunks(self) -> list[str]:
+        return self._header
 
 
 class CScrollData(CData):
@@ -477,9 +634,7 @@ def getDataFromFile(filepath):
 
 
 def saveDataToFile(filepath, data):
-    dataFile = open(filepath, "w", newline="\n")
-    dataFile.write(data)
-    dataFile.close()
+    writeFileIfChanged(filepath, data)
 
 
 def applyBasicTweaks(baseDir):
@@ -490,25 +645,25 @@ def applyBasicTweaks(baseDir):
 def enableExtendedRAM(baseDir):
     segmentPath = os.path.join(baseDir, "include/segments.h")
 
-    segmentFile = open(segmentPath, "r", newline="\n")
-    segmentData = segmentFile.read()
-    segmentFile.close()
-
-    matchResult = re.search("#define\s*USE\_EXT\_RAM", segmentData)
+    with lockSharedFile(segmentPath):
+        segmentFile = open(segmentPath, "r", newline="\n")
+        segmentData = segmentFile.read()
+        segmentFile.close()
 
-    if not matchResult:
-        matchResult = re.search("#ifndef\s*USE\_EXT\_RAM", segmentData)
-        if matchResult is None:
-            raise PluginError(
-                "When trying to enable extended RAM, " + "could not find '#ifndef USE_EXT_RAM' in include/segments.h."
+        matchResult = re.search("#define\s*USE\_EXT\_RAM", segmentData)
+
+        if not matchResult:
+            matchResult = re.search("#ifndef\s*USE\_EXT\_RAM", segmentData)
+            if matchResult is None:
+                raise PluginError(
+                    "When trying to enable extended RAM, "
+                    + "could not find '#ifndef USE_EXT_RAM' in include/segments.h."
+                )
+            segmentData = (
+                segmentData[: matchResult.start(0)] + "#define USE_EXT_RAM\n" + segmentData[matchResult.start(0) :]
             )
-        segmentData = (
-            segmentData[: matchResult.start(0)] + "#define USE_EXT_RAM\n" + segmentData[matchResult.start(0) :]
-        )
 
-        segmentFile = open(segmentPath, "w", newline="\n")
-        segmentFile.write(segmentData)
-        segmentFile.close()
+            writeFileIfChanged(segmentPath, segmentData)
 
 
 def writeMaterialHeaders(exportDir, matCInclude, matHInclude):
@@ -524,43 +679,41 @@ def writeMaterialFiles(
     levelMatCPath = os.path.join(assetDir, "material.inc.c")
     levelMatHPath = os.path.join(assetDir, "material.inc.h")
 
-    levelMatCFile = open(levelMatCPath, "w", newline="\n")
-    levelMatCFile.write(dynamic_data)
-    levelMatCFile.close()
+    writeFileIfChanged(levelMatCPath, dynamic_data)
 
     headerDynamic = headerInclude + "\n\n" + headerDynamic
-    levelMatHFile = open(levelMatHPath, "w", newline="\n")
-    levelMatHFile.write(headerDynamic)
-    levelMatHFile.close()
+    writeFileIfChanged(levelMatHPath, headerDynamic)
 
     return matHInclude + "\n\n" + geoString
 
 
 def writeMaterialBase(baseDir):
     matHPath = os.path.join(baseDir, "src/game/materials.h")
-    if not os.path.exists(matHPath):
-        matHFile = open(matHPath, "w", newline="\n")
+    with lockSharedFile(matHPath):
+        if not os.path.exists(matHPath):
+            matHFile = open(matHPath, "w", newline="\n")
 
-        # Write material.inc.h
-        matHFile.write("#ifndef MATERIALS_H\n" + "#define MATERIALS_H\n\n" + "#endif")
+            # Write material.inc.h
+            matHFile.write("#ifndef MATERIALS_H\n" + "#define MATERIALS_H\n\n" + "#endif")
 
-        matHFile.close()
+            matHFile.close()
 
     matCPath = os.path.join(baseDir, "src/game/materials.c")
-    if not os.path.exists(matCPath):
-        matCFile = open(matCPath, "w", newline="\n")
-        matCFile.write(
-            '#include "types.h"\n'
-            + '#include "rendering_graph_node.h"\n'
-            + '#include "object_fields.h"\n'
-            + '#include "materials.h"'
-        )
+    with lockSharedFile(matCPath):
+        if not os.path.exists(matCPath):
+            matCFile = open(matCPath, "w", newline="\n")
+            matCFile.write(
+                '#include "types.h"\n'
+                + '#include "rendering_graph_node.h"\n'
+                + '#include "object_fields.h"\n'
+                + '#include "materials.h"'
+            )
 
-        # Write global texture load function here
-        # Write material.inc.c
-        # Write update_materials
+            # Write global texture load function here
+            # Write material.inc.c
+            # Write update_materials
 
-        matCFile.close()
+            matCFile.close()
 
 
 def getRGBA16Tuple(color):
@@ -716,67 +869,68 @@ def getExportDir(customExport, dirPath, headerType, levelName, texDir, dirName):
 
 
 def overwriteData(headerRegex, name, value, filePath, writeNewBeforeString, isFunction):
-    if os.path.exists(filePath):
-        dataFile = open(filePath, "r")
-        data = dataFile.read()
-        dataFile.close()
-
-        matchResult = re.search(
-            headerRegex
-            + re.escape(name)
-            + ("\s*\((((?!\)).)*)\)\s*\{(((?!\}).)*)\}" if isFunction else "\[\]\s*=\s*\{(((?!;).)*);"),
-            data,
-            re.DOTALL,
-        )
-        if matchResult:
-            data = data[: matchResult.start(0)] + value + data[matchResult.end(0) :]
-        else:
-            if writeNewBeforeString is not None:
-                cmdPos = data.find(writeNewBeforeString)
-                if cmdPos == -1:
-                    raise PluginError("Could not find '" + writeNewBeforeString + "'.")
-                data = data[:cmdPos] + value + "\n" + data[cmdPos:]
+    with lockSharedFile(filePath):
+        if os.path.exists(filePath):
+            dataFile = open(filePath, "r")
+            data = dataFile.read()
+            dataFile.close()
+
+            matchResult = re.search(
+                headerRegex
+                + re.escape(name)
+                + ("\s*\((((?!\)).)*)\)\s*\{(((?!\}).)*)\}" if isFunction else "\[\]\s*=\s*\{(((?!;).)*);"),
+                data,
+                re.DOTALL,
+            )
+            if matchResult:
+                data = data[: matchResult.start(0)] + value + data[matchResult.end(0) :]
             else:
-                data += "\n" + value
-        dataFile = open(filePath, "w", newline="\n")
-        dataFile.write(data)
-        dataFile.close()
-    else:
-        raise PluginError(filePath + " does not exist.")
+                if writeNewBeforeString is not None:
+                    cmdPos = data.find(writeNewBeforeString)
+                    if cmdPos == -1:
+                        raise PluginError("Could not find '" + writeNewBeforeString + "'.")
+                    data = data[:cmdPos] + value + "\n" + data[cmdPos:]
+                else:
+                    data += "\n" + value
+            writeFileIfChanged(filePath, data)
+        else:
+            raise PluginError(filePath + " does not exist.")
 
 
 def writeIfNotFound(filePath, stringValue, footer):
-    if os.path.exists(filePath):
-        fileData = open(filePath, "r")
-        fileData.seek(0)
-        stringData = fileData.read()
-        fileData.close()
-        if stringValue not in stringData:
-            if len(footer) > 0:
-                footerIndex = stringData.rfind(footer)
-                if footerIndex == -1:
-                    raise PluginError("Footer " + footer + " does not exist.")
-                stringData = stringData[:footerIndex] + stringValue + "\n" + stringData[footerIndex:]
-            else:
-                stringData += stringValue
-            fileData = open(filePath, "w", newline="\n")
-            fileData.write(stringData)
-        fileData.close()
-    else:
-        raise PluginError(filePath + " does not exist.")
+    with lockSharedFile(filePath):
+        if os.path.exists(filePath):
+            fileData = open(filePath, "r")
+            fileData.seek(0)
+            stringData = fileData.read()
+            fileData.close()
+            if stringValue not in stringData:
+                if len(footer) > 0:
+                    footerIndex = stringData.rfind(footer)
+                    if footerIndex == -1:
+                        raise PluginError("Footer " + footer + " does not exist.")
+                    stringData = stringData[:footerIndex] + stringValue + "\n" + stringData[footerIndex:]
+                else:
+                    stringData += stringValue
+                fileData = open(filePath, "w", newline="\n")
+                fileData.write(stringData)
+            fileData.close()
+        else:
+            raise PluginError(filePath + " does not exist.")
 
 
 def deleteIfFound(filePath, stringValue):
-    if os.path.exists(filePath):
-        fileData = open(filePath, "r")
-        fileData.seek(0)
-        stringData = fileData.read()
-        fileData.close()
-        if stringValue in stringData:
-            stringData = stringData.replace(stringValue, "")
-            fileData = open(filePath, "w", newline="\n")
-            fileData.write(stringData)
-        fileData.close()
+    with lockSharedFile(filePath):
+        if os.path.exists(filePath):
+            fileData = open(filePath, "r")
+            fileData.seek(0)
+            stringData = fileData.read()
+            fileData.close()
+            if stringValue in stringData:
+                stringData = stringData.replace(stringValue, "")
+                fileData = open(filePath, "w", newline="\n")
+                fileData.write(stringData)
+            fileData.close()
 
 
 def yield_children(obj: bpy.types.Object):
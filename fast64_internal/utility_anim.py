@@ -1,4 +1,5 @@
 import bpy, math, mathutils
+import numpy as np
 from bpy.utils import register_class, unregister_class
 
 from typing import TYPE_CHECKING
@@ -47,20 +48,323 @@ class ArmatureApplyWithMeshOperator(bpy.types.Operator):
 
 
 # This code only handles root bone with no parent, which is the only bone that translates.
-def getTranslationRelativeToRest(bone: bpy.types.Bone, inputVector: mathutils.Vector) -> mathutils.Vector:
+def getTranslationRestInverse(bone: bpy.types.Bone) -> mathutils.Matrix:
     zUpToYUp = mathutils.Quaternion((1, 0, 0), math.radians(-90.0)).to_matrix().to_4x4()
-    actualTranslation = (zUpToYUp @ bone.matrix_local).inverted() @ mathutils.Matrix.Translation(inputVector).to_4x4()
+    return (zUpToYUp @ bone.matrix_local).inverted()
+
+
+def getTranslationRelativeToRest(
+    bone: bpy.types.Bone, inputVector: mathutils.Vector, restInverse: mathutils.Matrix | None = None
+) -> mathutils.Vector:
+    """restInverse is getTranslationRestInverse(bone), pass it when converting many frames of the same bone"""
+    if restInverse is None:
+        restInverse = getTranslationRestInverse(bone)
+    actualTranslation = restInverse @ mathutils.Matrix.Translation(inputVector).to_4x4()
     return actualTranslation.decompose()[0]
 
 
-def getRotationRelativeToRest(bone: bpy.types.Bone, inputEuler: mathutils.Euler) -> mathutils.Euler:
+def getRotationRestInverse(bone: bpy.types.Bone) -> mathutils.Matrix:
     if bone.parent is None:
         parentRotation = mathutils.Quaternion((1, 0, 0), math.radians(90.0)).to_matrix().to_4x4()
     else:
         parentRotation = bone.parent.matrix_local
 
     restRotation = (parentRotation.inverted() @ bone.matrix_local).decompose()[1].to_matrix().to_4x4()
-    return (restRotation.inverted() @ inputEuler.to_matrix().to_4x4()).to_euler("XYZ", inputEuler)
+    return restRotation.inverted()
+
+
+def getRotationRelativeToRest(
+    bone: bpy.types.Bone, inputEuler: mathutils.Euler, restInverse: mathutils.Matrix | None = None
+) -> mathutils.Euler:
+    """restInverse is getRotationRestInverse(bone), pass it when converting many frames of the same bone"""
+    if restInverse is None:
+        restInverse = getRotationRestInverse(bone)
+    return (restInverse @ inputEuler.to_matrix().to_4x4()).to_euler("XYZ", inputEuler)
+
+
+def setKeyframes(fcurve: bpy.types.FCurve, values, interpolation: str | None = None):
+    """
+    Keyframes values at frames 0, 1, 2... on an empty fcurve.
+    All points are added at once, instead of keyframe_points.insert sorting and updating handles for each frame.
+    """
+    count = len(values)
+    if count == 0:
+        return
+    coords = np.empty((count, 2), dtype=np.float32)
+    coords[:, 0] = np.arange(count)
+    coords[:, 1] = values
+    fcurve.keyframe_points.add(count)
+    fcurve.keyframe_points.foreach_set("co", coords.ravel())
+    if interpolation is not None:
+        for point in fcurve.keyframe_points:
+            point.interpolation = interpolation
+    fcurve.update()
+
+
+def getQuaternionMatrices(quaternions: np.ndarray) -> np.ndarray:
+    """(frames, 4) w / x / y / z quaternions to (frames, 3, 3) rotation matrices, normalizing like pose bones do"""
+    length = np.linalg.norm(quaternions, axis=1)
+    identity = length == 0
+    w, x, y, z = (
+        np.where(identity, (1, 0, 0, 0)[i], quaternions[:, i] / np.where(identity, 1, length)) for i in range(4)
+    )
+    return np.stack(
+        [
+            np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=1),
+            np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=1),
+            np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=1),
+        ],
+        axis=1,
+    )
+
+
+def getAxisAngleMatrices(axisAngles: np.ndarray) -> np.ndarray:
+    """(frames, 4) angle / x / y / z axis angles to (frames, 3, 3) rotation matrices"""
+    angle = axisAngles[:, 0]
+    axis = axisAngles[:, 1:]
+    length = np.linalg.norm(axis, axis=1)
+    axis = np.where((length == 0)[:, None], 0, axis / np.where(length == 0, 1, length)[:, None])
+    quaternions = np.concatenate(
+        [np.where(length == 0, 1, np.cos(angle / 2))[:, None], axis * np.sin(angle / 2)[:, None]], axis=1
+    )
+    return getQuaternionMatrices(quaternions)
+
+
+def getEulerMatrices(angles: np.ndarray, order: str) -> np.ndarray:
+    """(frames, 3) euler angles to (frames, 3, 3) rotation matrices, the first axis of order being applied first"""
+    axisMatrices = {}
+    for k, axisName in enumerate("XYZ"):
+        i, j = (k + 1) % 3, (k + 2) % 3
+        cos, sin = np.cos(angles[:, k]), np.sin(angles[:, k])
+        matrices = np.zeros((len(angles), 3, 3))
+        matrices[:, k, k] = 1
+        matrices[:, i, i] = cos
+        matrices[:, j, j] = cos
+        matrices[:, i, j] = -sin
+        matrices[:, j, i] = sin
+        axisMatrices[axisName] = matrices
+    return axisMatrices[order[2]] @ axisMatrices[order[1]] @ axisMatrices[order[0]]
+
+
+class ArmatureFrameSampler:
+    """
+    Samples the pose of an armature over a range of frames, for animation export:
+
+    for frame in sampler.frames(frame_start, frame_count):
+        sampler.matrix(boneName)
+
+    Frames are set on the scene by default. With the experimental fast animation sampling setting,
+    when the pose only depends on the active action, its fcurves are evaluated and pose bone matrices are composed
+    with NumPy, instead of scene.frame_set() evaluating the whole scene (including every modifier) on each frame.
+    Blender composes poses in single precision, so exported values can differ by one unit,
+    compareFrameSampling measures the difference for an armature.
+    Armatures with constraints, drivers, NLA strips of other actions or bones not inheriting their parent's
+    full transform are always sampled with frame_set.
+    """
+
+    def __init__(self, armatureObj: bpy.types.Object, sampleFcurves: bool | None = None):
+        """sampleFcurves defaults to the fast animation sampling setting"""
+        if sampleFcurves is None:
+            sampleFcurves = bpy.context.scene.fast64.settings.sample_anim_fcurves
+        self.armatureObj = armatureObj
+        self.canSample = sampleFcurves and self.canSampleActionOnly(armatureObj)
+        self.frameIndex = 0
+        self.matrices: dict[str, np.ndarray] = {}
+        self.basisMatrices: dict[str, np.ndarray] = {}
+        self.propertyValues: dict[tuple[str, int], np.ndarray] = {}
+
+    @staticmethod
+    def canSampleActionOnly(armatureObj: bpy.types.Object) -> bool:
+        animData = armatureObj.animation_data
+        if animData is None or animData.action is None or len(animData.drivers) > 0:
+            return False
+        if animData.use_tweak_mode or animData.action_blend_type != "REPLACE" or animData.action_influence != 1:
+            return False
+        if animData.action_extrapolation != "HOLD":
+            return False
+        if animData.use_nla:
+            for track in animData.nla_tracks:
+                if track.mute:
+                    continue
+                for strip in track.strips:
+                    # Stashed copies of the active action are replaced by it
+                    if not strip.mute and strip.action not in (None, animData.action):
+                        return False
+        if armatureObj.data.animation_data is not None and len(armatureObj.data.animation_data.drivers) > 0:
+            return False
+        if armatureObj.data.pose_position != "POSE":
+            return False
+        for poseBone in armatureObj.pose.bones:
+            bone = poseBone.bone
+            if len(poseBone.constraints) > 0:
+                return False
+            if (
+                not bone.use_inherit_rotation
+                or bone.inherit_scale != "FULL"
+                or not bone.use_local_location
+                or bone.use_relative_parent
+            ):
+                return False
+        return True
+
+    def frames(self, frame_start: int, frame_count: int):
+        frameRange = range(frame_start, frame_start + frame_count)
+        if self.canSample:
+            self.sampleAction(frameRange)
+            for self.frameIndex, frame in enumerate(frameRange):
+                yield frame
+            return
+
+        scene = bpy.context.scene
+        currentFrame = scene.frame_current
+        try:
+            for frame in frameRange:
+                scene.frame_set(frame)
+                yield frame
+        finally:
+            scene.frame_set(currentFrame)
+
+    def matrix(self, boneName: str) -> mathutils.Matrix:
+        """Pose bone matrix in armature space, like PoseBone.matrix"""
+        if not self.canSample:
+            return self.armatureObj.pose.bones[boneName].matrix.copy()
+        return mathutils.Matrix(self.matrices[boneName][self.frameIndex].tolist())
+
+    def matrixBasis(self, boneName: str) -> mathutils.Matrix:
+        """Pose bone transform relative to its rest pose, like PoseBone.matrix_basis"""
+        if not self.canSample:
+            return self.armatureObj.pose.bones[boneName].matrix_basis.copy()
+        return mathutils.Matrix(self.basisMatrices[boneName][self.frameIndex].tolist())
+
+    def propertyValue(self, dataPath: str):
+        """Value of an animatable, non array property of the armature object"""
+        value = self.armatureObj.path_resolve(dataPath)
+        if not self.canSample or (dataPath, 0) not in self.propertyValues:
+            return value
+        sampled = float(self.propertyValues[(dataPath, 0)][self.frameIndex])
+        # The animation system truncates values written to int properties
+        return type(value)(sampled) if isinstance(value, (int, bool)) else sampled
+
+    def sampleAction(self, frameRange: range):
+        fcurves = {
+            (fcurve.data_path, fcurve.array_index): fcurve
+            for fcurve in self.armatureObj.animation_data.action.fcurves
+            if not fcurve.mute
+        }
+        frameCount = len(frameRange)
+
+        def sampleChannels(dataPath: str, currentValues):
+            values = np.empty((frameCount, len(currentValues)))
+            for index, currentValue in enumerate(currentValues):
+                fcurve = fcurves.get((dataPath, index))
+                if fcurve is None:
+                    values[:, index] = currentValue
+                else:
+                    values[:, index] = [fcurve.evaluate(frame) for frame in frameRange]
+            return values
+
+        self.propertyValues = {
+            key: np.array([fcurve.evaluate(frame) for frame in frameRange])
+            for key, fcurve in fcurves.items()
+            if not key[0].startswith("pose.bones[")
+        }
+
+        self.matrices = {}
+        self.basisMatrices = {}
+        # Parents are composed before their children
+        for poseBone in sorted(self.armatureObj.pose.bones, key=lambda poseBone: len(poseBone.bone.parent_recursive)):
+            bone = poseBone.bone
+            bonePath = f'pose.bones["{bpy.utils.escape_identifier(poseBone.name)}"]'
+
+            if poseBone.rotation_mode == "QUATERNION":
+                rotation = getQuaternionMatrices(
+                    sampleChannels(bonePath + ".rotation_quaternion", poseBone.rotation_quaternion)
+                )
+            elif poseBone.rotation_mode == "AXIS_ANGLE":
+                rotation = getAxisAngleMatrices(
+                    sampleChannels(bonePath + ".rotation_axis_angle", poseBone.rotation_axis_angle)
+                )
+            else:
+                rotation = getEulerMatrices(
+                    sampleChannels(bonePath + ".rotation_euler", poseBone.rotation_euler), poseBone.rotation_mode
+                )
+
+            basis = np.zeros((frameCount, 4, 4))
+            basis[:, :3, :3] = rotation * sampleChannels(bonePath + ".scale", poseBone.scale)[:, None, :]
+            basis[:, :3, 3] = sampleChannels(bonePath + ".location", poseBone.location)
+            basis[:, 3, 3] = 1
+            self.basisMatrices[poseBone.name] = basis
+
+            restMatrix = np.array(bone.matrix_local)
+            if bone.parent is None:
+                self.matrices[poseBone.name] = restMatrix @ basis
+            else:
+                restRelativeToParent = np.linalg.inv(np.array(bone.parent.matrix_local)) @ restMatrix
+                self.matrices[poseBone.name] = self.matrices[bone.parent.name] @ restRelativeToParent @ basis
+
+
+def compareFrameSampling(armatureObj: bpy.types.Object, frame_start: int, frame_count: int) -> dict[str, float]:
+    """
+    Samples the active action with both ArmatureFrameSampler modes,
+    and returns the largest difference between the pose bone matrices of each bone over all frames
+    """
+    from .utility import PluginError
+
+    if not ArmatureFrameSampler.canSampleActionOnly(armatureObj):
+        raise PluginError(
+            f'"{armatureObj.name}" uses constraints, drivers, NLA strips or bone settings that are only sampled '
+            + "with frame_set, there is nothing to compare."
+        )
+
+    boneNames = [poseBone.name for poseBone in armatureObj.pose.bones]
+    fcurveSampler = ArmatureFrameSampler(armatureObj, True)
+    fcurveMatrices = {
+        frame: [fcurveSampler.matrix(boneName) for boneName in boneNames]
+        for frame in fcurveSampler.frames(frame_start, frame_count)
+    }
+
+    differences = {boneName: 0.0 for boneName in boneNames}
+    frameSampler = ArmatureFrameSampler(armatureObj, False)
+    for frame in frameSampler.frames(frame_start, frame_count):
+        for boneName, fcurveMatrix in zip(boneNames, fcurveMatrices[frame]):
+            difference = np.abs(np.array(frameSampler.matrix(boneName)) - np.array(fcurveMatrix)).max()
+            differences[boneName] = max(differences[boneName], float(difference))
+    return differences
+
+
+class CompareAnimSamplingOperator(bpy.types.Operator):
+    bl_description = (
+        "Samples the active action of the selected armature from its fcurves and with frame_set, "
+        + "and prints the largest difference between the bone matrices of each bone"
+    )
+    bl_idname = "object.fast64_compare_anim_sampling"
+    bl_label = "Compare Animation Sampling"
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        from .utility import PluginError, raisePluginError
+
+        try:
+            armatureObj = context.active_object
+            if armatureObj is None or armatureObj.type != "ARMATURE":
+                raise PluginError("Armature not selected.")
+            if armatureObj.animation_data is None or armatureObj.animation_data.action is None:
+                raise PluginError(f'"{armatureObj.name}" has no active action.')
+
+            action = armatureObj.animation_data.action
+            frame_start = int(action.frame_range[0])
+            frame_count = int(action.frame_range[1]) - frame_start + 1
+            differences = compareFrameSampling(armatureObj, frame_start, frame_count)
+        except Exception as e:
+            raisePluginError(self, e)
+            return {"CANCELLED"}
+
+        print(f'Sampling differences of "{action.name}" over {frame_count} frames:')
+        for boneName, difference in differences.items():
+            print(f"{boneName}: {difference:.3g}")
+        boneName, difference = max(differences.items(), key=lambda item: item[1], default=("", 0.0))
+        self.report({"INFO"}, f'Largest difference: {difference:.3g} ("{boneName}"), see the console for every bone.')
+        return {"FINISHED"}
 
 
 def attemptModifierApply(modifier):
@@ -141,6 +445,46 @@ def saveTranslationFrame(frameData, translation):
         frameData[i].frames.append(min(int(round(translation[i])), 2**16 - 1))
 
 
+def toShortBytes(values) -> bytes:
+    return (np.array(values, dtype=np.int64) & 0xFFFF).astype(">u2").tobytes()
+
+
+def findShortSequence(packed: bytes, sequenceBytes: bytes) -> int:
+    """Index of the first occurrence of sequenceBytes in packed at a 2 byte boundary, or -1"""
+    index = packed.find(sequenceBytes)
+    while index != -1 and index % 2 == 1:
+        index = packed.find(sequenceBytes, index + 1)
+    return index
+
+
+def packValueSequences(sequences: list[list[int]], values: list[int]) -> list[int]:
+    """
+    Appends sequences of 16 bit values to values, returning the index of each sequence in values.
+    Identical sequences are stored once, sequences found in the values already written point into them,
+    and a sequence starting with the end of the values only appends what is left.
+    Longer sequences are placed first, so that shorter ones are more likely to be found in them.
+    """
+    packed = toShortBytes(values)
+    sequenceOffsets = {}
+    offsets = [0] * len(sequences)
+    for i in sorted(range(len(sequences)), key=lambda i: -len(sequences[i])):
+        sequence = tuple(sequences[i])
+        if sequence not in sequenceOffsets:
+            sequenceBytes = toShortBytes(sequence)
+            index = findShortSequence(packed, sequenceBytes) if len(sequence) > 0 else -1
+            if index != -1:
+                sequenceOffsets[sequence] = index // 2
+            else:
+                overlap = max(min(len(sequence), len(values)) - 1, 0)
+                while overlap > 0 and not packed.endswith(sequenceBytes[: overlap * 2]):
+                    overlap -= 1
+                sequenceOffsets[sequence] = len(values) - overlap
+                values.extend(sequence[overlap:])
+                packed += sequenceBytes[overlap * 2 :]
+        offsets[i] = sequenceOffsets[sequence]
+    return offsets
+
+
 def getFrameInterval(action: bpy.types.Action):
     scene = bpy.context.scene
 
@@ -200,7 +544,10 @@ def stashActionInArmature(armatureObj: bpy.types.Object, action: bpy.types.Actio
     track.strips.new(action.name, int(action.frame_range[0]), action)
 
 
-classes = (ArmatureApplyWithMeshOperator,)
+classes = (
+    ArmatureApplyWithMeshOperator,
+    CompareAnimSamplingOperator,
+)
 
 
 def utility_anim_register():
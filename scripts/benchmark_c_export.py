@@ -0,0 +1,90 @@
+import importlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+"""
+A script that can be run in blender to compare time and peak memory of C export
+with the chunked CData against the previous string concatenation.
+The model is synthetic, sized like a large scene: meshCount meshes each with
+vertexCount vertices and commandCount display list commands.
+
+Usage:
+blender --background --python-exit-code 1 --python benchmark_c_export.py -- [addon module name] [meshCount] [vertexCount] [commandCount]
+
+Example:
+blender --background --python-exit-code 1 --python benchmark_c_export.py -- fast64 400 2000 1500
+"""
+args = sys.argv[(sys.argv.index("--") + 1) :] if "--" in sys.argv else []
+
+addonName = args[0] if len(args) > 0 else "fast64"
+meshCount = int(args[1]) if len(args) > 1 else 400
+vertexCount = int(args[2]) if len(args) > 2 else 2000
+commandCount = int(args[3]) if len(args) > 3 else 1500
+
+utility = importlib.import_module(f"{addonName}.fast64_internal.utility")
+gbi = importlib.import_module(f"{addonName}.fast64_internal.f3d.f3d_gbi")
+
+
+def buildLists():
+    lists = []
+    for i in range(meshCount):
+        vtxList = gbi.VtxList(f"mesh_{i}_vtx")
+        vtxList.vertices = [gbi.Vtx([j, -j, j * 2], [j * 32, j * 16], [255, 128, 64, 255]) for j in range(vertexCount)]
+        gfxList = gbi.GfxList(f"mesh_{i}_tri", gbi.GfxListTag.Geometry, gbi.DLFormat.Static)
+        gfxList.commands = [gbi.SP2Triangles(0, 1, 2, 0, 2, 3, 4, 0) for _ in range(commandCount)]
+        lists.append((vtxList, gfxList))
+    return lists
+
+
+def legacyToC(lists):
+    """String concatenation, as C data was built before CData stored chunks"""
+    source = ""
+    header = ""
+    for vtxList, gfxList in lists:
+        vtxSource = f"Vtx {vtxList.name}[{len(vtxList.vertices)}] = {{\n"
+        for vert in vtxList.vertices:
+            vtxSource += f"\t{vert.to_c()},\n"
+        vtxSource += "};\n\n"
+        gfxSource = f"Gfx {gfxList.name}[] = {{\n"
+        for command in gfxList.commands:
+            gfxSource += f"\t{command.to_c(True)},\n"
+        gfxSource += "};\n\n"
+        source += vtxSource + gfxSource
+        header += f"extern Vtx {vtxList.name}[{len(vtxList.vertices)}];\nextern Gfx {gfxList.name}[];\n"
+    data = utility.CData()
+    data.source = source
+    data.header = header
+    return data
+
+
+def chunkedToC(lists):
+    data = utility.CData()
+    for vtxList, gfxList in lists:
+        data.append(vtxList.to_c())
+        data.append(gfxList.to_c(None))
+    return data
+
+
+def measure(name, func, lists, exportDir):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = func(lists)
+    utility.writeCData(data, os.path.join(exportDir, f"{name}.h"), os.path.join(exportDir, f"{name}.c"))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(os.path.join(exportDir, f"{name}.c"))
+    print(f"{name}: {elapsed:.2f}s, peak {peak / 2**20:.1f} MiB, {size / 2**20:.1f} MiB written")
+    return os.path.join(exportDir, f"{name}.c")
+
+
+lists = buildLists()
+with tempfile.TemporaryDirectory() as exportDir:
+    legacyPath = measure("legacy", legacyToC, lists, exportDir)
+    chunkedPath = measure("chunked", chunkedToC, lists, exportDir)
+    with open(legacyPath, "r") as legacyFile, open(chunkedPath, "r") as chunkedFile:
+        if legacyFile.read() != chunkedFile.read():
+            raise RuntimeError("Chunked C export differs from legacy output")
@@ -0,0 +1,65 @@
+import addon_utils
+import importlib
+import shutil
+import statistics
+import sys
+import time
+
+"""
+A script that can be run in blender to measure the time it takes to enable the add-on,
+and to load the OoT XML data tables, with and without their cache (they are loaded when the add-on is enabled,
+as enum properties are built from them), and the SM64 function map (loaded on first access).
+Each enable starts from a fresh import, with the add-on's modules removed from sys.modules.
+
+Usage:
+blender --background --factory-startup --python-exit-code 1 --python benchmark_startup.py -- [addon module name] [repeat]
+
+Example:
+blender --background --factory-startup --python-exit-code 1 --python benchmark_startup.py -- fast64 5
+"""
+args = sys.argv[(sys.argv.index("--") + 1) :] if "--" in sys.argv else []
+
+addonName = args[0] if len(args) > 0 else "fast64"
+repeat = int(args[1]) if len(args) > 1 else 5
+
+
+def unloadAddon():
+    addon_utils.disable(addonName, default_set=False)
+    for moduleName in list(sys.modules):
+        if moduleName == addonName or moduleName.startswith(addonName + "."):
+            del sys.modules[moduleName]
+
+
+def measure(name, func, count=1):
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    print(f"{name}: median {statistics.median(times) * 1000:.1f}ms, min {min(times) * 1000:.1f}ms")
+
+
+def enableAddon():
+    unloadAddon()
+    if addon_utils.enable(addonName, default_set=False, handle_error=None) is None:
+        raise RuntimeError(f"Could not enable {addonName}")
+
+
+def loadOoTData(clearCache: bool):
+    getters = importlib.import_module(f"{addonName}.fast64_internal.oot.data.oot_getters")
+    ootData = importlib.import_module(f"{addonName}.fast64_internal.oot.data.oot_data")
+    if clearCache:
+        shutil.rmtree(getters.getDataCacheDir(), ignore_errors=True)
+    data = ootData.OoT_Data()
+    return data.enumData, data.objectData, data.actorData
+
+
+def loadFunctionMap():
+    sys.modules.pop(f"{addonName}.fast64_internal.sm64.sm64_function_map", None)
+    importlib.import_module(f"{addonName}.fast64_internal.sm64.sm64_function_map")
+
+
+measure("Enable add-on", enableAddon, repeat)
+measure("OoT data, no cache", lambda: loadOoTData(True), repeat)
+measure("OoT data, cached", lambda: loadOoTData(False), repeat)
+measure("SM64 function map", loadFunctionMap, repeat)